@@ -0,0 +1,117 @@
+"""Compares the cached case conversions with the character by character
+implementations they replaced.
+
+Names are converted the way the C# and Python writers convert them: every
+distinct name many times. 'cold' clears the caches before every run.
+
+Run from the repository root:
+    python -m benchmarks.case_bench [distinct names] [repetitions]
+
+Python 3.11, 5000 distinct names converted 10 times:
+    reference ~240 ms, cold cache ~50 ms (4.8x), warm cache ~20 ms (12x),
+    without the cache ~200 ms (1.3x)
+"""
+import random
+import sys
+import timeit
+
+import definitiongenerator.utilities as ut
+
+# Reference implementations ---------------------------------------------------
+
+
+def _reference_to_snake_case(s: str):
+    def generate():
+        first_char = True
+        for c in s:
+            if c.isupper():
+                if not first_char:
+                    yield "_"
+                yield c.lower()
+            else:
+                yield c
+
+            first_char = False
+
+    return "".join(generate())
+
+
+def _reference_to_camel_case(s: str, capitalize_first_letter: bool = False):
+    def generate(input_s: str):
+        upper_case_next = capitalize_first_letter
+        for c in input_s:
+            if c == "_":
+                upper_case_next = True
+            elif upper_case_next:
+                upper_case_next = False
+                yield c.upper()
+            else:
+                yield c
+
+    return "".join(generate(s.strip("_")))
+
+
+# -----------------------------------------------------------------------------
+
+_WORDS = ["user", "id", "created", "date", "next", "page", "HTTP", "url", "v2"]
+
+
+def _names(count: int) -> list[str]:
+    r = random.Random(0)
+    names = set()
+    while len(names) < count:
+        words = r.choices(_WORDS, k=r.randint(1, 4)) + [str(len(names) % 97)]
+        if r.random() < 0.5:
+            names.add("_".join(words))
+        else:
+            names.add(words[0] + "".join(w[:1].upper() + w[1:] for w in words[1:]))
+
+    return sorted(names)
+
+
+def main(distinct: int = 5000, repetitions: int = 10):
+    names = _names(distinct) * repetitions
+    for name in names[:distinct]:
+        assert ut.to_snake_case(name) == _reference_to_snake_case(name), name
+        assert ut.to_camel_case(name, True) == _reference_to_camel_case(name, True)
+
+    def convert(snake, camel):
+        for name in names:
+            snake(name)
+            camel(name, True)
+
+    def cold():
+        ut.to_snake_case.cache_clear()
+        ut.to_camel_case.cache_clear()
+        convert(ut.to_snake_case, ut.to_camel_case)
+
+    print(f"{distinct} distinct names, each converted {repetitions} times")
+    reference = min(
+        timeit.repeat(
+            lambda: convert(_reference_to_snake_case, _reference_to_camel_case),
+            number=1,
+            repeat=5,
+        )
+    )
+    print(f"  reference {reference * 1000:8.1f} ms")
+    for label, run in (
+        ("cold", cold),
+        ("warm", lambda: convert(ut.to_snake_case, ut.to_camel_case)),
+    ):
+        elapsed = min(timeit.repeat(run, number=1, repeat=5))
+        print(f"  {label:<9} {elapsed * 1000:8.1f} ms ({reference / elapsed:.1f}x)")
+
+    # every name converted once, without the cache
+    uncached = (ut.to_snake_case.__wrapped__, ut.to_camel_case.__wrapped__)
+    reference = min(
+        timeit.repeat(
+            lambda: convert(_reference_to_snake_case, _reference_to_camel_case),
+            number=1,
+            repeat=5,
+        )
+    )
+    elapsed = min(timeit.repeat(lambda: convert(*uncached), number=1, repeat=5))
+    print(f"  uncached  {elapsed * 1000:8.1f} ms ({reference / elapsed:.1f}x)")
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:3]))
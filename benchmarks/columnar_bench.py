@@ -0,0 +1,86 @@
+"""Inference of record arrays folded row by row and column by column.
+
+Both foldings are checked to create identical mappings.
+
+Run from the repository root:
+    python -m benchmarks.columnar_bench
+
+Python 3.11:
+    page (100 000 records of 7 properties)   ~700 ms rows, ~380 ms columns (1.8x)
+    wide (2 000 records of 200 properties)   ~90 ms rows, ~70 ms columns (1.3x)
+    sample_response.json                     ~8 ms rows, ~7 ms columns (1.1x)
+
+Most of the columnar time of 'page' hashes its 100 000 distinct names for
+the string sketches; records without distinct strings fold ~5x faster.
+"""
+import dataclasses
+import json
+import timeit
+from pathlib import Path
+
+import definitiongenerator.model as m
+
+_SAMPLE_PATH = Path(__file__).parent.parent / "sample_response.json"
+
+
+def _page() -> dict:
+    return {
+        "items": [
+            {
+                "id": i,
+                "available": i % 2 == 0,
+                "price": i / 100,
+                "name": f"item-{i}",
+                "note": None if i % 3 else "note",
+                "tags": ["a", "b"][: i % 3],
+                "owner": {"id": i % 50, "login": f"user-{i % 50}"},
+            }
+            for i in range(100_000)
+        ]
+    }
+
+
+def _wide() -> list:
+    return [
+        {f"field{j}": (j if j % 3 else f"value{j}") for j in range(200)}
+        for _ in range(2000)
+    ]
+
+
+def _sample_response():
+    with open(_SAMPLE_PATH, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main():
+    columns = m.InferenceOptions(columnar=True)
+    rows = dataclasses.replace(columns, columnar=False)
+    for name, create in (
+        ("page", _page),
+        ("wide", _wide),
+        ("sample_response", _sample_response),
+    ):
+        document = create()
+        assert m.mapping_fingerprint(
+            m.new_mapping_model(document, rows)
+        ) == m.mapping_fingerprint(m.new_mapping_model(document, columns)), name
+
+        (by_rows, by_columns) = (
+            min(
+                timeit.repeat(
+                    lambda: m.new_mapping_model(document, options),
+                    number=3,
+                    repeat=3,
+                )
+            )
+            / 3
+            for options in (rows, columns)
+        )
+        print(
+            f"  {name:<16} {by_rows * 1000:9.1f} ms rows {by_columns * 1000:9.1f} ms "
+            f"columns  ({by_rows / by_columns:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Memory used by mapping nodes of a large synthetic schema.
+
+Builds a mapping of a wide schema (many object types, each with many simple
+properties) and measures the memory held by the mapping with 'tracemalloc'.
+The same tree is then rebuilt with the node layout used before the mapping
+classes were slotted (regular dataclasses, a 'set' allocated for every
+simple mapping) for comparison.
+
+Run from the repository root:
+    python -m benchmarks.memory_bench [object types] [properties per type]
+
+Python 3.11, 1000 types x 100 properties (101 001 nodes):
+    legacy dataclasses + eager sets   ~335 bytes/node
+    slotted nodes + lazy reservoirs   ~152 bytes/node
+"""
+import sys
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Any
+
+import definitiongenerator.model as m
+
+
+@dataclass
+class _LegacySimpleMapping:
+    value_type: type
+    string_value_set: set[str] = field(default_factory=set)
+
+
+@dataclass
+class _LegacyListMapping:
+    element_mapping: Any
+
+
+@dataclass
+class _LegacyAlternativesMapping:
+    alternatives: list
+
+
+@dataclass
+class _LegacyObjectMapping:
+    properties: dict[str, Any]
+
+
+def _to_legacy(mapping: m.ModelMapping) -> Any:
+    if isinstance(mapping, m.SimpleMapping):
+        return _LegacySimpleMapping(mapping.value_type, set(mapping.string_value_set))
+
+    if isinstance(mapping, m.ListMapping):
+        if mapping.element_mapping is None:
+            return _LegacyListMapping(None)
+        return _LegacyListMapping(_to_legacy(mapping.element_mapping))
+
+    if isinstance(mapping, m.AlternativesMapping):
+        return _LegacyAlternativesMapping(
+            [_to_legacy(a) for a in mapping.alternatives.values()]
+        )
+
+    return _LegacyObjectMapping(
+        {k: _to_legacy(v) for k, v in mapping.properties.items()}
+    )
+
+
+def _count_nodes(mapping: m.ModelMapping) -> int:
+    count = 0
+    pending = [mapping]
+    while pending:
+        current = pending.pop()
+        count += 1
+        if isinstance(current, m.ObjectMapping):
+            pending.extend(current.properties.values())
+        elif isinstance(current, m.AlternativesMapping):
+            pending.extend(current.alternatives.values())
+        elif isinstance(current, m.ListMapping) and current.element_mapping:
+            pending.append(current.element_mapping)
+
+    return count
+
+
+def _wide_schema(type_count: int, property_count: int) -> dict:
+    values = [1, 2.5, True, "text"]
+    return {
+        f"type{i}": {
+            f"property{j}": values[j % len(values)] for j in range(property_count)
+        }
+        for i in range(type_count)
+    }
+
+
+def _traced_bytes(build) -> tuple[Any, int]:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (result, after - before)
+
+
+def main(type_count: int = 1000, property_count: int = 100):
+    document = _wide_schema(type_count, property_count)
+
+    (mapping, mapping_bytes) = _traced_bytes(lambda: m.new_mapping_model(document))
+    (_, legacy_bytes) = _traced_bytes(lambda: _to_legacy(mapping))
+
+    nodes = _count_nodes(mapping)
+    print(
+        f"Python {sys.version_info.major}.{sys.version_info.minor}, "
+        f"{type_count} types x {property_count} properties ({nodes} nodes)"
+    )
+    print(f"  legacy dataclasses + eager sets {legacy_bytes / nodes:8.0f} bytes/node")
+    print(f"  slotted nodes + lazy reservoirs {mapping_bytes / nodes:8.0f} bytes/node")
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:3]])
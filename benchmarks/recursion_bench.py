@@ -0,0 +1,234 @@
+"""Compares the explicit stack inference and type model passes with the
+recursive implementation they replaced.
+
+Run from the repository root:
+    python -m benchmarks.recursion_bench [path to JSON file] [repetitions]
+"""
+import json
+import sys
+import timeit
+from itertools import islice
+from typing import Any
+
+import definitiongenerator.model as m
+import definitiongenerator.outputtypemodel as otm
+
+# Recursive reference implementation ------------------------------------------
+
+
+def _recursive_new_mapping_model(v: Any, options: m.InferenceOptions):
+    v_type = type(v)
+    if m._is_simple_type(v_type):
+        mapping = m.SimpleMapping(value_type=v_type)
+        if v_type is str:
+            mapping.add_string(v, options)
+        return mapping
+
+    if v_type is dict:
+        mapping = m.ObjectMapping(dict())
+        return _recursive_update_mapping(mapping, v, options)
+
+    if v_type is list:
+        if len(v) == 0:
+            return m.ListMapping(element_mapping=None)
+
+        element_mapping = _recursive_new_mapping_model(v[0], options)
+        for element in islice(v, 1, None):
+            element_mapping = _recursive_update_mapping(
+                element_mapping, element, options
+            )
+        return m.ListMapping(element_mapping=element_mapping, inspected_count=len(v))
+
+    raise Exception(f"Creation of mapping for type {v_type} is not implemented.")
+
+
+def _recursive_update_mapping(current_mapping, v: Any, options: m.InferenceOptions):
+    v_type = type(v)
+    if isinstance(current_mapping, m.SimpleMapping):
+        if current_mapping.value_type == v_type:
+            if v_type is str:
+                current_mapping.add_string(v, options)
+            return current_mapping
+
+    elif isinstance(current_mapping, m.ListMapping):
+        if v_type is list:
+            current_mapping.inspected_count += len(v)
+            elements = iter(v)
+            if len(v) > 0 and current_mapping.element_mapping is None:
+                current_mapping.element_mapping = _recursive_new_mapping_model(
+                    next(elements), options
+                )
+            for e in elements:
+                current_mapping.element_mapping = _recursive_update_mapping(
+                    current_mapping.element_mapping, e, options
+                )
+            return current_mapping
+
+    elif isinstance(current_mapping, m.ObjectMapping):
+        if v_type is dict:
+            properties = current_mapping.properties
+            current_mapping.object_count += 1
+            current_mapping.presence_counts.update(v.keys())
+            for k, pv in v.items():
+                if pv is None:
+                    nulls = current_mapping.null_counts
+                    nulls[k] = nulls.get(k, 0) + 1
+                    continue
+                if k in properties:
+                    properties[k] = _recursive_update_mapping(
+                        properties[k], pv, options
+                    )
+                else:
+                    properties[k] = _recursive_new_mapping_model(pv, options)
+            return current_mapping
+
+    else:
+        alternatives = current_mapping.alternatives
+        if v_type in alternatives:
+            alternatives[v_type] = _recursive_update_mapping(
+                alternatives[v_type], v, options
+            )
+        else:
+            alternatives[v_type] = _recursive_new_mapping_model(v, options)
+        return current_mapping
+
+    return m._new_alternatives_mapping(
+        current_mapping, _recursive_new_mapping_model(v, options)
+    )
+
+
+def _recursive_new_type_model(mapping, state: otm._MapperState, path: list[str]):
+    if isinstance(mapping, m.SimpleMapping):
+        return otm._simple_mapping_to_type(mapping, state)
+
+    if isinstance(mapping, m.ListMapping):
+        element = otm._TypeDescription("?????")
+        if mapping.element_mapping is not None:
+            (state, element) = _recursive_new_type_model(
+                mapping.element_mapping, state, path
+            )
+
+        # lists of lists are a single type, nested one level deeper
+        return (
+            state,
+            otm._TypeDescription(
+                element.name,
+                is_array=True,
+                array_depth=element.array_depth + 1,
+                inspected_elements=mapping.inspected_count,
+                skipped_elements=mapping.skipped_count,
+                string_format=element.string_format,
+                enum_values=element.enum_values,
+            ),
+        )
+
+    if isinstance(mapping, m.ObjectMapping):
+        properties = {}
+        for prop_name, prop_mapping in mapping.properties.items():
+            (state, t) = _recursive_new_type_model(
+                prop_mapping, state, [*path, prop_name]
+            )
+            properties[prop_name] = otm._with_flags(t, mapping, prop_name)
+        for prop_name in mapping.presence_counts:
+            if prop_name not in properties:
+                properties[prop_name] = otm._with_flags(
+                    otm._TypeDescription("None"), mapping, prop_name
+                )
+
+        t = otm._TypeDescription(otm._get_type_name(state, path), properties)
+        state.found_types.append(t)
+        return (state, t)
+
+    raise NotImplementedError("Not implemented")
+
+
+# Benchmark --------------------------------------------------------------------
+
+
+def _nested_document(depth: int) -> dict:
+    doc: dict = {"leaf": "value"}
+    for i in range(depth):
+        doc = {"level": i, "child": doc, "items": [{"n": i}]}
+    return doc
+
+
+def _wide_records(count: int, width: int) -> list[dict]:
+    return [
+        {f"field{j}": (j if j % 3 else f"value{i % 7}") for j in range(width)}
+        for i in range(count)
+    ]
+
+
+def _measure(label: str, fn, repetitions: int, samples: int):
+    seconds = min(timeit.repeat(fn, number=repetitions, repeat=7)) / repetitions
+    print(f"{label:<40} {seconds * 1000:10.3f} ms {samples / seconds:14.0f} samples/s")
+
+
+def _compare(name: str, document: Any, samples: int, repetitions: int):
+    options = m.InferenceOptions()
+
+    recursive_mapping = _recursive_new_mapping_model(document, options)
+    iterative_mapping = m.new_mapping_model(document, options)
+    assert recursive_mapping == iterative_mapping, "inference results differ"
+
+    # The recursive reference does not deduplicate types
+    (recursive_state, _) = _recursive_new_type_model(
+        recursive_mapping, otm._MapperState(deduplicate=False), []
+    )
+    (iterative_state, _) = otm._new_type_model(
+        iterative_mapping, otm._MapperState(deduplicate=False)
+    )
+    assert recursive_state == iterative_state, "type models differ"
+
+    print(f"{name}: {samples} samples, {len(iterative_state.found_types)} types")
+    _measure(
+        "  inference (recursive)",
+        lambda: _recursive_new_mapping_model(document, options),
+        repetitions,
+        samples,
+    )
+    _measure(
+        "  inference (explicit stack)",
+        lambda: m.new_mapping_model(document, options),
+        repetitions,
+        samples,
+    )
+    _measure(
+        "  type model (recursive)",
+        lambda: _recursive_new_type_model(iterative_mapping, otm._MapperState(), []),
+        repetitions,
+        samples,
+    )
+    _measure(
+        "  type model (explicit stack)",
+        lambda: otm._new_type_model(iterative_mapping, otm._MapperState()),
+        repetitions,
+        samples,
+    )
+
+
+def main(path: str = "sample_response.json", repetitions: int = 20):
+    with open(path, "r", encoding="utf-8") as f:
+        document = json.load(f)
+
+    samples = len(document["bibs"]) if "bibs" in document else 1
+    _compare(path, document, samples, repetitions)
+    _compare("wide records (500 x 60 fields)", _wide_records(500, 60), 500, 5)
+
+    depth = sys.getrecursionlimit() * 2
+    deep = _nested_document(depth)
+    try:
+        _recursive_new_mapping_model(deep, m.InferenceOptions())
+        recursive_result = "ok"
+    except RecursionError:
+        recursive_result = "RecursionError"
+
+    deep_mapping = m.new_mapping_model(deep)
+    otm._new_type_model(deep_mapping, otm._MapperState())
+    print(
+        f"nesting depth {depth}: recursive -> {recursive_result}, explicit stack -> ok"
+    )
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:2], *[int(a) for a in sys.argv[2:3]])
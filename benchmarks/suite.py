@@ -0,0 +1,317 @@
+"""Reproducible benchmark suite of inference and code generation.
+
+Every case runs in a fresh process, so its peak RSS is not affected by the
+other cases. For every case the suite reports:
+    - inference: time to fold all samples into a mapping and samples/second
+    - type model: time to create the found types
+    - generation: time to render every output format
+    - peak RSS of the process running the case
+
+Results can be saved as JSON and compared with results of another commit:
+    python -m benchmarks.suite --output before.json
+    git checkout <other commit>
+    python -m benchmarks.suite --output after.json --compare before.json
+
+'--scale' multiplies the sizes of synthetic cases (0.1 for a quick run).
+"""
+import argparse
+import datetime
+import io
+import json
+import multiprocessing
+import platform
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable
+
+import definitiongenerator.model as m
+import definitiongenerator.writers as w
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+RESULTS_VERSION = 1
+
+_SAMPLE_PATH = Path(__file__).parent.parent / "sample_response.json"
+_WRITER_OPTIONS: dict[str, dict | None] = {
+    "CSharp": {"Namespace": "Benchmark", "NewStyleNamespace": False},
+}
+
+
+# Cases: functions returning the samples to fold, one document each -----------
+
+
+def _sample_response(scale: float) -> list[Any]:
+    with open(_SAMPLE_PATH, "r", encoding="utf-8") as f:
+        document = json.load(f)
+
+    return [document] * max(1, round(20 * scale))
+
+
+def _wide_objects(scale: float) -> list[Any]:
+    fields = 200
+    return [
+        {f"field{j}": (j if j % 3 else f"value{j}") for j in range(fields)}
+        for _ in range(max(1, round(2000 * scale)))
+    ]
+
+
+def _deep_nesting(scale: float) -> list[Any]:
+    def nested(depth: int) -> dict:
+        doc = {"leaf": "value", "level": depth}
+        for i in range(depth):
+            doc = {"child": doc, "level": i}
+        return doc
+
+    return [nested(500) for _ in range(max(1, round(100 * scale)))]
+
+
+def _homogeneous_array(scale: float) -> list[Any]:
+    count = max(1, round(200_000 * scale))
+    return [
+        {
+            "items": [
+                {"id": i, "available": i % 2 == 0, "price": i / 100, "tags": ["a"]}
+                for i in range(count)
+            ]
+        }
+    ]
+
+
+def _high_cardinality_strings(scale: float) -> list[Any]:
+    return [
+        {"id": f"id-{i:08}", "text": f"free text number {i * 7919}", "kind": "x"}
+        for i in range(max(1, round(100_000 * scale)))
+    ]
+
+
+def _polymorphic_fields(scale: float) -> list[Any]:
+    variants = [1, "one", 1.5, True, {"nested": 1}, [1, 2]]
+    return [
+        {"value": variants[i % len(variants)], "id": i}
+        for i in range(max(1, round(50_000 * scale)))
+    ]
+
+
+CASES: dict[str, Callable[[float], list[Any]]] = {
+    "sample_response": _sample_response,
+    "wide_objects": _wide_objects,
+    "deep_nesting": _deep_nesting,
+    "homogeneous_array": _homogeneous_array,
+    "high_cardinality_strings": _high_cardinality_strings,
+    "polymorphic_fields": _polymorphic_fields,
+}
+
+
+# Measurement ------------------------------------------------------------------
+
+
+def _count_samples(samples: list[Any]) -> int:
+    """Documents, or elements of the top level list of a single document."""
+    if len(samples) == 1 and isinstance(samples[0], dict):
+        lists = [v for v in samples[0].values() if isinstance(v, list)]
+        if len(lists) == 1:
+            return len(lists[0])
+
+    return len(samples)
+
+
+def _infer(samples: list[Any]) -> m.ModelMapping:
+    mapping = None
+    for sample in samples:
+        if mapping is None:
+            mapping = m.new_mapping_model(sample)
+        else:
+            mapping = m._update_mapping(mapping, sample)
+
+    return mapping
+
+
+def _best_time(fn: Callable[[], Any], repeat: int) -> tuple[float, Any]:
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+
+    return (best, result)
+
+
+def _peak_rss_kb() -> int | None:
+    if resource is None:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, kilobytes elsewhere
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def run_case(name: str, scale: float, repeat: int) -> dict:
+    samples = CASES[name](scale)
+    count = _count_samples(samples)
+
+    (inference_seconds, mapping) = _best_time(lambda: _infer(samples), repeat)
+    result: dict[str, Any] = {
+        "samples": count,
+        "inference_seconds": inference_seconds,
+        "samples_per_second": count / inference_seconds,
+    }
+
+    try:
+        (type_model_seconds, found_types) = _best_time(
+            lambda: w.new_found_types(mapping), repeat
+        )
+    except NotImplementedError as e:
+        result["generation_error"] = f"{type(e).__name__}: {e}"
+    else:
+        result["type_model_seconds"] = type_model_seconds
+        result["types"] = len(found_types)
+        result["formats"] = {}
+        for dump_format in sorted(set(w._WRITERS) - {"C#"}):
+            options = _WRITER_OPTIONS.get(dump_format)
+            (seconds, _) = _best_time(
+                lambda: w.write_model(
+                    found_types,
+                    io.StringIO(),
+                    dump_format=dump_format,
+                    options=options,
+                ),
+                repeat,
+            )
+            result["formats"][dump_format] = seconds
+
+    result["peak_rss_kb"] = _peak_rss_kb()
+    return result
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(cases: list[str], scale: float, repeat: int) -> dict:
+    results = {
+        "version": RESULTS_VERSION,
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "scale": scale,
+        "repeat": repeat,
+        "cases": {},
+    }
+
+    context = multiprocessing.get_context("spawn")
+    for name in cases:
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            results["cases"][name] = executor.submit(
+                run_case, name, scale, repeat
+            ).result()
+
+        _print_case(name, results["cases"][name])
+
+    return results
+
+
+# Reporting --------------------------------------------------------------------
+
+
+def _print_case(name: str, r: dict):
+    rss = r["peak_rss_kb"]
+    print(
+        f"{name:<26} {r['samples']:>9} samples {r['samples_per_second']:>12.0f}/s"
+        f"  peak RSS {rss / 1024 if rss is not None else float('nan'):8.1f} MB"
+    )
+    if "generation_error" in r:
+        print(f"{'':<4}generation: {r['generation_error']}")
+        return
+
+    print(f"{'':<4}{'type model':<22} {r['type_model_seconds'] * 1000:10.2f} ms")
+    for dump_format, seconds in r["formats"].items():
+        print(f"{'':<4}{dump_format:<22} {seconds * 1000:10.2f} ms")
+
+
+def _timings(r: dict) -> dict[str, float]:
+    timings = {"inference": r["inference_seconds"]}
+    if "type_model_seconds" in r:
+        timings["type model"] = r["type_model_seconds"]
+        timings.update(r["formats"])
+
+    return timings
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> list[str]:
+    """Prints time ratios current/baseline, returns the regressed metrics."""
+    print(f"\ncompared with {baseline.get('commit') or 'baseline'}:")
+    if baseline.get("scale") != current.get("scale"):
+        print("  warning: results were measured with a different --scale")
+
+    regressions = []
+    for name, r in current["cases"].items():
+        if name not in baseline["cases"]:
+            continue
+
+        before = _timings(baseline["cases"][name])
+        for metric, seconds in _timings(r).items():
+            if metric not in before:
+                continue
+
+            ratio = seconds / before[metric]
+            marker = ""
+            if ratio > 1 + threshold:
+                marker = "  <-- slower"
+                regressions.append(f"{name}/{metric}")
+
+            print(f"  {name + '/' + metric:<48} {ratio:6.2f}x{marker}")
+
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.suite")
+    parser.add_argument("--case", action="append", choices=list(CASES))
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", type=Path, help="save results as JSON")
+    parser.add_argument("--compare", type=Path, help="results to compare with")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="slowdown reported as a regression (default: 0.1 = 10%%)",
+    )
+    args = parser.parse_args(argv)
+
+    results = run_suite(args.case or list(CASES), args.scale, args.repeat)
+    if args.output is not None:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare is not None:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+        if compare(baseline, results, args.threshold):
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
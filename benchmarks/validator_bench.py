@@ -0,0 +1,84 @@
+"""Generated validators against a generic validator on sample_response.json.
+
+The generic validator walks the type model with 'isinstance' checks for
+every value, the generated one is the output of the 'Validators' format.
+Both accept missing and null properties.
+
+Run from the repository root:
+    python -m benchmarks.validator_bench [path]
+
+Python 3.11, sample_response.json (343 kB, 60 types):
+    generic    ~10.9 ms/document
+    generated   ~4.3 ms/document (2.5x)
+"""
+import io
+import json
+import sys
+import timeit
+from typing import Any
+
+import definitiongenerator.model as m
+import definitiongenerator.writers as w
+from definitiongenerator.outputtypemodel import _TypeDescription
+
+_SIMPLE_TYPES = {"str": str, "int": int, "float": (float, int), "bool": bool}
+
+
+def _generic_validate(
+    value: Any, t: _TypeDescription, types: dict[str, _TypeDescription]
+):
+    if not isinstance(value, dict):
+        raise ValueError(f"expected object in {t.name}")
+
+    for name, p in t.properties.items():
+        v = value.get(name)
+        if v is None:
+            continue
+
+        if p.is_array:
+            if not isinstance(v, list):
+                raise ValueError(f"expected list in {t.name}.{name}")
+            elements = v
+        else:
+            elements = [v]
+
+        for e in elements:
+            if p.name in _SIMPLE_TYPES:
+                if isinstance(e, bool) and p.name != "bool":
+                    raise ValueError(f"unexpected bool in {t.name}.{name}")
+                if not isinstance(e, _SIMPLE_TYPES[p.name]):
+                    raise ValueError(f"expected {p.name} in {t.name}.{name}")
+            elif p.name in types:
+                _generic_validate(e, types[p.name], types)
+
+
+def main(path: str = "sample_response.json"):
+    with open(path, "r", encoding="utf-8") as f:
+        document = json.load(f)
+
+    found_types = w.new_found_types(m.new_mapping_model(document))
+    types = {t.name: t for t in found_types}
+    root = found_types[-1]
+
+    output = io.StringIO()
+    w.write_model(found_types, output, dump_format="Validators")
+    generated: dict[str, Any] = {}
+    exec(compile(output.getvalue(), "<validators>", "exec"), generated)
+    validate = generated[w._PythonValidatorWriter.function_name(root.name)]
+
+    print(f"{path}: {len(found_types)} types")
+    results = {}
+    for label, fn in [
+        ("generic", lambda: _generic_validate(document, root, types)),
+        ("generated", lambda: validate(document)),
+    ]:
+        number = 200
+        seconds = min(timeit.repeat(fn, number=number, repeat=5)) / number
+        results[label] = seconds
+        print(f"  {label:<10} {seconds * 1e6:10.1f} us/document")
+
+    print(f"  speedup    {results['generic'] / results['generated']:10.1f}x")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:2])
@@ -0,0 +1,90 @@
+"""Writing generated models to an unbuffered sink.
+
+Compares writers issuing their small writes directly to the sink with the
+chunked pipeline of 'write_model'. The sink is a raw, unbuffered file, so
+every write is a system call; pipes, sockets and compressed streams behave
+similarly.
+
+Run from the repository root:
+    python -m benchmarks.writer_bench [wide types] [properties per type]
+
+Python 3.11, 300 types x 40 properties:
+    TypedDict   direct  ~20 ms (13 205 writes)   chunked  ~6 ms (5 writes)
+    Markdown    direct  ~41 ms (24 902 writes)   chunked ~12 ms (7 writes)
+    CSharp      direct  ~80 ms (25 808 writes)   chunked ~48 ms (16 writes)
+"""
+import io
+import os
+import sys
+import tempfile
+import timeit
+
+import definitiongenerator.model as m
+import definitiongenerator.writers as w
+
+_CSHARP_OPTIONS = {"Namespace": "Bench", "NewStyleNamespace": True}
+
+
+class _UnbufferedTextSink:
+    def __init__(self, raw: io.RawIOBase):
+        self.raw = raw
+        self.writes = 0
+
+    def write(self, s: str):
+        self.writes += 1
+        self.raw.write(s.encode("utf-8"))
+
+
+def _write_directly(found_types, sink, dump_format, options):
+    writer = w._WRITERS[dump_format]()
+    if options is not None:
+        writer.initialize(found_types, options)
+
+    writer.print_header(found_types, sink)
+    for t in found_types:
+        writer.print_type(t, sink)
+
+    writer.print_footer(found_types, sink)
+
+
+def main(types: int = 300, properties: int = 40):
+    document = {
+        f"type{i}": {f"property{j}_{i}": f"value{j}" for j in range(properties)}
+        for i in range(types)
+    }
+    found_types = w.new_found_types(m.new_mapping_model(document))
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "out")
+        for dump_format, options in [
+            ("TypedDict", None),
+            ("Markdown", None),
+            ("CSharp", _CSHARP_OPTIONS),
+        ]:
+            for label, write in [
+                ("direct", _write_directly),
+                (
+                    "chunked",
+                    lambda t, s, f, o: w.write_model(
+                        t, s, dump_format=f, options=o
+                    ),
+                ),
+            ]:
+                with open(path, "wb", buffering=0) as raw:
+                    sink = _UnbufferedTextSink(raw)
+
+                    def run():
+                        raw.seek(0)
+                        write(found_types, sink, dump_format, options)
+
+                    seconds = min(timeit.repeat(run, number=1, repeat=5))
+                    writes = sink.writes // 5
+
+                print(
+                    f"{dump_format:<10} {label:<8} {seconds * 1000:9.2f} ms "
+                    f"{writes:8} writes"
+                )
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:3]])
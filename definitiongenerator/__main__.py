@@ -0,0 +1,5 @@
+import sys
+
+from definitiongenerator.cli import main
+
+sys.exit(main())
@@ -0,0 +1,157 @@
+"""Memoization of type models and rendered outputs.
+
+Mappings are mutable (they are updated in place by '_update_mapping'), so
+cached results are keyed by a fingerprint of the mapping content rather
+than by the mapping object ('model.mapping_fingerprint'). A mapping changed
+in any way that can affect the output gets a new fingerprint. Callers that
+know their mapping did not change can pass the fingerprint they computed
+before and skip computing it again.
+"""
+import json
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Hashable
+
+import definitiongenerator.model as m
+import definitiongenerator.writers as w
+from definitiongenerator.outputtypemodel import _TypeDescription
+
+DEFAULT_MAX_ENTRIES = 128
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+
+class ModelCache:
+    """
+    LRU cache of found types and rendered outputs shared by all formats.
+    Returned found types are shared by all callers and must not be modified.
+    Safe to use from multiple threads; a value missing in the cache may be
+    computed by more than one thread at the same time.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        if max_entries < 1:
+            raise ValueError("max_entries must be positive")
+
+        self.max_entries = max_entries
+        self.stats = CacheStats()
+        self._entries: OrderedDict[Hashable, Any] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def size(self) -> int:
+        return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def found_types(
+        self,
+        mapping: m.ModelMapping,
+        *,
+        deduplicate: bool = True,
+        unify_threshold: float | None = None,
+        detect_formats: bool = True,
+        fingerprint: str | None = None,
+    ) -> list[_TypeDescription]:
+        if fingerprint is None:
+            fingerprint = m.mapping_fingerprint(mapping)
+
+        key = ("types", fingerprint, deduplicate, unify_threshold, detect_formats)
+        found_types = self._get(key)
+        if found_types is None:
+            found_types = w.new_found_types(
+                mapping,
+                deduplicate=deduplicate,
+                unify_threshold=unify_threshold,
+                detect_formats=detect_formats,
+            )
+            self._put(key, found_types)
+
+        return found_types
+
+    def render(
+        self,
+        mapping: m.ModelMapping,
+        *,
+        dump_format: w.DumpFormat = "TypedDict",
+        options: dict | None = None,
+        deduplicate: bool = True,
+        unify_threshold: float | None = None,
+        detect_formats: bool = True,
+        fingerprint: str | None = None,
+    ) -> str:
+        if fingerprint is None:
+            fingerprint = m.mapping_fingerprint(mapping)
+
+        key = (
+            "output",
+            fingerprint,
+            deduplicate,
+            unify_threshold,
+            detect_formats,
+            dump_format,
+            json.dumps(options, sort_keys=True),
+        )
+        text = self._get(key)
+        if text is None:
+            found_types = self.found_types(
+                mapping,
+                deduplicate=deduplicate,
+                unify_threshold=unify_threshold,
+                detect_formats=detect_formats,
+                fingerprint=fingerprint,
+            )
+            text = "".join(
+                w.iter_model_chunks(
+                    found_types, dump_format=dump_format, options=options
+                )
+            )
+            self._put(key, text)
+
+        return text
+
+    def dump_model(
+        self,
+        mapping: m.ModelMapping,
+        output: w.OutputSink,
+        *,
+        dump_format: w.DumpFormat = "TypedDict",
+        options: dict | None = None,
+        fingerprint: str | None = None,
+    ):
+        """Cached counterpart of 'writers.dump_model'."""
+        output.write(
+            self.render(
+                mapping,
+                dump_format=dump_format,
+                options=options,
+                fingerprint=fingerprint,
+            )
+        )
+
+    def _get(self, key: Hashable) -> Any:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.stats.misses += 1
+            else:
+                self.stats.hits += 1
+                self._entries.move_to_end(key)
+
+            return value
+
+    def _put(self, key: Hashable, value: Any):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
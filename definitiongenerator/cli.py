@@ -0,0 +1,432 @@
+"""Command line entry point.
+
+Infers a single model from any number of sample files and writes it in one
+or more formats, for instance:
+
+    python -m definitiongenerator "responses/**/*.json" \\
+        --format TypedDict=out/models.py --format CSharp=out/Models.cs \\
+        --namespace Company.Contracts
+
+With '--stream' files are read incrementally and only the mapping is kept in
+memory, never a whole document, so files larger than the available memory
+can be inferred.
+
+Newline delimited JSON files ('--ndjson') are split into line ranges which
+are inferred by '--processes' worker processes.
+
+Inputs which are http(s) URLs are pages of paginated APIs, next pages are
+fetched and inferred until the types stop changing (see 'crawler').
+
+With '--watch' the inputs are polled and the outputs are regenerated when
+they change; only changed files are inferred again and only outputs whose
+content changed are written (see 'watch').
+
+The type model is created once and shared by all formats. Input files are
+read and parsed by a pool of threads ahead of the inference, outputs are
+written concurrently.
+"""
+import argparse
+import asyncio
+import glob
+import os
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+import definitiongenerator.crawler as cr
+import definitiongenerator.jsonbackend as jb
+import definitiongenerator.model as m
+import definitiongenerator.parallel as par
+import definitiongenerator.snapshot as snap
+import definitiongenerator.watch as wt
+import definitiongenerator.writers as w
+
+DEFAULT_OUTPUT_NAMES = {
+    "TypedDict": "models.py",
+    "Markdown": "models.md",
+    "CSharp": "Models.cs",
+    "C#": "Models.cs",
+    "Validators": "validators.py",
+    "Dataclasses": "dataclasses_models.py",
+    "Msgspec": "msgspec_models.py",
+}
+
+_DEFAULT_THREADS = min(32, (os.cpu_count() or 1) + 4)
+
+
+def expand_inputs(patterns: Iterable[str]) -> list[str]:
+    """Expands glob patterns, keeps the order and drops duplicates."""
+    paths: list[str] = []
+    for pattern in patterns:
+        if any(c in pattern for c in "*?["):
+            paths.extend(sorted(glob.glob(pattern, recursive=True)))
+        else:
+            paths.append(pattern)
+
+    return list(dict.fromkeys(paths))
+
+
+def iter_documents(
+    paths: list[str], threads: int, json_backend: str | None = None
+) -> Iterator[Any]:
+    """
+    Yields parsed files in the input order. Files are read by a thread pool
+    at most '2 * threads' files ahead, so memory use does not depend on the
+    number of files.
+    """
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        pending: deque[Future] = deque()
+        for p in paths:
+            pending.append(executor.submit(jb.load_file, p, json_backend))
+            if len(pending) >= 2 * threads:
+                yield pending.popleft().result()
+
+        while pending:
+            yield pending.popleft().result()
+
+
+def infer_from_paths(
+    paths: list[str],
+    *,
+    threads: int = _DEFAULT_THREADS,
+    processes: int = 1,
+    options: m.InferenceOptions | None = None,
+    mapping: m.ModelMapping | None = None,
+    ndjson: bool = False,
+    stream: bool = False,
+    json_backend: str | None = None,
+) -> m.ModelMapping | None:
+    """
+    Folds every file into the 'mapping' (None -> new mapping). With 'ndjson'
+    every line of every file is a sample. With 'stream' files are read one by
+    one and incrementally, in this process.
+    """
+    if stream:
+        for p in paths:
+            with open(p, "rb") as f:
+                partial = m.new_mapping_model_from_stream(f, options=options)
+            mapping = partial if mapping is None else m.merge_mappings(mapping, partial)
+
+        return mapping
+
+    if ndjson:
+        for p in paths:
+            partial = par.infer_from_ndjson(
+                p, workers=processes, options=options, json_backend=json_backend
+            )
+            mapping = partial if mapping is None else m.merge_mappings(mapping, partial)
+
+        return mapping
+
+    if processes > 1 and len(paths) > 0:
+        partial = par.infer_from_files(
+            paths, workers=processes, options=options, json_backend=json_backend
+        )
+        return partial if mapping is None else m.merge_mappings(mapping, partial)
+
+    for document in iter_documents(paths, threads, json_backend):
+        if mapping is None:
+            mapping = m.new_mapping_model(document, options)
+        else:
+            mapping = m._update_mapping(mapping, document, options)
+
+    return mapping
+
+
+def _parse_target(value: str) -> tuple[str, str | None]:
+    (dump_format, _, path) = value.partition("=")
+    if dump_format not in DEFAULT_OUTPUT_NAMES:
+        raise argparse.ArgumentTypeError(
+            f"unknown format '{dump_format}', "
+            f"expected one of: {', '.join(DEFAULT_OUTPUT_NAMES)}"
+        )
+
+    return (dump_format, path or None)
+
+
+def _write_output(
+    found_types: list, dump_format: w.DumpFormat, path: Path, options: dict | None
+) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        w.write_model(found_types, f, dump_format=dump_format, options=options)
+
+    return path
+
+
+def _new_argument_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m definitiongenerator",
+        description="Generates typed models from sample JSON documents.",
+    )
+    parser.add_argument(
+        "inputs",
+        nargs="*",
+        metavar="INPUT",
+        help=(
+            "JSON files or glob patterns, every file is one sample of the model; "
+            "http(s) URLs are crawled following next page links"
+        ),
+    )
+    parser.add_argument(
+        "-f",
+        "--format",
+        dest="targets",
+        action="append",
+        type=_parse_target,
+        metavar="FORMAT[=PATH]",
+        help=(
+            f"output format ({', '.join(DEFAULT_OUTPUT_NAMES)}) and optionally "
+            "the output file; can be repeated (default: TypedDict)"
+        ),
+    )
+    parser.add_argument(
+        "-o",
+        "--output-dir",
+        default=".",
+        help="directory of outputs without an explicit path (default: .)",
+    )
+    parser.add_argument(
+        "--namespace", default="Generated", help="namespace of C# classes"
+    )
+    parser.add_argument(
+        "--new-style-namespace",
+        action="store_true",
+        help="use file scoped C# namespace",
+    )
+    parser.add_argument(
+        "--threads",
+        type=int,
+        default=_DEFAULT_THREADS,
+        help=f"threads reading inputs and writing outputs (default: "
+        f"{_DEFAULT_THREADS})",
+    )
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=1,
+        help="infer in this many worker processes (default: 1)",
+    )
+    parser.add_argument(
+        "--ndjson",
+        action="store_true",
+        help="inputs are newline delimited JSON, every line is one sample",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="read input files incrementally, documents are never loaded "
+        "whole (slower, for files larger than the memory)",
+    )
+    parser.add_argument(
+        "--json-backend",
+        choices=jb.BACKENDS,
+        help="library parsing the inputs (default: the fastest installed one)",
+    )
+    parser.add_argument(
+        "--no-deduplicate",
+        dest="deduplicate",
+        action="store_false",
+        help="write structurally equal types reached from different paths",
+    )
+    parser.add_argument(
+        "--unify-threshold",
+        type=float,
+        metavar="FRACTION",
+        help=(
+            "unify types whose properties are a subset of another type's, when "
+            "they differ in at most this fraction of properties"
+        ),
+    )
+    parser.add_argument(
+        "--no-formats",
+        dest="detect_formats",
+        action="store_false",
+        help="write string fields as strings, without detecting enums, dates, "
+        "UUIDs, URLs and numbers in their samples",
+    )
+    parser.add_argument(
+        "--next-page-key",
+        default=cr.CrawlOptions.next_page_key,
+        help="property with the next page URL of crawled inputs (default: "
+        "%(default)s)",
+    )
+    parser.add_argument(
+        "--stable-pages",
+        type=int,
+        default=cr.CrawlOptions.stable_pages,
+        help="stop crawling after this many pages without a type change, 0 "
+        "never stops (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--max-pages", type=int, help="stop crawling after this many pages"
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=cr.CrawlOptions.concurrency,
+        help="requests of crawled inputs in flight (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="regenerate the outputs whenever input files change, until "
+        "interrupted",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=1.0,
+        help="seconds between checks of the inputs in watch mode (default: "
+        "%(default)s)",
+    )
+    parser.add_argument(
+        "--snapshot",
+        type=Path,
+        help="mapping snapshot to continue from (if it exists) and to update",
+    )
+    parser.add_argument(
+        "--string-sample-limit",
+        type=int,
+        default=m.InferenceOptions().string_sample_limit,
+        help="distinct string values kept as samples of a field",
+    )
+    return parser
+
+
+def _new_targets(args: argparse.Namespace) -> list[wt.WatchTarget]:
+    format_options = {
+        "CSharp": {
+            "Namespace": args.namespace,
+            "NewStyleNamespace": args.new_style_namespace,
+        },
+    }
+    format_options["C#"] = format_options["CSharp"]
+
+    targets = []
+    for dump_format, path in args.targets or [("TypedDict", None)]:
+        if path is None:
+            path = Path(args.output_dir) / DEFAULT_OUTPUT_NAMES[dump_format]
+
+        targets.append(
+            wt.WatchTarget(dump_format, Path(path), format_options.get(dump_format))
+        )
+
+    return targets
+
+
+def _watch(
+    args: argparse.Namespace,
+    targets: list[wt.WatchTarget],
+    options: m.InferenceOptions,
+    mapping: m.ModelMapping | None,
+) -> int:
+    def on_refresh(result: wt.RefreshResult):
+        for p, error in result.failed.items():
+            print(f"{p}: {error}")
+        for path in result.written:
+            print(path)
+
+    watcher = wt.Watcher(
+        lambda: expand_inputs(args.inputs),
+        targets,
+        options=options,
+        json_backend=args.json_backend,
+        deduplicate=args.deduplicate,
+        unify_threshold=args.unify_threshold,
+        detect_formats=args.detect_formats,
+        mapping=mapping,
+    )
+    try:
+        watcher.run(args.interval, on_refresh=on_refresh)
+    except KeyboardInterrupt:
+        pass
+
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = _new_argument_parser()
+    args = parser.parse_args(argv)
+
+    urls = [i for i in args.inputs if i.startswith(("http://", "https://"))]
+    paths = expand_inputs(i for i in args.inputs if i not in urls)
+    mapping = None
+    if args.snapshot is not None and args.snapshot.exists():
+        with open(args.snapshot, "r", encoding="utf-8") as f:
+            mapping = snap.load_mapping(f)
+
+    if len(paths) == 0 and len(urls) == 0 and mapping is None and not args.watch:
+        parser.error("no input files")
+
+    try:
+        jb.get_loads(args.json_backend)
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.watch and (len(urls) > 0 or args.ndjson):
+        parser.error("--watch accepts only JSON files")
+
+    if args.stream and (args.watch or args.ndjson):
+        parser.error("--stream cannot be used with --watch or --ndjson")
+
+    options = m.InferenceOptions(string_sample_limit=args.string_sample_limit)
+    targets = _new_targets(args)
+    if args.watch:
+        return _watch(args, targets, options, mapping)
+
+    mapping = infer_from_paths(
+        paths,
+        threads=args.threads,
+        processes=args.processes,
+        options=options,
+        mapping=mapping,
+        ndjson=args.ndjson,
+        stream=args.stream,
+        json_backend=args.json_backend,
+    )
+    if len(urls) > 0:
+        crawl_options = cr.CrawlOptions(
+            next_page_key=args.next_page_key,
+            stable_pages=args.stable_pages or None,
+            max_pages=args.max_pages,
+            concurrency=args.concurrency,
+        )
+        result = asyncio.run(
+            cr.crawl(
+                urls,
+                options=crawl_options,
+                inference_options=options,
+                json_backend=args.json_backend,
+                mapping=mapping,
+            )
+        )
+        mapping = result.mapping
+        print(f"{result.pages} pages crawled ({result.stop_reason})")
+
+    if mapping is None:
+        parser.error("no samples in the inputs")
+
+    if args.snapshot is not None:
+        args.snapshot.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.snapshot, "w", encoding="utf-8") as f:
+            snap.dump_mapping(mapping, f)
+
+    found_types = w.new_found_types(
+        mapping,
+        deduplicate=args.deduplicate,
+        unify_threshold=args.unify_threshold,
+        detect_formats=args.detect_formats,
+    )
+    with ThreadPoolExecutor(max_workers=args.threads) as executor:
+        futures = [
+            executor.submit(
+                _write_output, found_types, t.dump_format, t.path, t.options
+            )
+            for t in targets
+        ]
+        for future in futures:
+            print(future.result())
+
+    return 0
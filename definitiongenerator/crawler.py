@@ -0,0 +1,272 @@
+"""Inference over pages of paginated HTTP APIs, fetched while inferring.
+
+Starting from one or more URLs the crawler follows the next page link of
+every page (the 'nextPage' property by default) and folds every page into
+a single mapping as soon as it arrives. The next page is requested before
+the current one is folded, so downloads and inference overlap; chains of
+pages of different start URLs are fetched concurrently.
+
+Crawling stops at the end of all chains, after 'max_pages' pages, or when
+the generated types did not change for 'stable_pages' consecutive pages.
+
+Requests are sent over a pool of keep-alive connections by worker threads
+of the event loop ('http.client' only), at most 'concurrency' at a time.
+"""
+import asyncio
+import http.client
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Literal
+from urllib.parse import urljoin, urlsplit
+
+import definitiongenerator.jsonbackend as jb
+import definitiongenerator.model as m
+
+StopReason = Literal["end", "stable", "max_pages"]
+
+
+class CrawlError(Exception):
+    pass
+
+
+@dataclass
+class CrawlOptions:
+    # Property with the URL of the next page, dots separate nested properties
+    next_page_key: str = "nextPage"
+    # Stop when this many consecutive pages did not change the types
+    stable_pages: int | None = 5
+    max_pages: int | None = None
+    # Requests in flight (and open connections per host) at most
+    concurrency: int = 4
+    timeout: float = 30.0
+    headers: dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class CrawlResult:
+    mapping: m.ModelMapping | None
+    pages: int
+    stop_reason: StopReason
+
+
+_Origin = tuple[str, str, int | None]
+
+
+class HttpClient:
+    """
+    GET requests over pooled keep-alive connections. Requests run in worker
+    threads, at most 'max_connections' at a time.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 4,
+        timeout: float = 30.0,
+        headers: dict[str, str] | None = None,
+    ):
+        self.timeout = timeout
+        self.headers = {"Accept": "application/json", **(headers or {})}
+        self.connections_opened = 0
+        self._semaphore = asyncio.Semaphore(max_connections)
+        self._idle: dict[_Origin, list[http.client.HTTPConnection]] = {}
+        self._lock = threading.Lock()
+        self._closed = False
+
+    async def get(self, url: str) -> bytes:
+        async with self._semaphore:
+            return await asyncio.to_thread(self._get, url)
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            idle = [c for connections in self._idle.values() for c in connections]
+            self._idle.clear()
+
+        for connection in idle:
+            connection.close()
+
+    def _get(self, url: str) -> bytes:
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or parts.hostname is None:
+            raise CrawlError(f"Unsupported URL: {url}")
+
+        origin = (parts.scheme, parts.hostname, parts.port)
+        target = parts.path or "/"
+        if parts.query:
+            target += "?" + parts.query
+
+        (connection, reused) = self._acquire(origin)
+        try:
+            connection.request("GET", target, headers=self.headers)
+            response = connection.getresponse()
+            body = response.read()
+        except (http.client.HTTPException, OSError):
+            connection.close()
+            if not reused:
+                raise
+            # the server closed the idle connection, retry on a new one
+            (connection, _) = self._acquire(origin, new=True)
+            try:
+                connection.request("GET", target, headers=self.headers)
+                response = connection.getresponse()
+                body = response.read()
+            except (http.client.HTTPException, OSError):
+                connection.close()
+                raise
+
+        self._release(origin, connection, response.will_close)
+        if response.status >= 400:
+            raise CrawlError(f"GET {url}: HTTP {response.status} {response.reason}")
+
+        return body
+
+    def _acquire(
+        self, origin: _Origin, new: bool = False
+    ) -> tuple[http.client.HTTPConnection, bool]:
+        with self._lock:
+            idle = self._idle.get(origin)
+            if idle and not new:
+                return (idle.pop(), True)
+
+            self.connections_opened += 1
+
+        (scheme, host, port) = origin
+        connection: http.client.HTTPConnection
+        if scheme == "https":
+            connection = http.client.HTTPSConnection(host, port, timeout=self.timeout)
+        else:
+            connection = http.client.HTTPConnection(host, port, timeout=self.timeout)
+
+        return (connection, False)
+
+    def _release(
+        self, origin: _Origin, connection: http.client.HTTPConnection, close: bool
+    ):
+        with self._lock:
+            if not close and not self._closed:
+                self._idle.setdefault(origin, []).append(connection)
+                return
+
+        connection.close()
+
+
+def _next_url(page: Any, key: str, url: str) -> str | None:
+    value = page
+    for name in key.split("."):
+        if type(value) is not dict:
+            return None
+        value = value.get(name)
+
+    if type(value) is not str or value == "":
+        return None
+
+    # relative links are resolved against the page URL
+    return urljoin(url, value)
+
+
+class _Crawl:
+    def __init__(
+        self,
+        client: HttpClient,
+        options: CrawlOptions,
+        inference_options: m.InferenceOptions | None,
+        loads: Callable[[bytes], Any],
+        mapping: m.ModelMapping | None,
+    ):
+        self.client = client
+        self.options = options
+        self.inference_options = inference_options
+        self.loads = loads
+        self.mapping = mapping
+        self.fingerprint = (
+            m.mapping_fingerprint(mapping, structure_only=True)
+            if mapping is not None
+            else None
+        )
+        self.unchanged_pages = 0
+        self.requested: set[str] = set()
+        self.pages = 0
+        self.stop_reason: StopReason | None = None
+
+    def _request(self, url: str) -> asyncio.Task | None:
+        """Starts fetching the page, unless crawling is over or it was fetched."""
+        if self.stop_reason is not None or url in self.requested:
+            return None
+
+        max_pages = self.options.max_pages
+        if max_pages is not None and len(self.requested) >= max_pages:
+            self.stop_reason = "max_pages"
+            return None
+
+        self.requested.add(url)
+        return asyncio.ensure_future(self.client.get(url))
+
+    def _fold(self, page: Any):
+        if self.mapping is None:
+            self.mapping = m.new_mapping_model(page, self.inference_options)
+        else:
+            self.mapping = m._update_mapping(
+                self.mapping, page, self.inference_options
+            )
+        self.pages += 1
+
+        fingerprint = m.mapping_fingerprint(self.mapping, structure_only=True)
+        if fingerprint == self.fingerprint:
+            self.unchanged_pages += 1
+        else:
+            self.fingerprint = fingerprint
+            self.unchanged_pages = 0
+
+        stable_pages = self.options.stable_pages
+        if stable_pages is not None and self.unchanged_pages >= stable_pages:
+            self.stop_reason = self.stop_reason or "stable"
+
+    async def follow(self, url: str):
+        pending = self._request(url)
+        while pending is not None:
+            page = self.loads(await pending)
+            next_url = _next_url(page, self.options.next_page_key, url)
+            pending = None
+            if next_url is not None:
+                pending = self._request(next_url)
+                url = next_url
+
+            self._fold(page)
+            if self.stop_reason is not None and pending is not None:
+                pending.cancel()
+                return
+
+
+async def crawl(
+    start_urls: list[str],
+    *,
+    options: CrawlOptions | None = None,
+    inference_options: m.InferenceOptions | None = None,
+    json_backend: str | None = None,
+    mapping: m.ModelMapping | None = None,
+    client: HttpClient | None = None,
+) -> CrawlResult:
+    """
+    Folds pages reachable from the 'start_urls' into the 'mapping' (None ->
+    new mapping). 'client' is closed only when it is created here.
+    """
+    options = options or CrawlOptions()
+    own_client = client is None
+    if client is None:
+        client = HttpClient(options.concurrency, options.timeout, options.headers)
+
+    state = _Crawl(
+        client, options, inference_options, jb.get_loads(json_backend), mapping
+    )
+    chains = [asyncio.ensure_future(state.follow(url)) for url in start_urls]
+    try:
+        await asyncio.gather(*chains)
+    except BaseException:
+        for chain in chains:
+            chain.cancel()
+        raise
+    finally:
+        if own_client:
+            client.close()
+
+    return CrawlResult(state.mapping, state.pages, state.stop_reason or "end")
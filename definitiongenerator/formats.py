@@ -0,0 +1,94 @@
+"""Formats of string fields, detected from their bounded samples.
+
+Detection runs when the types are created from a mapping, it looks only at
+the sampled values of a field (at most 'string_sample_limit' of them), so
+it costs the same for any number of documents. A format is assigned only
+when every sampled value matches it:
+    - "datetime", "date": ISO 8601 date and time ("T" separated) or date
+    - "uuid"
+    - "url": absolute http(s) URLs
+    - "integer", "number": numbers in strings, without leading zeros
+    - "enum": few distinct identifier-like values, each seen repeatedly;
+      only when all distinct values are known (the sample is exact)
+"""
+import re
+from datetime import date, datetime
+from typing import Callable, Literal
+
+import definitiongenerator.sketches as sk
+
+StringFormat = Literal["datetime", "date", "uuid", "url", "integer", "number", "enum"]
+
+# Enums have at most this many values and every value is seen at least
+# '_MIN_ENUM_REPEATS' times on average, so ids seen once are not enums
+MAX_ENUM_VALUES = 16
+_MIN_ENUM_REPEATS = 2
+
+# Only the extended ISO 8601 format parsed by System.Text.Json, other date
+# times ("2020-01-01 10:00") are strings
+_DATETIME = re.compile(
+    r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}(:\d{2}(\.\d{1,9})?)?(Z|[+-]\d{2}:\d{2})?",
+    re.ASCII,
+)
+_DATE = re.compile(r"\d{4}-\d{2}-\d{2}", re.ASCII)
+_UUID = re.compile(
+    r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}"
+)
+_URL = re.compile(r"https?://[^\s/?#]+[^\s]*", re.IGNORECASE)
+# Integers have up to 18 digits, so they fit 64 bit integers, and numbers up
+# to 15 digits before the point, which doubles represent exactly
+_INTEGER = re.compile(r"-?(0|[1-9]\d{0,17})", re.ASCII)
+_NUMBER = re.compile(r"-?(0|[1-9]\d{0,14})(\.\d+)?([eE][+-]?\d+)?", re.ASCII)
+_ENUM_VALUE = re.compile(r"[^\W\d_][\w.\-]{0,63}")
+
+
+def _all_parse(parse: Callable[[str], object], values: list[str]) -> bool:
+    try:
+        for v in values:
+            parse(v)
+    except ValueError:
+        return False
+
+    return True
+
+
+# Formats in the order they are tried, the most specific first: format,
+# matcher and a parser checking the values further (days of months and so on)
+_MATCHERS: list[tuple[StringFormat, Callable, Callable | None]] = [
+    # 'fromisoformat' of Python 3.11 accepts "Z"
+    ("datetime", _DATETIME.fullmatch, datetime.fromisoformat),
+    ("date", _DATE.fullmatch, date.fromisoformat),
+    ("uuid", _UUID.fullmatch, None),
+    ("url", _URL.fullmatch, None),
+    ("integer", _INTEGER.fullmatch, None),
+    ("number", _NUMBER.fullmatch, None),
+]
+
+
+def _is_enum(samples: sk.StringReservoir, values: list[str]) -> bool:
+    return (
+        samples.is_exact
+        and len(values) <= MAX_ENUM_VALUES
+        and samples.observed_count >= _MIN_ENUM_REPEATS * len(values)
+        and all(map(_ENUM_VALUE.fullmatch, values))
+    )
+
+
+def detect_format(
+    samples: sk.StringReservoir | None, values: list[str] | None = None
+) -> StringFormat | None:
+    """
+    Format all sampled values of a string field have, if any. 'values' are
+    the sampled values, when they are already known.
+    """
+    if samples is None or len(samples.values) == 0:
+        return None
+
+    if values is None:
+        values = samples.sample_values()
+
+    for string_format, matches, parse in _MATCHERS:
+        if all(map(matches, values)) and (parse is None or _all_parse(parse, values)):
+            return string_format
+
+    return "enum" if _is_enum(samples, values) else None
@@ -0,0 +1,82 @@
+"""Parsing of JSON samples with the fastest installed JSON library.
+
+Backends parse directly from bytes, so files are read without decoding them
+to str first. Supported backends, in the order of preference: 'orjson',
+'simdjson' (pysimdjson), 'ujson' and the standard library 'json', which is
+always available.
+
+All backends create mappings identical to the ones created from 'json'
+results. Documents the faster libraries reject but 'json' accepts (integers
+above 64 bits, NaN and Infinity) are parsed again with 'json'.
+
+Backends are selected by name, so the selection can be passed to worker
+processes.
+"""
+import importlib
+import json
+from pathlib import Path
+from typing import Any, Callable
+
+# Backends are named after their modules, in the order of preference
+BACKENDS = ("orjson", "simdjson", "ujson", "json")
+
+# None for backends which are not installed
+_loads_by_name: dict[str, Callable[[bytes], Any] | None] = {}
+
+
+def _with_fallback(loads: Callable[[bytes], Any]) -> Callable[[bytes], Any]:
+    def loads_or_fallback(data: bytes) -> Any:
+        try:
+            return loads(data)
+        except (ValueError, OverflowError):
+            # raises the error of 'json' if the document is invalid
+            return json.loads(data)
+
+    return loads_or_fallback
+
+
+def available_backends() -> list[str]:
+    """Names of installed backends, the preferred first."""
+    return [name for name in BACKENDS if _find_loads(name) is not None]
+
+
+def _find_loads(name: str) -> Callable[[bytes], Any] | None:
+    if name in _loads_by_name:
+        return _loads_by_name[name]
+
+    try:
+        module = importlib.import_module(name)
+    except ImportError:
+        loads = None
+    else:
+        loads = module.loads if name == "json" else _with_fallback(module.loads)
+
+    _loads_by_name[name] = loads
+    return loads
+
+
+def get_loads(backend: str | None = None) -> Callable[[bytes], Any]:
+    """
+    Function parsing JSON bytes with the 'backend', the preferred installed
+    backend when None.
+    """
+    if backend is None:
+        # the standard library "json" is always available
+        backend = available_backends()[0]
+
+    if backend not in BACKENDS:
+        raise ValueError(
+            f"Unknown JSON backend '{backend}', expected one of: "
+            f"{', '.join(BACKENDS)}"
+        )
+
+    loads = _find_loads(backend)
+    if loads is None:
+        raise ValueError(f"JSON backend '{backend}' is not installed")
+
+    return loads
+
+
+def load_file(path: str | Path, backend: str | None = None) -> Any:
+    with open(path, "rb") as f:
+        return get_loads(backend)(f.read())
@@ -0,0 +1,223 @@
+"""Incremental JSON tokenizer.
+
+The tokenizer reads a JSON document from a file object chunk by chunk and
+turns it into a flat stream of parse events. Only the current chunk and the
+token being parsed are kept in memory, so documents much larger than the
+available RAM can be inspected.
+
+Events are '(kind, value)' tuples:
+- ("start_map", None), ("map_key", <str>), ("end_map", None)
+- ("start_array", None), ("end_array", None)
+- ("value", <str | int | float | bool | None>)
+"""
+import codecs
+import re
+from json.decoder import scanstring  # type: ignore[attr-defined]
+from json.scanner import NUMBER_RE
+from typing import IO, Any, Iterator, Literal, Tuple
+
+EventKind = Literal[
+    "start_map", "map_key", "end_map", "start_array", "end_array", "value"
+]
+JsonEvent = Tuple[EventKind, Any]
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_SCALAR_CHARS = re.compile(r"[-+.0-9A-Za-z]*")
+_CONSTANTS = {
+    "true": True,
+    "false": False,
+    "null": None,
+    "NaN": float("nan"),
+    "Infinity": float("inf"),
+    "-Infinity": float("-inf"),
+}
+
+# What the tokenizer expects to see next
+_VALUE = 0
+_VALUE_OR_END = 1  # right after '['
+_KEY = 2
+_KEY_OR_END = 3  # right after '{'
+_COLON = 4
+_COMMA_OR_END = 5
+_DONE = 6
+
+
+class _Buffer:
+    """Sliding window over the input; text and binary files are supported."""
+
+    def __init__(self, fp: IO, chunk_size: int):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.text = ""
+        self.pos = 0
+        self.offset = 0  # number of characters dropped from the window
+        self.eof = False
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+
+    def fill(self) -> bool:
+        """Reads next chunk, returns False when there is nothing more to read."""
+        if self.eof:
+            return False
+
+        chunk = self.fp.read(self.chunk_size)
+        if isinstance(chunk, (bytes, bytearray, memoryview)):
+            raw = chunk
+            chunk = self._decoder.decode(raw, final=len(raw) == 0)
+            while len(chunk) == 0 and len(raw) > 0:
+                # chunk ended in the middle of a multi-byte character
+                raw = self.fp.read(self.chunk_size)
+                chunk = self._decoder.decode(raw, final=len(raw) == 0)
+
+        if len(chunk) == 0:
+            self.eof = True
+            return False
+
+        self.offset += self.pos
+        self.text = self.text[self.pos :] + chunk
+        self.pos = 0
+        return True
+
+    def skip_whitespace(self) -> bool:
+        """Moves to the next non whitespace char, returns False at the end of input."""
+        while True:
+            # the pattern matches empty strings too, so it always matches
+            match = _WHITESPACE.match(self.text, self.pos)
+            self.pos = match.end()  # type: ignore[union-attr]
+            if self.pos < len(self.text):
+                return True
+
+            if not self.fill():
+                return False
+
+    def error(self, message: str) -> ValueError:
+        return ValueError(f"Invalid JSON: {message} (char {self.offset + self.pos})")
+
+
+def _read_string(b: _Buffer) -> str:
+    # Find the closing quote first so that 'scanstring' always gets a complete token
+    search_from = b.pos + 1
+    while True:
+        end = b.text.find('"', search_from)
+        if end < 0:
+            search_from = len(b.text) - b.pos
+            if not b.fill():
+                raise b.error("Unterminated string")
+            search_from += b.pos
+            continue
+
+        backslashes = 0
+        while b.text[end - 1 - backslashes] == "\\":
+            backslashes += 1
+
+        if backslashes % 2 == 0:
+            break
+
+        search_from = end + 1
+
+    try:
+        value, b.pos = scanstring(b.text, b.pos + 1, True)
+    except ValueError as e:
+        raise b.error(str(e)) from e
+
+    return value
+
+
+def _read_number_or_constant(b: _Buffer) -> Any:
+    # Make sure the whole token is in the window before parsing it; the
+    # pattern matches empty strings too, so it always matches
+    while True:
+        match = _SCALAR_CHARS.match(b.text, b.pos)
+        if match.end() < len(b.text) or not b.fill():  # type: ignore[union-attr]
+            break
+
+    match = NUMBER_RE.match(b.text, b.pos)
+    if match is not None:
+        integer, frac, exp = match.groups()
+        b.pos = match.end()
+        if frac or exp:
+            return float(integer + (frac or "") + (exp or ""))
+        return int(integer)
+
+    for literal, value in _CONSTANTS.items():
+        if b.text.startswith(literal, b.pos):
+            b.pos += len(literal)
+            return value
+
+    raise b.error("Expecting value")
+
+
+def iter_events(fp: IO, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[JsonEvent]:
+    """Yields parse events of a single JSON document read from 'fp'."""
+    b = _Buffer(fp, chunk_size)
+    containers: list[str] = []
+    expected = _VALUE
+
+    while b.skip_whitespace():
+        c = b.text[b.pos]
+
+        if expected == _DONE:
+            raise b.error("Extra data")
+
+        if expected == _COLON:
+            if c != ":":
+                raise b.error("Expecting ':' delimiter")
+            b.pos += 1
+            expected = _VALUE
+            continue
+
+        if expected == _COMMA_OR_END:
+            if c == ",":
+                b.pos += 1
+                expected = _KEY if containers[-1] == "{" else _VALUE
+                continue
+            # closing bracket is handled below
+            if c not in "]}":
+                raise b.error("Expecting ',' delimiter")
+
+        if c == "}" or c == "]":
+            opening = "{" if c == "}" else "["
+            if expected not in (_COMMA_OR_END, _VALUE_OR_END, _KEY_OR_END) or (
+                containers[-1] != opening
+            ):
+                raise b.error(f"Unexpected '{c}'")
+            b.pos += 1
+            containers.pop()
+            expected = _COMMA_OR_END if containers else _DONE
+            yield ("end_map" if c == "}" else "end_array", None)
+            continue
+
+        if expected == _KEY or expected == _KEY_OR_END:
+            if c != '"':
+                raise b.error("Expecting property name enclosed in double quotes")
+            key = _read_string(b)
+            expected = _COLON
+            yield ("map_key", key)
+            continue
+
+        # a value is expected
+        if c == "{":
+            b.pos += 1
+            containers.append("{")
+            expected = _KEY_OR_END
+            yield ("start_map", None)
+            continue
+
+        if c == "[":
+            b.pos += 1
+            containers.append("[")
+            expected = _VALUE_OR_END
+            yield ("start_array", None)
+            continue
+
+        if c == '"':
+            value = _read_string(b)
+        else:
+            value = _read_number_or_constant(b)
+
+        expected = _COMMA_OR_END if containers else _DONE
+        yield ("value", value)
+
+    if expected != _DONE:
+        raise b.error("Unexpected end of input")
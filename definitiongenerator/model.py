@@ -1,27 +1,128 @@
+import copy
+import hashlib
+import random
+import sys
+from collections import Counter
 from dataclasses import field, dataclass
-from typing import Any, Optional
+from itertools import chain, islice
+from operator import itemgetter
+from types import NoneType
+from typing import (
+    IO,
+    TYPE_CHECKING,
+    Any,
+    Iterable,
+    Iterator,
+    Literal,
+    Optional,
+    overload,
+)
+
+import definitiongenerator.jsonstream as js
+import definitiongenerator.sketches as sk
+
+if TYPE_CHECKING:
+    from definitiongenerator.profiling import InferenceProfiler
+
+
+ListSamplingMode = Literal["all", "first", "stride", "reservoir", "until_stable"]
+
+
+@dataclass
+class ListSamplingPolicy:
+    """Selects which elements of a list are used to infer the element mapping.
+
+    - all: every element
+    - first: the first 'size' elements
+    - stride: every 'size'-th element
+    - reservoir: 'size' randomly chosen elements (in their original order)
+    - until_stable: elements until 'size' consecutive elements did not add
+        anything new to the mapping
+    """
+
+    mode: ListSamplingMode = "all"
+    size: int = 1000
+    seed: int | None = None
 
 
 @dataclass
+class InferenceStats:
+    # Objects whose shape was already merged into the mapping (and were not)
+    shape_cache_hits: int = 0
+    shape_cache_misses: int = 0
+    # Number of mapping nodes created so far
+    created_mappings: int = 0
+
+
+@dataclass
+class InferenceOptions:
+    # Maximum number of distinct string values kept as samples of a field
+    string_sample_limit: int = sk.DEFAULT_SAMPLE_LIMIT
+    # Skip type checks for objects with a shape that was already merged
+    shape_cache: bool = True
+    # Fold long lists column by column, see '_fold_columns'
+    columnar: bool = True
+    list_sampling: ListSamplingPolicy = field(default_factory=ListSamplingPolicy)
+    stats: InferenceStats = field(default_factory=InferenceStats)
+    # Collects per-path statistics, see 'profiling'; None -> not profiled
+    profiler: Optional["InferenceProfiler"] = None
+
+
+@dataclass(slots=True)
 class SimpleMapping:
     value_type: type
-    string_value_set: set[str] = field(default_factory=set)
+    # None -> if value type is not 'str'
+    string_samples: sk.StringReservoir | None = None
 
+    @property
+    def string_value_set(self) -> set[str]:
+        if self.string_samples is None:
+            return set()
 
-@dataclass
+        return self.string_samples.values
+
+    def add_string(self, v: str, options: InferenceOptions):
+        if self.string_samples is None:
+            self.string_samples = sk.StringReservoir(limit=options.string_sample_limit)
+
+        self.string_samples.add(v)
+
+    def add_strings(self, values: list[str], options: InferenceOptions):
+        if self.string_samples is None:
+            self.string_samples = sk.StringReservoir(limit=options.string_sample_limit)
+
+        self.string_samples.update(values)
+
+
+@dataclass(slots=True)
 class ListMapping:
     # None -> if list was always empty
     element_mapping: Optional["ModelMapping"]
+    # Number of elements used to create the element mapping and skipped
+    # because of the list sampling policy
+    inspected_count: int = 0
+    skipped_count: int = 0
 
 
-@dataclass
+@dataclass(slots=True)
 class AlternativesMapping:
-    alternatives: list["ModelMapping"]
+    # Alternatives indexed by kind: simple value type, 'list' or 'dict'
+    alternatives: dict[type, "ModelMapping"]
 
 
-@dataclass
+@dataclass(slots=True)
 class ObjectMapping:
+    # Properties with at least one non null value
     properties: dict[str, "ModelMapping"]
+    # Number of objects folded into the mapping, the number of objects each
+    # property was present in (null values included) and was null in
+    object_count: int = 0
+    presence_counts: Counter[str] = field(default_factory=Counter)
+    null_counts: dict[str, int] = field(default_factory=dict)
+    # Shapes of objects already merged into this mapping, see '_fold_known_shape'
+    shapes: dict[tuple, "_KnownShape"] | None = field(
+        default=None, repr=False, compare=False
+    )
 
 
 ModelMapping = SimpleMapping | ListMapping | ObjectMapping | AlternativesMapping
@@ -38,32 +139,594 @@ a base for generating a typed model of a JSON object.
 # - type is object
 
 
+def _mapping_kind(mapping: ModelMapping) -> type:
+    """Kind of a mapping, the same as the type of values it was created from."""
+    if isinstance(mapping, SimpleMapping):
+        return mapping.value_type
+
+    if isinstance(mapping, ListMapping):
+        return list
+
+    if isinstance(mapping, ObjectMapping):
+        return dict
+
+    raise TypeError(f"Mapping of type {type(mapping)} has no single kind")
+
+
+def _new_alternatives_mapping(
+    current_mapping: ModelMapping, new_mapping: ModelMapping
+) -> AlternativesMapping:
+    return AlternativesMapping(
+        alternatives={
+            _mapping_kind(current_mapping): current_mapping,
+            _mapping_kind(new_mapping): new_mapping,
+        }
+    )
+
+
 def _is_simple_type(t: type):
     return (t is bool) or (t is int) or (t is float) or (t is str)
 
 
-def _new_list_mapping(v: list):
-    if len(v) == 0:
-        return ListMapping(element_mapping=None)
+def _update_simple_mapping(
+    current_mapping: ModelMapping | None,
+    v: Any,
+    v_type: type,
+    options: InferenceOptions,
+) -> ModelMapping:
+    """Folds a simple value into the 'current_mapping' (None -> no mapping yet)."""
+    if isinstance(current_mapping, SimpleMapping) and (
+        current_mapping.value_type is v_type
+    ):
+        if v_type is str:
+            current_mapping.add_string(v, options)
+
+        return current_mapping
+
+    if isinstance(current_mapping, AlternativesMapping):
+        alternatives = current_mapping.alternatives
+        alternatives[v_type] = _update_simple_mapping(
+            alternatives.get(v_type), v, v_type, options
+        )
+        return current_mapping
+
+    if not _is_simple_type(v_type):
+        raise Exception(f"Creation of mapping for type {v_type} is not implemented.")
+
+    options.stats.created_mappings += 1
+    mapping = SimpleMapping(value_type=v_type)
+    if v_type is str:
+        mapping.add_string(v, options)
+
+    if current_mapping is None:
+        return mapping
 
-    element_mapping = new_mapping_model(v[0])
-    for element in v[1:]:
-        _update_mapping(element_mapping, element)
+    return _new_alternatives_mapping(current_mapping, mapping)
 
-    return ListMapping(element_mapping=element_mapping)
 
+@overload
+def _enter_container(
+    current_mapping: ModelMapping | None, v_type: type[dict], options: InferenceOptions
+) -> tuple[ModelMapping, ObjectMapping]:
+    ...
 
-def _new_object_mapping(v: dict):
-    property_mappings: dict[str, ModelMapping] = dict()
-    for k, v in v.items():
-        if v is None:
+
+@overload
+def _enter_container(
+    current_mapping: ModelMapping | None, v_type: type[list], options: InferenceOptions
+) -> tuple[ModelMapping, ListMapping]:
+    ...
+
+
+@overload
+def _enter_container(
+    current_mapping: ModelMapping | None, v_type: type, options: InferenceOptions
+) -> tuple[ModelMapping, ObjectMapping | ListMapping]:
+    ...
+
+
+def _enter_container(
+    current_mapping: ModelMapping | None, v_type: type, options: InferenceOptions
+) -> tuple[ModelMapping, ObjectMapping | ListMapping]:
+    """
+    Counterpart of '_update_simple_mapping' for a list or a dict. Returns
+    the mapping that should replace the 'current_mapping' and the container
+    mapping to which the content of the value should be added.
+    """
+    container: ObjectMapping | ListMapping
+    if v_type is dict:
+        if isinstance(current_mapping, ObjectMapping):
+            return (current_mapping, current_mapping)
+        container = ObjectMapping(properties=dict())
+    else:
+        if isinstance(current_mapping, ListMapping):
+            return (current_mapping, current_mapping)
+        container = ListMapping(element_mapping=None)
+
+    options.stats.created_mappings += 1
+    if current_mapping is None:
+        return (container, container)
+
+    if isinstance(current_mapping, AlternativesMapping):
+        alternative = current_mapping.alternatives.setdefault(v_type, container)
+        # alternatives are indexed by kind, so it is a container of the kind
+        assert isinstance(alternative, (ObjectMapping, ListMapping))
+        return (current_mapping, alternative)
+
+    return (_new_alternatives_mapping(current_mapping, container), container)
+
+
+# Shape of an object: property names and types of property values
+_Shape = tuple[tuple[str, ...], tuple[type, ...]]
+# String reservoirs, nested containers and null properties of a known shape
+_KnownShape = tuple[
+    list[tuple[str, sk.StringReservoir]],
+    list[tuple[str, ObjectMapping | ListMapping]],
+    list[str],
+]
+
+# Objects with more shapes than this are too irregular to benefit from caching,
+# only the first shapes are remembered
+_MAX_SHAPES_PER_MAPPING = 32
+# For smaller objects computing the shape costs more than it saves
+_MIN_SHAPE_PROPERTIES = 8
+
+# Stack frame of '_fold': a container mapping, an iterator over the content
+# of the value folded into it and, for objects, the shape of the value
+_Frame = tuple[ObjectMapping | ListMapping, Iterator, _Shape | None]
+
+
+def _until_stable(
+    container: ListMapping, v: list, options: InferenceOptions
+) -> Iterator:
+    stats = options.stats
+    stable_size = options.list_sampling.size
+    inspected = 0
+    unchanged = 0
+    for element in v:
+        created_mappings = stats.created_mappings
+        inspected += 1
+        # resumed only after the element was completely folded
+        yield element
+
+        if stats.created_mappings == created_mappings:
+            unchanged += 1
+            if unchanged >= stable_size:
+                break
+        else:
+            unchanged = 0
+
+    container.inspected_count += inspected
+    container.skipped_count += len(v) - inspected
+
+
+def _iter_elements(
+    container: ListMapping,
+    v: list,
+    options: InferenceOptions,
+    columnar_depth: int | None = None,
+) -> Iterator:
+    """
+    Iterates over elements of 'v' selected by the list sampling policy.
+    Long lists are folded right away by '_fold_column' instead, unless
+    'columnar_depth' is None, and then there is nothing to iterate over.
+    """
+    policy = options.list_sampling
+    if (
+        columnar_depth is not None
+        and columnar_depth < _MAX_COLUMNAR_DEPTH
+        and policy.mode == "all"
+        and options.columnar
+        and len(v) >= _MIN_COLUMNAR_VALUES
+    ):
+        container.inspected_count += len(v)
+        container.element_mapping = _fold_column(
+            container.element_mapping, v, options, columnar_depth
+        )
+        return iter(())
+
+    if policy.mode == "all" or (policy.mode != "stride" and len(v) <= policy.size):
+        container.inspected_count += len(v)
+        return iter(v)
+
+    if policy.mode == "until_stable":
+        return _until_stable(container, v, options)
+
+    elements: Iterator
+    if policy.mode == "first":
+        elements = islice(v, policy.size)
+        inspected = policy.size
+    elif policy.mode == "stride":
+        elements = islice(v, 0, None, policy.size)
+        inspected = (len(v) + policy.size - 1) // policy.size
+    elif policy.mode == "reservoir":
+        indexes = random.Random(policy.seed).sample(range(len(v)), policy.size)
+        elements = (v[i] for i in sorted(indexes))
+        inspected = policy.size
+    else:
+        raise ValueError(f"Unknown list sampling mode: {policy.mode}")
+
+    container.inspected_count += inspected
+    container.skipped_count += len(v) - inspected
+    return elements
+
+
+def _push_object(
+    stack: list[_Frame],
+    container: ObjectMapping,
+    v: dict,
+    options: InferenceOptions,
+    columnar_depth: int | None = None,
+) -> bool:
+    """
+    Schedules folding of 'v' into the 'container'. Returns False when 'v'
+    has a known shape and was folded right away.
+    """
+    container.object_count += 1
+    container.presence_counts.update(v.keys())
+    shape = None
+    shapes = container.shapes
+    if options.shape_cache and len(v) >= _MIN_SHAPE_PROPERTIES:
+        shape = (tuple(v), tuple(map(type, v.values())))
+        known_shape = shapes.get(shape) if shapes is not None else None
+        if known_shape is not None:
+            options.stats.shape_cache_hits += 1
+            return _fold_known_shape(
+                stack, container, known_shape, v, options, columnar_depth
+            )
+
+        options.stats.shape_cache_misses += 1
+
+    stack.append((container, iter(v.items()), shape))
+    return True
+
+
+def _fold_known_shape(
+    stack: list[_Frame],
+    container: ObjectMapping,
+    known_shape: _KnownShape,
+    v: dict,
+    options: InferenceOptions,
+    columnar_depth: int | None,
+) -> bool:
+    """
+    Folds an object with a shape that was already merged into the mapping.
+    All properties already have mappings of the right kind, so only string
+    samples have to be updated and nested values folded.
+    """
+    (string_reservoirs, containers, nulls) = known_shape
+    for property_name, reservoir in string_reservoirs:
+        reservoir.add(v[property_name])
+
+    null_counts = container.null_counts
+    for property_name in nulls:
+        null_counts[property_name] = null_counts.get(property_name, 0) + 1
+
+    pushed = False
+    # pushed in reverse so that nested values are folded in document order
+    for property_name, nested in reversed(containers):
+        property_value = v[property_name]
+        if isinstance(nested, ObjectMapping):
+            pushed = (
+                _push_object(stack, nested, property_value, options, columnar_depth)
+                or pushed
+            )
+        else:
+            elements = _iter_elements(nested, property_value, options, columnar_depth)
+            stack.append((nested, elements, None))
+            pushed = True
+
+    return pushed
+
+
+def _remember_shape(container: ObjectMapping, shape: _Shape):
+    shapes = container.shapes
+    if shapes is not None and len(shapes) >= _MAX_SHAPES_PER_MAPPING:
+        return
+
+    string_reservoirs: list[tuple[str, sk.StringReservoir]] = []
+    containers: list[tuple[str, ObjectMapping | ListMapping]] = []
+    nulls: list[str] = []
+    for property_name, property_type in zip(*shape):
+        if property_type is type(None):
+            nulls.append(property_name)
             continue
-        property_mappings[k] = new_mapping_model(v)
 
-    return ObjectMapping(property_mappings)
+        mapping = container.properties[property_name]
+        if isinstance(mapping, AlternativesMapping):
+            mapping = mapping.alternatives[property_type]
+
+        if isinstance(mapping, SimpleMapping):
+            if property_type is str:
+                if mapping.string_samples is None:
+                    return
+                string_reservoirs.append((property_name, mapping.string_samples))
+        elif isinstance(mapping, (ObjectMapping, ListMapping)):
+            containers.append((property_name, mapping))
+
+    if container.shapes is None:
+        container.shapes = dict()
+
+    container.shapes[shape] = (string_reservoirs, containers, nulls)
+
+
+def _fold(
+    current_mapping: ModelMapping | None,
+    v: Any,
+    options: InferenceOptions,
+    columnar_depth: int = 0,
+) -> ModelMapping:
+    """
+    Folds 'v' into the 'current_mapping' (None -> no mapping yet) and returns
+    the updated mapping. Nested values are visited in depth first order with
+    an explicit stack, so the nesting depth is not limited by recursion.
+    'columnar_depth' is the recursion depth of columnar folding.
+    """
+    v_type = type(v)
+    if v_type is not dict and v_type is not list:
+        return _update_simple_mapping(current_mapping, v, v_type, options)
+
+    stack: list[_Frame] = []
+    if v_type is dict:
+        (mapping, root_object) = _enter_container(current_mapping, dict, options)
+        _push_object(stack, root_object, v, options, columnar_depth)
+    else:
+        (mapping, root_list) = _enter_container(current_mapping, list, options)
+        elements = _iter_elements(root_list, v, options, columnar_depth)
+        stack.append((root_list, elements, None))
+
+    while stack:
+        (container, content, _) = stack[-1]
+        if isinstance(container, ObjectMapping):
+            properties = container.properties
+            for property_name, property_value in content:
+                property_type = type(property_value)
+                property_mapping = properties.get(property_name)
+                if property_mapping is None:
+                    # the same names repeat across objects, keep a single copy
+                    property_name = sys.intern(property_name)
+                if property_type is dict:
+                    if type(property_mapping) is ObjectMapping:
+                        nested = property_mapping
+                    else:
+                        (properties[property_name], nested) = _enter_container(
+                            property_mapping, dict, options
+                        )
+                    if _push_object(
+                        stack, nested, property_value, options, columnar_depth
+                    ):
+                        break
+                    continue
+
+                if property_type is list:
+                    (properties[property_name], nested_list) = _enter_container(
+                        property_mapping, list, options
+                    )
+                    elements = _iter_elements(
+                        nested_list, property_value, options, columnar_depth
+                    )
+                    stack.append((nested_list, elements, None))
+                    break
+
+                if (
+                    type(property_mapping) is SimpleMapping
+                    and property_mapping.value_type is property_type
+                ):
+                    # fast path for the most common case
+                    if property_type is str:
+                        property_mapping.add_string(property_value, options)
+                elif property_value is not None:
+                    properties[property_name] = _update_simple_mapping(
+                        property_mapping, property_value, property_type, options
+                    )
+                else:
+                    null_counts = container.null_counts
+                    null_counts[property_name] = null_counts.get(property_name, 0) + 1
+            else:
+                (_, _, shape) = stack.pop()
+                if shape is not None:
+                    _remember_shape(container, shape)
+        else:
+            for element in content:
+                element_type = type(element)
+                if element_type is dict:
+                    element_mapping = container.element_mapping
+                    if type(element_mapping) is ObjectMapping:
+                        nested = element_mapping
+                    else:
+                        (container.element_mapping, nested) = _enter_container(
+                            element_mapping, dict, options
+                        )
+                    if _push_object(stack, nested, element, options, columnar_depth):
+                        break
+                    continue
+
+                if element_type is list:
+                    (container.element_mapping, nested_list) = _enter_container(
+                        container.element_mapping, list, options
+                    )
+                    elements = _iter_elements(
+                        nested_list, element, options, columnar_depth
+                    )
+                    stack.append((nested_list, elements, None))
+                    break
+
+                container.element_mapping = _update_simple_mapping(
+                    container.element_mapping, element, element_type, options
+                )
+            else:
+                stack.pop()
+
+    return mapping
 
 
-def _update_mapping(current_mapping: ModelMapping, v: Any) -> ModelMapping:
+# Lists of at least this many values are folded column by column
+_MIN_COLUMNAR_VALUES = 16
+# Records with more properties than this are transposed row by row
+_MIN_TRANSPOSED_WIDTH = 16
+# Nested lists deeper than this are folded by '_fold' only, so the recursion
+# of columnar folding is bounded
+_MAX_COLUMNAR_DEPTH = 32
+
+
+def _fold_columns(
+    container: ObjectMapping,
+    records: list[dict],
+    options: InferenceOptions,
+    columnar_depth: int,
+):
+    """
+    Folds all 'records' into the 'container' column by column: values of
+    every property are gathered from all of the records and folded together
+    by '_fold_column', so most of the per-value work runs in C (map, count,
+    set operations). Creates the same mapping as folding the records one by
+    one.
+    """
+    count = len(records)
+    container.object_count += count
+    columns = _homogeneous_columns(records)
+    if columns is None:
+        presence: Counter[str] = Counter()
+        presence.update(chain.from_iterable(records))
+        columns = {}
+        for name, present in presence.items():
+            if present == count:
+                columns[name] = list(map(itemgetter(name), records))
+            else:
+                columns[name] = [record[name] for record in records if name in record]
+        container.presence_counts.update(presence)
+    else:
+        container.presence_counts.update(dict.fromkeys(columns, count))
+
+    properties = container.properties
+    null_counts = container.null_counts
+    column_nulls = {}
+    column_kinds = {}
+    for name, column in columns.items():
+        kinds = set(map(type, column))
+        if NoneType in kinds:
+            kinds.discard(NoneType)
+            column_nulls[name] = column.count(None)
+            if len(kinds) == 0:
+                continue
+            columns[name] = [value for value in column if value is not None]
+        column_kinds[name] = kinds
+
+    # New properties and null counts are created in the order their first
+    # not null and null values appear in, the same as when the records are
+    # folded one by one
+    for name in _first_seen(records, column_nulls, null_counts, null=True):
+        null_counts[name] = 0
+    for name, nulls in column_nulls.items():
+        null_counts[name] += nulls
+
+    ordered_names = [name for name in column_kinds if name in properties]
+    ordered_names.extend(_first_seen(records, column_kinds, properties, null=False))
+
+    for name in ordered_names:
+        property_mapping = properties.get(name)
+        kinds = column_kinds[name]
+        if property_mapping is None:
+            name = sys.intern(name)
+        properties[name] = _fold_column(
+            property_mapping, columns[name], options, columnar_depth, kinds
+        )
+
+
+def _first_seen(
+    records: list[dict], names: dict[str, Any], known: dict[str, Any], null: bool
+) -> list[str]:
+    """
+    'names' which are not 'known', in the order their first null (or not
+    null) values appear in the records.
+    """
+    new_names = set(name for name in names if name not in known)
+    ordered_names = []
+    for record in records:
+        if len(new_names) == 0:
+            break
+        for name, value in record.items():
+            if (value is None) is null and name in new_names:
+                new_names.discard(name)
+                ordered_names.append(name)
+
+    return ordered_names
+
+
+def _homogeneous_columns(records: list[dict]) -> dict[str, list] | None:
+    """Columns of the records if all of them have the same properties."""
+    first = records[0]
+    if set(map(len, records)) != {len(first)}:
+        return None
+
+    if len(first) > _MIN_TRANSPOSED_WIDTH and len(set(map(tuple, records))) == 1:
+        # wide records with the same properties in the same order are
+        # transposed row by row, reading column by column misses the cache
+        values = zip(*map(dict.values, records))
+        return dict(zip(first, map(list, values)))
+
+    try:
+        # every record has all properties of the first one and no others
+        return {name: list(map(itemgetter(name), records)) for name in first}
+    except KeyError:
+        return None
+
+
+def _fold_column(
+    current_mapping: ModelMapping | None,
+    values: list,
+    options: InferenceOptions,
+    columnar_depth: int,
+    kinds: set[type] | None = None,
+) -> ModelMapping:
+    """
+    Folds not null 'values', for instance elements of a list or values of a
+    property, kind by kind in the order the kinds first appear in. 'kinds'
+    are types of the values, when they are already known.
+    """
+    mapping = current_mapping
+    if kinds is None:
+        kinds = set(map(type, values))
+    ordered_kinds: Iterable[type] = kinds
+    if len(kinds) > 1:
+        ordered_kinds = dict.fromkeys(map(type, values))
+
+    for kind in ordered_kinds:
+        if len(kinds) == 1:
+            same_kind = values
+        else:
+            same_kind = [value for value in values if type(value) is kind]
+
+        if kind is dict:
+            (mapping, nested) = _enter_container(mapping, dict, options)
+            if columnar_depth + 1 < _MAX_COLUMNAR_DEPTH:
+                _fold_columns(nested, same_kind, options, columnar_depth + 1)
+            else:
+                for value in same_kind:
+                    _fold(nested, value, options, columnar_depth + 1)
+        elif kind is list:
+            (mapping, nested_list) = _enter_container(mapping, list, options)
+            # lists of a column folded one after another are the same as a
+            # single list of all of their elements
+            elements = list(chain.from_iterable(same_kind))
+            _fold(nested_list, elements, options, columnar_depth + 1)
+        else:
+            mapping = _update_simple_mapping(mapping, same_kind[0], kind, options)
+            if kind is str and len(same_kind) > 1:
+                simple = mapping
+                if isinstance(simple, AlternativesMapping):
+                    simple = simple.alternatives[str]
+                assert isinstance(simple, SimpleMapping)
+                simple.add_strings(same_kind[1:], options)
+
+    # 'values' are not empty, so there is a mapping of at least one kind
+    assert mapping is not None
+    return mapping
+
+
+def _update_mapping(
+    current_mapping: ModelMapping, v: Any, options: InferenceOptions | None = None
+) -> ModelMapping:
     """
     The current mapping is mapping created using sample objects observed before.
     The 'v' object is another sample of an object at the same hierarchy level
@@ -71,75 +734,255 @@ def _update_mapping(current_mapping: ModelMapping, v: Any) -> ModelMapping:
         that new sample contains more properties than the ones observed so far
         so the mapping might need to be updated.
     """
-    v_type = type(v)
-    if isinstance(current_mapping, SimpleMapping):
-        if current_mapping.value_type == v_type:
-            if v_type is str:
-                current_mapping.string_value_set.add(v)
+    if options is None:
+        # fresh options so calls do not share their stats
+        options = InferenceOptions()
 
-            return current_mapping
+    if options.profiler is not None:
+        return options.profiler.fold(current_mapping, v, options)
 
-        new_mapping = new_mapping_model(v)
-        return AlternativesMapping(alternatives=[current_mapping, new_mapping])
+    return _fold(current_mapping, v, options)
 
-    if isinstance(current_mapping, ListMapping):
-        if isinstance(v, list):
-            if len(v) > 0:
-                if current_mapping.element_mapping is None:
-                    current_mapping.element_mapping = new_mapping_model(v[0])
 
-                for e in v:
-                    current_mapping.element_mapping = _update_mapping(
-                        current_mapping.element_mapping, e
-                    )
-            return current_mapping
+def new_mapping_model(v: Any, options: InferenceOptions | None = None) -> ModelMapping:
+    if options is None:
+        options = InferenceOptions()
+
+    if options.profiler is not None:
+        return options.profiler.fold(None, v, options)
+
+    return _fold(None, v, options)
+
+
+def new_mapping_model_from_stream(
+    fp: IO,
+    chunk_size: int = js.DEFAULT_CHUNK_SIZE,
+    options: InferenceOptions | None = None,
+) -> ModelMapping:
+    """
+    Creates the same mapping as 'new_mapping_model(json.load(fp))' but reads
+    the document incrementally, so only the mapping is kept in memory and
+    never the document itself.
+    """
+    if options is None:
+        options = InferenceOptions()
+
+    root: ModelMapping | None = None
+    # Open containers; each frame is [container mapping, current property name]
+    frames: list[list] = []
+
+    def current_slot() -> ModelMapping | None:
+        if len(frames) == 0:
+            return root
+
+        container, property_name = frames[-1]
+        if isinstance(container, ObjectMapping):
+            return container.properties.get(property_name)
 
+        return container.element_mapping
+
+    def set_slot(mapping: ModelMapping):
+        nonlocal root
+        if len(frames) == 0:
+            root = mapping
+            return
+
+        container, property_name = frames[-1]
+        if isinstance(container, ObjectMapping):
+            container.properties[property_name] = mapping
         else:
-            # v is not a list
-            mapping = new_mapping_model(v)
-            return AlternativesMapping(alternatives=[current_mapping, mapping])
-
-    if isinstance(current_mapping, ObjectMapping):
-        if isinstance(v, dict):
-            for property_name, property_value in v.items():
-                if property_value is None:
+            container.element_mapping = mapping
+
+    for event, value in js.iter_events(fp, chunk_size):
+        if event == "value":
+            if value is None and len(frames) > 0:
+                (container, property_name) = frames[-1]
+                if isinstance(container, ObjectMapping):
+                    null_counts = container.null_counts
+                    null_counts[property_name] = null_counts.get(property_name, 0) + 1
                     continue
 
-                property_mapping = current_mapping.properties.get(property_name)
-                if property_mapping is not None:
-                    _update_mapping(property_mapping, property_value)
-                else:
-                    new_mapping = new_mapping_model(property_value)
-                    current_mapping.properties[property_name] = new_mapping
+            if len(frames) > 0 and isinstance(frames[-1][0], ListMapping):
+                frames[-1][0].inspected_count += 1
+
+            v_type = type(value)
+            set_slot(_update_simple_mapping(current_slot(), value, v_type, options))
+
+        elif event == "map_key":
+            frames[-1][1] = sys.intern(value)
+            frames[-1][0].presence_counts[frames[-1][1]] += 1
+
+        elif event == "start_map" or event == "start_array":
+            v_type = dict if event == "start_map" else list
+            if len(frames) > 0 and isinstance(frames[-1][0], ListMapping):
+                frames[-1][0].inspected_count += 1
+
+            (mapping, container) = _enter_container(current_slot(), v_type, options)
+            set_slot(mapping)
+            if isinstance(container, ObjectMapping):
+                container.object_count += 1
+            frames.append([container, None])
 
-            return current_mapping
         else:
-            # v is not a dict
-            mapping = new_mapping_model(v)
-            return AlternativesMapping(alternatives=[current_mapping, mapping])
+            frames.pop()
 
-    if isinstance(current_mapping, AlternativesMapping):
-        raise Exception("Updating alternatives mapping is not implemented")
+    # 'iter_events' raises for input without a value
+    assert root is not None
+    return root
 
-    raise Exception(f"Unexpected mapping type: {type(current_mapping)}")
 
+# Order of alternatives in merged mappings, independent of the merge order
+_KIND_ORDER = [bool, int, float, str, list, dict]
 
-def new_mapping_model(v: Any) -> ModelMapping:
-    v_type = type(v)
-    if _is_simple_type(v_type):
-        mapping = SimpleMapping(value_type=v_type)
-        if isinstance(v, str):
-            mapping.string_value_set.add(v)
 
-        return mapping
+def _merge_alternatives(a: ModelMapping, b: ModelMapping) -> AlternativesMapping:
+    by_kind: dict[type, ModelMapping] = dict()
+    for mapping in (a, b):
+        alternatives: Iterable[ModelMapping]
+        if isinstance(mapping, AlternativesMapping):
+            alternatives = mapping.alternatives.values()
+        else:
+            alternatives = [mapping]
 
-    # object
-    if v_type is dict:
-        mapping = _new_object_mapping(v)
-        return mapping
+        for alternative in alternatives:
+            kind = _mapping_kind(alternative)
+            if kind in by_kind:
+                by_kind[kind] = merge_mappings(by_kind[kind], alternative)
+            else:
+                by_kind[kind] = copy.deepcopy(alternative)
 
-    if v_type is list:
-        mapping = _new_list_mapping(v)
-        return mapping
+    return AlternativesMapping(
+        alternatives={k: by_kind[k] for k in sorted(by_kind, key=_KIND_ORDER.index)}
+    )
+
+
+def merge_mappings(a: ModelMapping, b: ModelMapping) -> ModelMapping:
+    """
+    Merges mappings created from different samples of the same hierarchy
+    level into a mapping describing all of the samples.
+
+    Merging is associative, and commutative except for the order of
+    properties: properties of 'a' come first, followed by the properties
+    only 'b' has. Partial mappings created independently (for instance in
+    different processes) merged in the order of their samples have the
+    properties in the same order as a single mapping of all the samples.
+    Neither 'a' nor 'b' is modified.
+    """
+    if (
+        isinstance(a, AlternativesMapping)
+        or isinstance(b, AlternativesMapping)
+        or _mapping_kind(a) is not _mapping_kind(b)
+    ):
+        return _merge_alternatives(a, b)
+
+    if isinstance(a, SimpleMapping):
+        assert isinstance(b, SimpleMapping)
+        if a.string_samples is None or b.string_samples is None:
+            samples = copy.deepcopy(a.string_samples or b.string_samples)
+        else:
+            samples = a.string_samples.merge(b.string_samples)
+
+        return SimpleMapping(value_type=a.value_type, string_samples=samples)
+
+    if isinstance(a, ListMapping):
+        assert isinstance(b, ListMapping)
+        if a.element_mapping is None or b.element_mapping is None:
+            element_mapping = copy.deepcopy(a.element_mapping or b.element_mapping)
+        else:
+            element_mapping = merge_mappings(a.element_mapping, b.element_mapping)
+
+        return ListMapping(
+            element_mapping=element_mapping,
+            inspected_count=a.inspected_count + b.inspected_count,
+            skipped_count=a.skipped_count + b.skipped_count,
+        )
+
+    assert isinstance(b, ObjectMapping)
+    properties: dict[str, ModelMapping] = dict()
+    for property_name, property_mapping in a.properties.items():
+        other_mapping = b.properties.get(property_name)
+        if other_mapping is None:
+            properties[property_name] = copy.deepcopy(property_mapping)
+        else:
+            properties[property_name] = merge_mappings(property_mapping, other_mapping)
+
+    for property_name, property_mapping in b.properties.items():
+        if property_name not in properties:
+            properties[property_name] = copy.deepcopy(property_mapping)
+
+    null_counts = dict(a.null_counts)
+    for property_name, count in b.null_counts.items():
+        null_counts[property_name] = null_counts.get(property_name, 0) + count
+
+    return ObjectMapping(
+        properties,
+        object_count=a.object_count + b.object_count,
+        presence_counts=a.presence_counts + b.presence_counts,
+        null_counts=null_counts,
+    )
+
+
+def mapping_fingerprint(mapping: ModelMapping, structure_only: bool = False) -> str:
+    """
+    Digest of everything in the mapping that can affect generated types and
+    outputs: structure, property order, string samples and their observed
+    counts, distinct value estimators and list counters. String samples are
+    digested with 'hash', so fingerprints are only comparable within one
+    process.
+
+    With 'structure_only' samples and counters are left out, so the digest
+    only changes when types of the generated model change.
+    """
+    parts: list[str] = []
+    pending = [mapping]
+    while pending:
+        node = pending.pop()
+        if isinstance(node, SimpleMapping):
+            samples = node.string_samples
+            if samples is None or structure_only:
+                parts.append(node.value_type.__name__)
+            else:
+                # Order independent; reuses hashes stored in the set. Enums
+                # are detected from how often the values repeat, hence the
+                # observed count
+                values = hash(frozenset(samples.values))
+                observed = samples.observed_count
+                if samples._hll is None:
+                    parts.append(f"str {len(samples.values)} {observed} {values}")
+                else:
+                    registers = hash(bytes(samples._hll.registers))
+                    parts.append(
+                        f"str~ {len(samples.values)} {observed} {values} {registers}"
+                    )
+        elif isinstance(node, ListMapping):
+            if structure_only:
+                parts.append("list")
+            else:
+                parts.append(f"list {node.inspected_count} {node.skipped_count}")
+            if node.element_mapping is not None:
+                pending.append(node.element_mapping)
+        elif isinstance(node, ObjectMapping):
+            # Only whether properties are optional or nullable affects outputs,
+            # not the counts or the order the counters were updated in
+            count = node.object_count
+            optional = [k for (k, c) in node.presence_counts.items() if c < count]
+            # repr quotes the names, so they are unambiguous whatever they contain
+            parts.append(
+                repr(
+                    (
+                        tuple(node.properties),
+                        sorted(node.presence_counts),
+                        sorted(optional),
+                        sorted(node.null_counts),
+                    )
+                )
+            )
+            pending.extend(reversed(node.properties.values()))
+        elif isinstance(node, AlternativesMapping):
+            parts.append(f"alternatives {len(node.alternatives)}")
+            pending.extend(reversed(node.alternatives.values()))
+        else:
+            raise TypeError(f"Unsupported mapping type: {type(node)}")
 
-    raise Exception(f"Creation of mapping for type {v_type} is not implemented.")
+    encoded = "\n".join(parts).encode("utf-8", "surrogatepass")
+    return hashlib.blake2b(encoded, digest_size=16).hexdigest()
@@ -1,5 +1,6 @@
-from dataclasses import dataclass, field
-from typing import Tuple
+from dataclasses import dataclass, field, replace
+from typing import Iterator, Tuple
+import definitiongenerator.formats as fmt
 import definitiongenerator.model as m
 
 
@@ -8,24 +9,60 @@ class _TypeDescription:
     name: str
     properties: dict[str, "_TypeDescription"] = field(default_factory=dict)
     is_array: bool = field(default=False)
+    # Arrays only: number of nested lists, 2 for lists of lists of the type
+    array_depth: int = field(default=0)
     sample_values: list[str] = field(default_factory=list)
+    # Number of distinct values, estimated when larger than the sample
+    distinct_value_count: int = field(default=0)
+    # Arrays only: elements used to infer the element type and skipped ones
+    inspected_elements: int = field(default=0)
+    skipped_elements: int = field(default=0)
+    # Properties only: absent in some objects, null in some objects
+    is_optional: bool = field(default=False)
+    is_nullable: bool = field(default=False)
+    # Strings only: format of all sampled values and the values of enums
+    string_format: fmt.StringFormat | None = field(default=None)
+    enum_values: list[str] = field(default_factory=list)
 
 
 @dataclass
 class _MapperState:
     found_types: list[_TypeDescription] = field(default_factory=list)
+    # Structurally equal object types are added to 'found_types' only once
+    deduplicate: bool = field(default=True)
+    # When set, an object type whose properties are a subset or a superset of
+    # an already found type is unified with it if the types differ in at most
+    # this fraction of their combined properties
+    unify_threshold: float | None = field(default=None)
+    # Detect formats of string fields, see 'formats'
+    detect_formats: bool = field(default=True)
+    types_by_key: dict[frozenset, _TypeDescription] = field(
+        default_factory=dict, repr=False, compare=False
+    )
+    types_by_name: dict[str, _TypeDescription] = field(
+        default_factory=dict, repr=False, compare=False
+    )
+    types_by_property: dict[str, list[_TypeDescription]] = field(
+        default_factory=dict, repr=False, compare=False
+    )
+    unified: bool = field(default=False, repr=False, compare=False)
 
 
 def _simple_mapping_to_type(
     mapping: m.SimpleMapping, state: _MapperState
 ) -> Tuple[_MapperState, _TypeDescription]:
-    return (
-        state,
-        _TypeDescription(
-            name=str(mapping.value_type.__name__),
-            sample_values=sorted(mapping.string_value_set),
-        ),
+    samples = mapping.string_samples
+    t = _TypeDescription(
+        name=str(mapping.value_type.__name__),
+        sample_values=samples.sample_values() if samples is not None else [],
+        distinct_value_count=samples.distinct_count if samples is not None else 0,
     )
+    if state.detect_formats:
+        t.string_format = fmt.detect_format(samples, t.sample_values)
+        if t.string_format == "enum":
+            t.enum_values = t.sample_values
+
+    return (state, t)
 
 
 def _get_type_name(state: _MapperState, path: list[str]):
@@ -44,54 +81,297 @@ def _get_type_name(state: _MapperState, path: list[str]):
     return "".join((capitalize(p) for p in path)) + "Dict"
 
 
-def _object_mapping_to_type(
-    mapping: m.ObjectMapping, state: _MapperState, path: list[str] | None = None
+def _structural_key(t: _TypeDescription) -> frozenset:
+    # Nested types are already canonical, so they are compared by name
+    return frozenset(
+        (k, p.name, p.array_depth, p.is_optional, p.is_nullable, *_format_key(p))
+        for (k, p) in t.properties.items()
+    )
+
+
+def _format_key(t: _TypeDescription) -> tuple:
+    return (t.string_format, tuple(t.enum_values))
+
+
+def _with_flags(
+    t: _TypeDescription, mapping: m.ObjectMapping, property_name: str
+) -> _TypeDescription:
+    """Property type with optional and nullable flags of the property."""
+    is_optional = mapping.presence_counts[property_name] < mapping.object_count
+    is_nullable = mapping.null_counts.get(property_name, 0) > 0
+    if not is_optional and not is_nullable:
+        return t
+
+    # object types are shared by all properties using them, hence a copy
+    return replace(t, is_optional=is_optional, is_nullable=is_nullable)
+
+
+def _references(state: _MapperState, t: _TypeDescription, target: str) -> bool:
+    """Checks whether 'target' type is reachable from properties of 't'."""
+    pending = [t]
+    visited = set()
+    while pending:
+        for p in pending.pop().properties.values():
+            if p.name == target:
+                return True
+
+            if p.name not in visited and p.name in state.types_by_name:
+                visited.add(p.name)
+                pending.append(state.types_by_name[p.name])
+
+    return False
+
+
+def _find_near_duplicate(
+    state: _MapperState, t: _TypeDescription, threshold: float
+) -> _TypeDescription | None:
+    fields = {
+        k: (p.name, p.array_depth, *_format_key(p))
+        for (k, p) in t.properties.items()
+    }
+    candidates = {
+        id(c): c for k in fields for c in state.types_by_property.get(k, ())
+    }
+
+    best = None
+    best_difference = 0
+    for c in candidates.values():
+        c_fields = {
+            k: (p.name, p.array_depth, *_format_key(p))
+            for (k, p) in c.properties.items()
+        }
+        common = fields.keys() & c_fields.keys()
+        if len(common) != len(fields) and len(common) != len(c_fields):
+            continue
+
+        if any(fields[k] != c_fields[k] for k in common):
+            continue
+
+        difference = len(fields) + len(c_fields) - 2 * len(common)
+        if difference > threshold * (len(common) + difference):
+            continue
+
+        if len(common) != len(fields) and _references(state, t, c.name):
+            # Unification would make the type recursive
+            continue
+
+        if best is None or difference < best_difference:
+            (best, best_difference) = (c, difference)
+
+    return best
+
+
+def _register_type(state: _MapperState, t: _TypeDescription) -> _TypeDescription:
+    """Adds the object type to found types, returns the type to reference."""
+    if state.deduplicate:
+        existing = state.types_by_key.get(_structural_key(t))
+        if existing is not None:
+            return existing
+
+    if state.unify_threshold is not None:
+        existing = _find_near_duplicate(state, t, state.unify_threshold)
+        if existing is not None:
+            key = _structural_key(existing)
+            if state.types_by_key.get(key) is existing:
+                del state.types_by_key[key]
+
+            # Properties missing in either of the types become optional
+            properties = existing.properties
+            for k, p in t.properties.items():
+                if k not in properties:
+                    properties[k] = replace(p, is_optional=True)
+                    state.types_by_property.setdefault(k, []).append(existing)
+                elif p.is_nullable or p.is_optional:
+                    properties[k] = replace(
+                        properties[k],
+                        is_optional=p.is_optional or properties[k].is_optional,
+                        is_nullable=p.is_nullable or properties[k].is_nullable,
+                    )
+            for k, p in properties.items():
+                if k not in t.properties and not p.is_optional:
+                    properties[k] = replace(p, is_optional=True)
+
+            state.types_by_key.setdefault(_structural_key(existing), existing)
+            state.unified = True
+            return existing
+
+    state.found_types.append(t)
+    state.types_by_name[t.name] = t
+    if state.deduplicate:
+        state.types_by_key[_structural_key(t)] = t
+
+    if state.unify_threshold is not None:
+        for k in t.properties:
+            state.types_by_property.setdefault(k, []).append(t)
+
+    return t
+
+
+def _sort_by_dependencies(
+    found_types: list[_TypeDescription],
+) -> list[_TypeDescription]:
+    """Stable reorder of types, so that every type follows the types it uses."""
+    by_name = {t.name: t for t in found_types}
+    visited = set()
+    result = []
+    for root in found_types:
+        if root.name in visited:
+            continue
+
+        visited.add(root.name)
+        stack = [(root, iter(root.properties.values()))]
+        while stack:
+            (t, pending) = stack[-1]
+            for p in pending:
+                if p.name in by_name and p.name not in visited:
+                    visited.add(p.name)
+                    dependency = by_name[p.name]
+                    stack.append((dependency, iter(dependency.properties.values())))
+                    break
+            else:
+                stack.pop()
+                result.append(t)
+
+    return result
+
+
+# Frame of '_new_type_model': object mapping, its path, properties mapped so
+# far, iterator over properties still to map, name of the property in the
+# parent frame and the list mapping if the property is an array
+_ObjectFrame = Tuple[
+    m.ObjectMapping,
+    list[str],
+    dict[str, _TypeDescription],
+    Iterator[Tuple[str, m.ModelMapping]],
+    str | None,
+    m.ListMapping | None,
+]
+
+
+def _new_type_model(
+    mapping: m.ModelMapping, state: _MapperState, path: list[str] | None = None
 ) -> Tuple[_MapperState, _TypeDescription]:
-    # TODO: Uppercase
+    """Creates type model from model mapping
+
+    Object mappings are visited in depth first order with an explicit stack
+    and their types are added to 'state.found_types' after the types of their
+    properties, so every type is defined before it is referenced.
+
+    Structurally equal object types (same property names and property types)
+    reached from different paths are added once, under the name of the first
+    one, and referenced everywhere. Sample values of properties are the ones
+    of the first path.
+    """
     if path is None:
         path = []
 
-    type_name = _get_type_name(state, path)
-    properties = {}
+    def unwrap_lists(
+        mapping: m.ModelMapping,
+    ) -> Tuple[m.ModelMapping | None, m.ListMapping | None]:
+        """Returns the innermost element mapping and the outermost list mapping."""
+        array = None
+        while isinstance(mapping, m.ListMapping):
+            if array is None:
+                array = mapping
+
+            element = mapping.element_mapping
+            if element is None:
+                return (None, array)
+
+            mapping = element
 
-    new_state = state
-    for prop_name, prop_mapping in mapping.properties.items():
-        (new_state, mapped_type) = _new_type_model(
-            prop_mapping, new_state, [*path, prop_name]
+        return (mapping, array)
+
+    def array_type(name: str, array: m.ListMapping) -> _TypeDescription:
+        depth = 1
+        element: m.ModelMapping | None = array.element_mapping
+        while isinstance(element, m.ListMapping):
+            depth += 1
+            element = element.element_mapping
+
+        return _TypeDescription(
+            name,
+            is_array=True,
+            array_depth=depth,
+            inspected_elements=array.inspected_count,
+            skipped_elements=array.skipped_count,
         )
 
-        properties[prop_name] = mapped_type
+    def leaf_type(
+        mapping: m.ModelMapping | None, array: m.ListMapping | None
+    ) -> _TypeDescription:
+        if mapping is None:
+            # only elements of lists which were always empty have no mapping
+            assert array is not None
+            return array_type("?????", array)
 
-    t = _TypeDescription(type_name, properties)
-    new_state.found_types.append(t)
-    return (new_state, t)
+        if isinstance(mapping, m.SimpleMapping):
+            (_, t) = _simple_mapping_to_type(mapping, state)
+            if array is None:
+                return t
 
+            return replace(
+                array_type(t.name, array),
+                string_format=t.string_format,
+                enum_values=t.enum_values,
+            )
 
-def _list_mapping_to_type(
-    mapping: m.ListMapping, state: _MapperState, path: list[str] | None = None
-) -> Tuple[_MapperState, _TypeDescription]:
-    if mapping.element_mapping is None:
-        return (state, _TypeDescription("?????", is_array=True))
+        if isinstance(mapping, m.AlternativesMapping):
+            raise NotImplementedError("Not implemented")
 
-    (new_state, type_mapping) = _new_type_model(mapping.element_mapping, state, path)
-    return (new_state, _TypeDescription(type_mapping.name, is_array=True))
+        raise TypeError(f"Unsupported mapping type: {type(mapping)}")
 
+    (root, array) = unwrap_lists(mapping)
+    if not isinstance(root, m.ObjectMapping):
+        return (state, leaf_type(root, array))
 
-def _new_type_model(
-    mapping: m.ModelMapping, state: _MapperState, path: list[str] | None = None
-) -> Tuple[_MapperState, _TypeDescription]:
-    """Creates type model from model mapping"""
+    stack: list[_ObjectFrame] = [
+        (root, path, dict(), iter(root.properties.items()), None, array)
+    ]
+    while True:
+        (_, object_path, properties, pending, _, _) = stack[-1]
+        for prop_name, prop_mapping in pending:
+            (element_mapping, prop_array) = unwrap_lists(prop_mapping)
+            if isinstance(element_mapping, m.ObjectMapping):
+                stack.append(
+                    (
+                        element_mapping,
+                        [*object_path, prop_name],
+                        dict(),
+                        iter(element_mapping.properties.items()),
+                        prop_name,
+                        prop_array,
+                    )
+                )
+                break
 
-    if isinstance(mapping, m.SimpleMapping):
-        return _simple_mapping_to_type(mapping, state)
+            properties[prop_name] = _with_flags(
+                leaf_type(element_mapping, prop_array), stack[-1][0], prop_name
+            )
+        else:
+            (object_mapping, object_path, properties, _, parent_prop_name, array) = (
+                stack.pop()
+            )
+            for prop_name in object_mapping.presence_counts:
+                if prop_name not in properties:
+                    # the property was always null
+                    properties[prop_name] = _with_flags(
+                        _TypeDescription("None"), object_mapping, prop_name
+                    )
 
-    if isinstance(mapping, m.ObjectMapping):
-        return _object_mapping_to_type(mapping, state, path)
+            t = _TypeDescription(_get_type_name(state, object_path), properties)
+            t = _register_type(state, t)
+            if array is not None:
+                t = array_type(t.name, array)
 
-    if isinstance(mapping, m.ListMapping):
-        return _list_mapping_to_type(mapping, state, path)
+            # only the frame of the root object has no parent property
+            if parent_prop_name is None:
+                if state.unified:
+                    # Unified types gained properties using types found later
+                    state.found_types = _sort_by_dependencies(state.found_types)
 
-    if isinstance(mapping, m.AlternativesMapping):
-        raise NotImplementedError("Not implemented")
+                return (state, t)
 
-    raise TypeError(f"Unsupported mapping type: {type(mapping)}")
+            stack[-1][2][parent_prop_name] = _with_flags(
+                t, stack[-1][0], parent_prop_name
+            )
@@ -0,0 +1,197 @@
+"""Inference over many sample files using multiple processes.
+
+Every worker folds a batch of files into a partial mapping and the partial
+mappings are reduced with 'merge_mappings' in the order of the batches, so
+properties are in the same order as with sequential inference.
+
+Newline delimited JSON files (one sample per line) are split into byte
+ranges aligned on line boundaries instead. Workers memory-map the file and
+parse only the lines of their range, so the file is never read as a whole
+and nothing but the range boundaries is sent to the workers.
+"""
+import math
+import mmap
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import reduce
+from pathlib import Path
+from typing import Iterable
+
+import definitiongenerator.jsonbackend as jb
+import definitiongenerator.model as m
+
+
+def _infer_from_batch(
+    paths: list[str], options: m.InferenceOptions | None, json_backend: str | None
+) -> m.ModelMapping:
+    (first, *rest) = paths
+    mapping = m.new_mapping_model(jb.load_file(first, json_backend), options)
+    for p in rest:
+        sample = jb.load_file(p, json_backend)
+        mapping = m._update_mapping(mapping, sample, options)
+
+    return mapping
+
+
+def infer_from_files(
+    paths: Iterable[str | Path],
+    workers: int | None = None,
+    *,
+    options: m.InferenceOptions | None = None,
+    batches_per_worker: int = 4,
+    json_backend: str | None = None,
+) -> m.ModelMapping:
+    """
+    Creates mapping from JSON files where every file is a sample of the same
+    object, for instance every file is a page of a paginated API response.
+    'workers' defaults to the number of CPUs; with a single worker everything
+    runs in the current process. 'json_backend' is a name of
+    'jsonbackend' backend, None selects the fastest installed one.
+    """
+    files = [str(p) for p in paths]
+    if len(files) == 0:
+        raise ValueError("At least one input file is required")
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if workers <= 1:
+        return _infer_from_batch(files, options, json_backend)
+
+    # A few batches per worker so that a slow batch does not stall the others
+    batch_size = math.ceil(len(files) / (workers * batches_per_worker))
+    batches = [files[i : i + batch_size] for i in range(0, len(files), batch_size)]
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(batches))) as executor:
+        futures = [
+            executor.submit(_infer_from_batch, b, options, json_backend)
+            for b in batches
+        ]
+        return reduce(m.merge_mappings, (future.result() for future in futures))
+
+
+def _open_mmap(f) -> mmap.mmap | None:
+    """Read-only map of the whole file; None for an empty file."""
+    if os.fstat(f.fileno()).st_size == 0:
+        return None
+
+    return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def line_ranges(path: str | Path, parts: int) -> list[tuple[int, int]]:
+    """
+    Splits the file into at most 'parts' byte ranges (start, end), which
+    start at the beginning of a line and end after a newline or at the end
+    of the file.
+    """
+    with open(path, "rb") as f:
+        data = _open_mmap(f)
+        if data is None:
+            return []
+
+        with data:
+            size = len(data)
+            ranges = []
+            start = 0
+            for i in range(1, parts + 1):
+                if start >= size:
+                    break
+
+                end = size if i == parts else max(start, size * i // parts)
+                if end < size:
+                    newline = data.find(b"\n", end)
+                    end = size if newline == -1 else newline + 1
+
+                ranges.append((start, end))
+                start = end
+
+            return ranges
+
+
+def _infer_from_line_range(
+    path: str,
+    start: int,
+    end: int,
+    options: m.InferenceOptions | None,
+    json_backend: str | None,
+) -> m.ModelMapping | None:
+    loads = jb.get_loads(json_backend)
+    mapping: m.ModelMapping | None = None
+    with open(path, "rb") as f:
+        data = _open_mmap(f)
+        if data is None:
+            return None
+
+        with data:
+            position = start
+            while position < end:
+                newline = data.find(b"\n", position, end)
+                line_end = end if newline == -1 else newline
+                line = data[position:line_end]
+                if not line.isspace() and len(line) > 0:
+                    try:
+                        sample = loads(line)
+                    except ValueError as e:
+                        raise ValueError(
+                            f"{path}: invalid JSON line at byte {position}: {e}"
+                        ) from e
+
+                    if mapping is None:
+                        mapping = m.new_mapping_model(sample, options)
+                    else:
+                        mapping = m._update_mapping(mapping, sample, options)
+
+                position = line_end + 1
+
+    return mapping
+
+
+def infer_from_ndjson(
+    path: str | Path,
+    workers: int | None = None,
+    *,
+    options: m.InferenceOptions | None = None,
+    ranges_per_worker: int = 4,
+    json_backend: str | None = None,
+) -> m.ModelMapping:
+    """
+    Creates mapping from a newline delimited JSON file where every non blank
+    line is a sample of the same object. 'workers' and 'json_backend' are
+    the same as in 'infer_from_files'.
+    """
+    path = str(path)
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if workers <= 1:
+        ranges = line_ranges(path, 1)
+    else:
+        ranges = line_ranges(path, workers * ranges_per_worker)
+
+    mapping: m.ModelMapping | None = None
+    if workers <= 1 or len(ranges) <= 1:
+        for start, end in ranges:
+            mapping = _infer_from_line_range(path, start, end, options, json_backend)
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(ranges))) as executor:
+            futures = [
+                executor.submit(
+                    _infer_from_line_range, path, start, end, options, json_backend
+                )
+                for (start, end) in ranges
+            ]
+            # in the order of the ranges, the same as a scan of the file
+            for future in futures:
+                partial = future.result()
+                if partial is None:
+                    continue
+
+                if mapping is None:
+                    mapping = partial
+                else:
+                    mapping = m.merge_mappings(mapping, partial)
+
+    if mapping is None:
+        raise ValueError(f"{path}: no samples")
+
+    return mapping
@@ -0,0 +1,223 @@
+"""Per-path statistics of mapping inference.
+
+Profiling is enabled by 'InferenceOptions(profiler=InferenceProfiler())'.
+Profiled inference runs a separate, instrumented fold which records, for
+every JSON path, the number of values, the nulls, the time spent (including
+nested values) and the type transitions, i.e. the moments a mapping turned
+into an 'AlternativesMapping' or got another alternative. Without a profiler
+inference does not run any of this code.
+
+Paths start at '$', properties are appended as '.name' and list elements
+as '[]', for instance '$.bibs[].marc.fields[]'.
+
+The shape cache is not used by profiled inference and streamed inference
+('new_mapping_model_from_stream') is not profiled.
+"""
+import dataclasses
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterator
+
+import definitiongenerator.model as m
+
+
+@dataclass
+class TypeTransition:
+    path: str
+    # Kinds of the mapping before the transition, e.g. ('int',)
+    before: tuple[str, ...]
+    # Kind of the value that caused the transition, e.g. 'str'
+    added: str
+
+
+@dataclass
+class PathStats:
+    path: str
+    # Values observed at the path, nulls included
+    samples: int = 0
+    nulls: int = 0
+    # Time spent folding values at the path, nested values included
+    seconds: float = 0.0
+    # Distinct strings observed at the path (estimated for large counts)
+    distinct_strings: int = 0
+    transitions: list[TypeTransition] = field(default_factory=list)
+
+    @property
+    def null_frequency(self) -> float:
+        return self.nulls / self.samples if self.samples > 0 else 0.0
+
+
+# Frame of the profiled fold: container mapping, iterator over the content
+# folded into it, its path, its stats and the time it was entered at
+_ProfiledFrame = tuple[
+    m.ObjectMapping | m.ListMapping, Iterator, str, PathStats, float
+]
+
+
+def _kinds(mapping: m.ModelMapping) -> tuple[str, ...]:
+    if type(mapping) is m.AlternativesMapping:
+        return tuple(k.__name__ for k in mapping.alternatives)
+
+    return (m._mapping_kind(mapping).__name__,)
+
+
+class InferenceProfiler:
+    """
+    Collects 'PathStats' over any number of inference calls.
+
+    'on_transition' is called with every 'TypeTransition' when it happens.
+    'on_value' is called with the path, the type and the time spent for
+    every folded value; it is called very often, so it should be cheap.
+    """
+
+    def __init__(
+        self,
+        on_transition: Callable[[TypeTransition], None] | None = None,
+        on_value: Callable[[str, type, float], None] | None = None,
+    ):
+        self.on_transition = on_transition
+        self.on_value = on_value
+        self.paths: dict[str, PathStats] = {}
+
+    def report(self) -> list[PathStats]:
+        """Stats of all paths, the most expensive first."""
+        return sorted(self.paths.values(), key=lambda s: s.seconds, reverse=True)
+
+    def report_dicts(self) -> list[dict]:
+        return [dataclasses.asdict(s) for s in self.report()]
+
+    def format_report(self, limit: int = 20) -> str:
+        lines = [
+            f"{'seconds':>10} {'samples':>10} {'nulls':>7} {'distinct':>9} "
+            f"{'transitions':>11}  path"
+        ]
+        for s in self.report()[:limit]:
+            lines.append(
+                f"{s.seconds:10.4f} {s.samples:10} {s.null_frequency:7.1%} "
+                f"{s.distinct_strings:9} {len(s.transitions):11}  {s.path}"
+            )
+
+        return "\n".join(lines)
+
+    def _stats(self, path: str) -> PathStats:
+        stats = self.paths.get(path)
+        if stats is None:
+            stats = PathStats(path)
+            self.paths[path] = stats
+
+        return stats
+
+    def _visit(
+        self,
+        mapping: m.ModelMapping | None,
+        v: Any,
+        path: str,
+        options: m.InferenceOptions,
+        stack: list[_ProfiledFrame],
+    ) -> m.ModelMapping:
+        """
+        Folds a single value into the 'mapping' at the 'path'. Containers are
+        only entered and pushed to the 'stack' to be folded later.
+        """
+        stats = self._stats(path)
+        stats.samples += 1
+        v_type = type(v)
+        before = _kinds(mapping) if mapping is not None else None
+        start = time.perf_counter()
+        if v_type is dict or v_type is list:
+            (new_mapping, container) = m._enter_container(mapping, v_type, options)
+            if isinstance(container, m.ObjectMapping):
+                container.object_count += 1
+                container.presence_counts.update(v.keys())
+                content = iter(v.items())
+            else:
+                content = m._iter_elements(container, v, options)
+            stack.append((container, content, path, stats, start))
+        else:
+            new_mapping = m._update_simple_mapping(mapping, v, v_type, options)
+            seconds = time.perf_counter() - start
+            stats.seconds += seconds
+            if self.on_value is not None:
+                self.on_value(path, v_type, seconds)
+
+        if before is not None and len(_kinds(new_mapping)) > len(before):
+            transition = TypeTransition(path, before, v_type.__name__)
+            stats.transitions.append(transition)
+            if self.on_transition is not None:
+                self.on_transition(transition)
+
+        return new_mapping
+
+    def fold(
+        self,
+        current_mapping: m.ModelMapping | None,
+        v: Any,
+        options: m.InferenceOptions,
+    ) -> m.ModelMapping:
+        """Profiled counterpart of 'model._fold', creates the same mapping."""
+        stack: list[_ProfiledFrame] = []
+        mapping = self._visit(current_mapping, v, "$", options, stack)
+        while stack:
+            depth = len(stack)
+            (container, content, path, _, _) = stack[-1]
+            if isinstance(container, m.ObjectMapping):
+                properties = container.properties
+                for property_name, property_value in content:
+                    property_path = f"{path}.{property_name}"
+                    property_mapping = properties.get(property_name)
+                    if property_value is None:
+                        # null properties are skipped by inference
+                        stats = self._stats(property_path)
+                        stats.samples += 1
+                        stats.nulls += 1
+                        nulls = container.null_counts
+                        nulls[property_name] = nulls.get(property_name, 0) + 1
+                        continue
+
+                    if property_mapping is None:
+                        property_name = sys.intern(property_name)
+                    properties[property_name] = self._visit(
+                        property_mapping, property_value, property_path, options, stack
+                    )
+                    if len(stack) > depth:
+                        break
+                else:
+                    self._pop(stack)
+            else:
+                for element in content:
+                    container.element_mapping = self._visit(
+                        container.element_mapping, element, f"{path}[]", options, stack
+                    )
+                    if len(stack) > depth:
+                        break
+                else:
+                    self._pop(stack)
+
+        self._count_distinct_strings(mapping, "$")
+        return mapping
+
+    def _pop(self, stack: list[_ProfiledFrame]):
+        (container, _, path, stats, start) = stack.pop()
+        seconds = time.perf_counter() - start
+        stats.seconds += seconds
+        if self.on_value is not None:
+            value_type = dict if isinstance(container, m.ObjectMapping) else list
+            self.on_value(path, value_type, seconds)
+
+    def _count_distinct_strings(self, mapping: m.ModelMapping, path: str):
+        pending = [(mapping, path)]
+        while pending:
+            (mapping, path) = pending.pop()
+            if isinstance(mapping, m.AlternativesMapping):
+                pending.extend((a, path) for a in mapping.alternatives.values())
+            elif isinstance(mapping, m.ObjectMapping):
+                pending.extend(
+                    (p, f"{path}.{name}") for (name, p) in mapping.properties.items()
+                )
+            elif isinstance(mapping, m.ListMapping):
+                if mapping.element_mapping is not None:
+                    pending.append((mapping.element_mapping, f"{path}[]"))
+            elif mapping.string_samples is not None and path in self.paths:
+                samples = mapping.string_samples
+                self.paths[path].distinct_strings = samples.distinct_count
@@ -0,0 +1,165 @@
+"""Bounded summaries of string values observed for a single field.
+
+Fields like ids, timestamps or free text can have millions of distinct
+values, so instead of keeping all of them only a bounded sample is kept
+together with an estimate of the number of distinct values.
+"""
+import hashlib
+import heapq
+import math
+from dataclasses import dataclass, field
+
+DEFAULT_SAMPLE_LIMIT = 64
+DEFAULT_HLL_PRECISION = 10  # 1024 registers, ~3% standard error
+
+
+def stable_hash(s: str) -> int:
+    """64 bit hash of a string which, unlike 'hash', is the same in every process."""
+    digest = hashlib.blake2b(s.encode("utf-8", "surrogatepass"), digest_size=8)
+    return int.from_bytes(digest.digest(), "big")
+
+
+@dataclass(slots=True)
+class HyperLogLog:
+    """HyperLogLog estimator of the number of distinct hashed values."""
+
+    precision: int = DEFAULT_HLL_PRECISION
+    # Empty -> all registers are zero
+    registers: bytearray = field(default_factory=bytearray, repr=False)
+
+    def __post_init__(self):
+        if len(self.registers) == 0:
+            self.registers = bytearray(1 << self.precision)
+
+    def add_hash(self, h: int):
+        value_bits = 64 - self.precision
+        index = h >> value_bits
+        rank = value_bits - (h & ((1 << value_bits) - 1)).bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def estimate(self) -> float:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / sum(2.0**-r for r in self.registers)
+
+        zeros = self.registers.count(0)
+        if raw <= 2.5 * m and zeros > 0:
+            # small range correction (linear counting)
+            return m * math.log(m / zeros)
+
+        return raw
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        if self.precision != other.precision:
+            raise ValueError("Cannot merge HyperLogLog with different precisions")
+
+        registers = bytearray(map(max, self.registers, other.registers))
+        return HyperLogLog(self.precision, registers)
+
+
+@dataclass(slots=True)
+class StringReservoir:
+    """Bounded sample of distinct strings and a count of distinct strings.
+
+    Until more than 'limit' distinct values are observed all of them are kept
+    and the distinct count is exact. From then on the sample keeps the 'limit'
+    values with the smallest hashes (a bottom-k reservoir, which is a uniform
+    sample of the distinct values) and the count is estimated by HyperLogLog.
+    """
+
+    limit: int = DEFAULT_SAMPLE_LIMIT
+    values: set[str] = field(default_factory=set)
+    observed_count: int = 0
+    # Set once the sample overflows; heap of (-hash, value) for sampled values
+    _heap: list[tuple[int, str]] | None = field(
+        default=None, repr=False, compare=False
+    )
+    _hll: HyperLogLog | None = field(default=None, repr=False)
+
+    @property
+    def is_exact(self) -> bool:
+        return self._hll is None
+
+    @property
+    def distinct_count(self) -> int:
+        if self._hll is None:
+            return len(self.values)
+
+        return max(len(self.values), round(self._hll.estimate()))
+
+    def sample_values(self) -> list[str]:
+        return sorted(self.values)
+
+    def add(self, s: str):
+        self.observed_count += 1
+        (hll, heap) = (self._hll, self._heap)
+        if hll is None or heap is None:
+            if s not in self.values:
+                self.values.add(s)
+                if len(self.values) > self.limit:
+                    self._overflow()
+            return
+
+        h = stable_hash(s)
+        hll.add_hash(h)
+        if h < -heap[0][0] and s not in self.values:
+            (_, evicted) = heapq.heapreplace(heap, (-h, s))
+            self.values.discard(evicted)
+            self.values.add(s)
+
+    def update(self, values: list[str]):
+        """Adds all of the 'values', the same as calling 'add' for each."""
+        if self._hll is not None:
+            for s in values:
+                self.add(s)
+            return
+
+        self.observed_count += len(values)
+        self.values.update(values)
+        if len(self.values) > self.limit:
+            # keeps the same values as adding them one by one would
+            self._overflow()
+
+    def merge(self, other: "StringReservoir") -> "StringReservoir":
+        """Creates reservoir summarizing values observed by both reservoirs."""
+        limit = max(self.limit, other.limit)
+        observed_count = self.observed_count + other.observed_count
+        values = self.values | other.values
+        if self.is_exact and other.is_exact and len(values) <= limit:
+            return StringReservoir(limit, values, observed_count)
+
+        hll = HyperLogLog()
+        hashes: dict[str, int] = {}
+        for r in (self, other):
+            if r._hll is None or r._heap is None:
+                for v in r.values:
+                    h = hashes.setdefault(v, stable_hash(v))
+                    hll.add_hash(h)
+            else:
+                hll = hll.merge(r._hll)
+                for (negated_h, v) in r._heap:
+                    hashes[v] = -negated_h
+
+        sampled = heapq.nsmallest(limit, ((h, v) for (v, h) in hashes.items()))
+        return StringReservoir(
+            limit,
+            set(v for (_, v) in sampled),
+            observed_count,
+            _heap=[(-h, v) for (h, v) in sampled[::-1]],
+            _hll=hll,
+        )
+
+    def _overflow(self):
+        self._hll = HyperLogLog()
+        hashed = [(stable_hash(v), v) for v in self.values]
+        for (h, _) in hashed:
+            self._hll.add_hash(h)
+
+        if len(hashed) > self.limit:
+            # many values are sampled at once when a whole column is added
+            hashed = heapq.nsmallest(self.limit, hashed)
+            self.values.intersection_update([v for (_, v) in hashed])
+
+        self._heap = [(-h, v) for (h, v) in hashed]
+        heapq.heapify(self._heap)
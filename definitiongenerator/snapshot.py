@@ -0,0 +1,184 @@
+"""Saving and loading of mappings, so that inference can be continued later.
+
+A snapshot is a JSON document with all mapping nodes stored in a flat list,
+nodes reference their children by index. Because of that the nesting of
+the snapshot does not depend on the nesting of the mapping. String samples,
+distinct value estimators and counters are stored as well, so a loaded
+mapping can be updated with '_update_mapping' exactly like the original one.
+Version 1 snapshots have no presence and null counters of objects; every
+object of such a snapshot is loaded as if it was created from a single
+object with all of its properties present and not null.
+"""
+import base64
+import heapq
+import json
+import sys
+from collections import Counter
+from typing import IO, Any
+
+import definitiongenerator.model as m
+import definitiongenerator.sketches as sk
+
+SNAPSHOT_FORMAT = "httptyping-mapping"
+SNAPSHOT_VERSION = 2
+# Version 1 snapshots have no presence and null counters of objects
+_SUPPORTED_VERSIONS = (1, 2)
+
+_SIMPLE_TYPES: dict[str, type] = {t.__name__: t for t in (bool, int, float, str)}
+
+
+def _reservoir_to_dict(reservoir: sk.StringReservoir) -> dict:
+    d: dict[str, Any] = {
+        "limit": reservoir.limit,
+        "observed": reservoir.observed_count,
+        "values": reservoir.sample_values(),
+    }
+    hll = reservoir._hll
+    if hll is not None:
+        d["hll_precision"] = hll.precision
+        d["hll"] = base64.b64encode(hll.registers).decode("ascii")
+
+    return d
+
+
+def _reservoir_from_dict(d: dict) -> sk.StringReservoir:
+    reservoir = sk.StringReservoir(d["limit"], set(d["values"]), d["observed"])
+    if "hll" in d:
+        registers = bytearray(base64.b64decode(d["hll"]))
+        reservoir._hll = sk.HyperLogLog(d["hll_precision"], registers)
+        reservoir._heap = [(-sk.stable_hash(v), v) for v in reservoir.values]
+        heapq.heapify(reservoir._heap)
+
+    return reservoir
+
+
+def _children(mapping: m.ModelMapping) -> list[m.ModelMapping]:
+    if isinstance(mapping, m.ObjectMapping):
+        return list(mapping.properties.values())
+
+    if isinstance(mapping, m.AlternativesMapping):
+        return list(mapping.alternatives.values())
+
+    if isinstance(mapping, m.ListMapping) and mapping.element_mapping is not None:
+        return [mapping.element_mapping]
+
+    return []
+
+
+def mapping_to_dict(mapping: m.ModelMapping) -> dict:
+    # Nodes in pre-order, so children always have larger indexes than parents
+    nodes: list[m.ModelMapping] = []
+    pending = [mapping]
+    while pending:
+        node = pending.pop()
+        nodes.append(node)
+        pending.extend(reversed(_children(node)))
+
+    indexes = {id(node): i for i, node in enumerate(nodes)}
+
+    encoded: list[list] = []
+    for node in nodes:
+        if isinstance(node, m.SimpleMapping):
+            samples = node.string_samples
+            encoded.append(
+                [
+                    "s",
+                    node.value_type.__name__,
+                    _reservoir_to_dict(samples) if samples is not None else None,
+                ]
+            )
+        elif isinstance(node, m.ListMapping):
+            element = node.element_mapping
+            encoded.append(
+                [
+                    "l",
+                    indexes[id(element)] if element is not None else None,
+                    node.inspected_count,
+                    node.skipped_count,
+                ]
+            )
+        elif isinstance(node, m.ObjectMapping):
+            properties = {k: indexes[id(v)] for k, v in node.properties.items()}
+            encoded.append(
+                [
+                    "o",
+                    properties,
+                    node.object_count,
+                    dict(node.presence_counts),
+                    node.null_counts,
+                ]
+            )
+        elif isinstance(node, m.AlternativesMapping):
+            alternatives = [indexes[id(a)] for a in node.alternatives.values()]
+            encoded.append(["a", alternatives])
+        else:
+            raise TypeError(f"Unsupported mapping type: {type(node)}")
+
+    return {
+        "format": SNAPSHOT_FORMAT,
+        "version": SNAPSHOT_VERSION,
+        "nodes": encoded,
+    }
+
+
+def mapping_from_dict(d: dict) -> m.ModelMapping:
+    version = d.get("version")
+    if d.get("format") != SNAPSHOT_FORMAT or version not in _SUPPORTED_VERSIONS:
+        raise ValueError(
+            f"Unsupported snapshot: {d.get('format')} version {d.get('version')}"
+        )
+
+    encoded = d["nodes"]
+    nodes: list[m.ModelMapping | None] = [None] * len(encoded)
+    # Children are stored after their parents, so create nodes from the end
+    for i in range(len(encoded) - 1, -1, -1):
+        node = encoded[i]
+        match node[0]:
+            case "s":
+                (_, type_name, samples) = node
+                nodes[i] = m.SimpleMapping(
+                    _SIMPLE_TYPES[type_name],
+                    _reservoir_from_dict(samples) if samples is not None else None,
+                )
+            case "l":
+                (_, element, inspected_count, skipped_count) = node
+                nodes[i] = m.ListMapping(
+                    nodes[element] if element is not None else None,
+                    inspected_count,
+                    skipped_count,
+                )
+            case "o":
+                properties = {sys.intern(k): nodes[v] for k, v in node[1].items()}
+                mapping = m.ObjectMapping(properties, object_count=1)
+                mapping.presence_counts.update(properties.keys())
+                if len(node) > 2:
+                    (_, _, object_count, presence_counts, null_counts) = node
+                    mapping.object_count = object_count
+                    mapping.presence_counts = Counter(
+                        {sys.intern(k): c for k, c in presence_counts.items()}
+                    )
+                    mapping.null_counts = {
+                        sys.intern(k): c for k, c in null_counts.items()
+                    }
+                nodes[i] = mapping
+            case "a":
+                alternatives = [nodes[a] for a in node[1]]
+                nodes[i] = m.AlternativesMapping(
+                    {m._mapping_kind(a): a for a in alternatives}
+                )
+            case _:
+                raise ValueError(f"Unknown snapshot node: {node[0]}")
+
+    root = nodes[0] if len(nodes) > 0 else None
+    if root is None:
+        raise ValueError("Snapshot has no nodes")
+
+    return root
+
+
+def dump_mapping(mapping: m.ModelMapping, output: IO[str]):
+    json.dump(mapping_to_dict(mapping), output, separators=(",", ":"))
+
+
+def load_mapping(input: IO[str]) -> m.ModelMapping:
+    return mapping_from_dict(json.load(input))
@@ -1,29 +1,35 @@
-def to_snake_case(s: str):
-    def generate():
-        first_char = True
-        for c in s:
-            if c.isupper():
-                if not first_char:
-                    yield "_"
-                yield c.lower()
-            else:
-                yield c
+from functools import lru_cache
+
+# Generated code converts the same property names over and over
+_CACHE_SIZE = 65536
 
-            first_char = False
+_ASCII_TO_SNAKE_CASE = str.maketrans(
+    {c: "_" + c.lower() for c in "ABCDEFGHIJKLMNOPQRSTUVWXYZ"}
+)
 
-    return "".join(generate())
 
+@lru_cache(maxsize=_CACHE_SIZE)
+def to_snake_case(s: str):
+    if not s.isascii():
+        return "".join(
+            ("_" + c.lower() if i > 0 else c.lower()) if c.isupper() else c
+            for i, c in enumerate(s)
+        )
+
+    # every upper case letter starts a new word, letters of acronyms too:
+    # "ABC" -> "a_b_c"
+    snake = s.translate(_ASCII_TO_SNAKE_CASE)
+    return snake[1:] if s[:1].isupper() else snake
 
+
+@lru_cache(maxsize=_CACHE_SIZE)
 def to_camel_case(s: str, capitalize_first_letter: bool = False):
-    def generate(input_s: str):
-        upper_case_next = capitalize_first_letter
-        for c in input_s:
-            if c == "_":
-                upper_case_next = True
-            elif upper_case_next:
-                upper_case_next = False
-                yield c.upper()
-            else:
-                yield c
-
-    return "".join(generate(s.strip("_")))
+    if "_" not in s:
+        return s[:1].upper() + s[1:] if capitalize_first_letter else s
+
+    (first, *words) = s.strip("_").split("_")
+    if capitalize_first_letter:
+        first = first[:1].upper() + first[1:]
+
+    # letters after any number of underscores are upper cased
+    return first + "".join([word[:1].upper() + word[1:] for word in words])
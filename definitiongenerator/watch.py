@@ -0,0 +1,175 @@
+"""Regeneration of outputs whenever sample files change.
+
+A watcher keeps the mapping of every input file and on every refresh infers
+again only the files which were added or modified since the previous one
+(judged by their size and modification time). The mappings of all files are
+then merged and every output is rendered; an output file is written only
+when its content differs from the content it already has, so tools watching
+the outputs (editors, builds) are not triggered by unchanged files.
+
+Files are polled, which needs nothing but the standard library and works
+the same on every platform and file system.
+"""
+import os
+import threading
+from dataclasses import dataclass, field
+from functools import reduce
+from pathlib import Path
+from typing import Callable
+
+import definitiongenerator.jsonbackend as jb
+import definitiongenerator.model as m
+import definitiongenerator.writers as w
+from definitiongenerator.cache import ModelCache
+
+# Files are considered unchanged while their size and mtime stay the same
+_Signature = tuple[int, int]
+
+
+@dataclass
+class WatchTarget:
+    dump_format: w.DumpFormat
+    path: Path
+    options: dict | None = None
+
+
+@dataclass
+class RefreshResult:
+    inferred: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+    # Inputs which could not be read or parsed (for instance while they are
+    # written), they are tried again by the next refresh
+    failed: dict[str, str] = field(default_factory=dict)
+    written: list[Path] = field(default_factory=list)
+
+    @property
+    def changed(self) -> bool:
+        return len(self.inferred) > 0 or len(self.removed) > 0
+
+
+class Watcher:
+    """
+    Keeps outputs of 'targets' up to date with the files listed by 'inputs',
+    which is called by every refresh, so new files matching a pattern are
+    picked up. 'mapping' (for instance loaded from a snapshot) is merged
+    with the mappings of the files.
+    """
+
+    def __init__(
+        self,
+        inputs: Callable[[], list[str]],
+        targets: list[WatchTarget],
+        *,
+        options: m.InferenceOptions | None = None,
+        json_backend: str | None = None,
+        deduplicate: bool = True,
+        unify_threshold: float | None = None,
+        detect_formats: bool = True,
+        mapping: m.ModelMapping | None = None,
+    ):
+        self.inputs = inputs
+        self.targets = targets
+        self.options = options
+        self.json_backend = json_backend
+        self.deduplicate = deduplicate
+        self.unify_threshold = unify_threshold
+        self.detect_formats = detect_formats
+        self.base_mapping = mapping
+        self.mapping: m.ModelMapping | None = None
+        # Only the outputs of the latest mapping are needed
+        self.cache = ModelCache(max_entries=2 * len(targets) + 1)
+        self._files: dict[str, tuple[_Signature, m.ModelMapping]] = {}
+        self._refreshed = False
+
+    def refresh(self) -> RefreshResult:
+        result = RefreshResult()
+        paths = self.inputs()
+        for p in set(self._files).difference(paths):
+            del self._files[p]
+            result.removed.append(p)
+
+        for p in paths:
+            try:
+                st = os.stat(p)
+                signature = (st.st_mtime_ns, st.st_size)
+                cached = self._files.get(p)
+                if cached is not None and cached[0] == signature:
+                    continue
+
+                document = jb.load_file(p, self.json_backend)
+            except (OSError, ValueError) as e:
+                result.failed[p] = str(e)
+                continue
+
+            self._files[p] = (signature, m.new_mapping_model(document, self.options))
+            result.inferred.append(p)
+
+        if result.changed or not self._refreshed:
+            self._refreshed = True
+            self.mapping = self._merge(paths)
+            if self.mapping is not None:
+                result.written = self._write_outputs(self.mapping)
+
+        return result
+
+    def run(
+        self,
+        interval: float = 1.0,
+        stop: threading.Event | None = None,
+        on_refresh: Callable[[RefreshResult], None] | None = None,
+    ):
+        """Refreshes every 'interval' seconds until 'stop' is set."""
+        stop = stop or threading.Event()
+        while True:
+            result = self.refresh()
+            if on_refresh is not None:
+                on_refresh(result)
+
+            if stop.wait(interval):
+                return
+
+    def _merge(self, paths: list[str]) -> m.ModelMapping | None:
+        mappings = [self._files[p][1] for p in paths if p in self._files]
+        if self.base_mapping is not None:
+            mappings.insert(0, self.base_mapping)
+
+        if len(mappings) == 0:
+            return None
+
+        return reduce(m.merge_mappings, mappings)
+
+    def _write_outputs(self, mapping: m.ModelMapping) -> list[Path]:
+        fingerprint = m.mapping_fingerprint(mapping)
+        written = []
+        for target in self.targets:
+            text = self.cache.render(
+                mapping,
+                dump_format=target.dump_format,
+                options=target.options,
+                deduplicate=self.deduplicate,
+                unify_threshold=self.unify_threshold,
+                detect_formats=self.detect_formats,
+                fingerprint=fingerprint,
+            )
+            if _read_file(target.path) != text:
+                _replace_file(target.path, text)
+                written.append(target.path)
+
+        return written
+
+
+def _read_file(path: Path) -> str | None:
+    try:
+        return path.read_text(encoding="utf-8")
+    except (OSError, UnicodeDecodeError):
+        return None
+
+
+def _replace_file(path: Path, text: str):
+    """Writes the file at once, readers never see a partially written file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_name(f".{path.name}.tmp")
+    with open(temporary, "w", encoding="utf-8") as f:
+        f.write(text)
+
+    os.replace(temporary, path)
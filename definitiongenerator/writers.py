@@ -1,4 +1,8 @@
-from typing import IO, Literal, Protocol, TypedDict
+import io
+import json
+import keyword
+import re
+from typing import IO, Any, Iterator, Literal, Protocol, TypedDict
 import definitiongenerator.model as m
 import definitiongenerator.utilities as ut
 
@@ -9,7 +13,19 @@ from definitiongenerator.outputtypemodel import (
 )
 
 
-DumpFormat = Literal["TypedDict", "Markdown", "CSharp"]
+DumpFormat = Literal[
+    "TypedDict", "Markdown", "CSharp", "C#", "Validators", "Dataclasses", "Msgspec"
+]
+
+DEFAULT_CHUNK_SIZE = 64 * 1024  # characters
+
+
+class OutputSink(Protocol):
+    """Destination of generated text, for instance a text file or a
+    'io.TextIOWrapper' around a gzip file, a socket file or a response body."""
+
+    def write(self, s: str) -> Any:
+        ...
 
 
 class _TypeWriterProtocol(Protocol):
@@ -27,13 +43,22 @@ class _TypeWriterProtocol(Protocol):
 
 
 class _PythonTypedDictWriter(_TypeWriterProtocol):
-    def initialize(self, options: dict):
+    def initialize(self, found_types: list[_TypeDescription], options: dict):
         ...
 
     def print_header(self, found_types: list[_TypeDescription], output: IO[str]):
-        output.write("from typing import TypedDict\n")
+        properties = [p for t in found_types for p in t.properties.values()]
+        names = ["TypedDict"]
+        if any(p.string_format == "enum" for p in properties):
+            names.insert(0, "Literal")
+        if any(p.is_optional for p in properties):
+            names.insert(-1, "NotRequired")
+        output.write(f"from typing import {', '.join(names)}\n")
         output.write("\n")
 
+    def print_footer(self, found_types: list[_TypeDescription], output: IO[str]):
+        ...
+
     def print_type(self, type_description: _TypeDescription, output: IO[str]):
         indent = 4 * " "
         output.write("\n")
@@ -42,10 +67,20 @@ class _PythonTypedDictWriter(_TypeWriterProtocol):
             property_name,
             property_type_description,
         ) in type_description.properties.items():
+            property_type = property_type_description.name
+            if property_type_description.string_format == "enum":
+                values = [
+                    json.dumps(v, ensure_ascii=False)
+                    for v in property_type_description.enum_values
+                ]
+                property_type = f"Literal[{', '.join(values)}]"
             if property_type_description.is_array:
-                property_type = f"list[{property_type_description.name}]"
-            else:
-                property_type = property_type_description.name
+                property_type = f"list[{property_type}]"
+
+            if property_type_description.is_nullable and property_type != "None":
+                property_type = f"{property_type} | None"
+            if property_type_description.is_optional:
+                property_type = f"NotRequired[{property_type}]"
 
             output.write(f"{indent}{property_name}: {property_type}\n")
 
@@ -53,12 +88,15 @@ class _PythonTypedDictWriter(_TypeWriterProtocol):
 
 
 class _MarkdownWriter(_TypeWriterProtocol):
-    def initialize(self, options: dict):
+    def initialize(self, found_types: list[_TypeDescription], options: dict):
         ...
 
     def print_header(self, found_types: list[_TypeDescription], output: IO[str]):
         ...
 
+    def print_footer(self, found_types: list[_TypeDescription], output: IO[str]):
+        ...
+
     def print_type(self, type_description: _TypeDescription, output: IO[str]):
         output.write(f"# {type_description.name} \n")
         for (
@@ -70,10 +108,33 @@ class _MarkdownWriter(_TypeWriterProtocol):
             else:
                 property_type = property_type_description.name
 
+            flags = [
+                flag
+                for (flag, is_set) in [
+                    (
+                        property_type_description.string_format or "",
+                        property_type_description.string_format is not None,
+                    ),
+                    ("optional", property_type_description.is_optional),
+                    ("nullable", property_type_description.is_nullable),
+                ]
+                if is_set
+            ]
+            if len(flags) > 0:
+                property_type = f"{property_type} ({', '.join(flags)})"
+
             output.write(f"- {property_name}: {property_type}\n")
+            if property_type_description.skipped_elements > 0:
+                inspected = property_type_description.inspected_elements
+                total = inspected + property_type_description.skipped_elements
+                output.write(f"  - (inferred from {inspected} of {total} elements)\n")
             if len(property_type_description.sample_values) > 0:
                 for sv in property_type_description.sample_values:
                     output.write(f"  - {sv}\n")
+
+                distinct_count = property_type_description.distinct_value_count
+                if distinct_count > len(property_type_description.sample_values):
+                    output.write(f"  - ... (~{distinct_count} distinct values)\n")
         output.write("\n")
 
 
@@ -83,19 +144,40 @@ class CSharpWriterOptions(TypedDict):
 
 
 class _CSharpWriter(_TypeWriterProtocol):
-    options: CSharpWriterOptions | None
+    options: CSharpWriterOptions
 
     def initialize(self, found_types: list[_TypeDescription], options: dict):
-        self.options = options
+        self.options = CSharpWriterOptions(
+            Namespace=options["Namespace"],
+            NewStyleNamespace=options.get("NewStyleNamespace", False),
+        )
         self.class_indent: str = ""
 
+    # Types of strings of a format, System.Text.Json parses them from strings
+    _FORMAT_TYPES = {
+        "datetime": "DateTimeOffset",
+        "date": "DateOnly",
+        "uuid": "Guid",
+        "url": "Uri",
+        "integer": "long",
+        "number": "double",
+    }
+    _NUMBER_HANDLING = (
+        "[JsonNumberHandling(JsonNumberHandling.AllowReadingFromString"
+        " | JsonNumberHandling.WriteAsString)]"
+    )
+
     def print_header(self, found_types: list[_TypeDescription], output: IO[str]):
         # Using statements
-        found_list = any(t.is_array for t in found_types)
-        if found_list:
-            output.write("using System.Collections.Generic.List")
+        properties = [p for t in found_types for p in t.properties.values()]
+        if any(
+            p.string_format in ("datetime", "date", "uuid", "url") for p in properties
+        ):
+            output.write("using System;\n")
+        if any(p.is_array for p in properties):
+            output.write("using System.Collections.Generic;\n")
 
-        output.write("using System.Text.Json.Serialization;")
+        output.write("using System.Text.Json.Serialization;\n\n")
 
         # namespace
         use_new_style_namespace = self.options.get("NewStyleNamespace", False)
@@ -118,6 +200,15 @@ class _CSharpWriter(_TypeWriterProtocol):
     def print_type(self, type_description: _TypeDescription, output: IO[str]):
         method_indent = self.class_indent + 4 * " "
 
+        enum_names = {}
+        for property_name, td in type_description.properties.items():
+            if td.string_format == "enum":
+                enum_name = type_description.name + ut.to_camel_case(
+                    property_name, capitalize_first_letter=True
+                )
+                self._print_enum(enum_name, td.enum_values, output)
+                enum_names[property_name] = enum_name
+
         output.write("\n")
         output.write(f"{self.class_indent}class {type_description.name}\n")
         output.write(f"{self.class_indent}{{\n")
@@ -125,17 +216,56 @@ class _CSharpWriter(_TypeWriterProtocol):
             property_name,
             property_type_description,
         ) in type_description.properties.items():
-            type_name = _CSharpWriter._map_property_type(property_type_description)
+            type_name = _CSharpWriter._map_property_type(
+                property_type_description, enum_names.get(property_name)
+            )
             cs_property_name = ut.to_camel_case(
                 property_name, capitalize_first_letter=True
             )
             output.write(f"{method_indent}[JsonPropertyName(\"{property_name}\")]\n")
+            if property_type_description.string_format in ("integer", "number"):
+                output.write(f"{method_indent}{self._NUMBER_HANDLING}\n")
+            if (
+                property_type_description.is_optional
+                or property_type_description.is_nullable
+            ):
+                declaration = f"public {type_name}?"
+            else:
+                declaration = f"public required {type_name}"
             output.write(
-                f"{method_indent}public {type_name}? {cs_property_name} {{ get; set; }}\n"
+                f"{method_indent}{declaration} {cs_property_name} {{ get; set; }}\n"
             )
 
         output.write(f"{self.class_indent}}}\n")
 
+    def _print_enum(self, name: str, values: list[str], output: IO[str]):
+        member_indent = self.class_indent + 4 * " "
+        output.write("\n")
+        output.write(
+            f"{self.class_indent}[JsonConverter(typeof(JsonStringEnumConverter))]\n"
+        )
+        output.write(f"{self.class_indent}enum {name}\n")
+        output.write(f"{self.class_indent}{{\n")
+        used = set()
+        for value in values:
+            member = ut.to_camel_case(
+                re.sub(r"\W", "_", value), capitalize_first_letter=True
+            )
+            unique_member = member
+            i = 1
+            while unique_member in used:
+                i += 1
+                unique_member = f"{member}{i}"
+
+            used.add(unique_member)
+            if unique_member != value:
+                output.write(
+                    f"{member_indent}[JsonStringEnumMemberName(\"{value}\")]\n"
+                )
+            output.write(f"{member_indent}{unique_member},\n")
+
+        output.write(f"{self.class_indent}}}\n")
+
     @staticmethod
     def _map_python_type_name(python_type_name: str) -> str:
         match python_type_name:
@@ -147,41 +277,472 @@ class _CSharpWriter(_TypeWriterProtocol):
                 return "double"
             case "bool":
                 return "bool"
+            case "None":
+                return "object"  # always null
             case _:
                 return python_type_name # most likely custom contract type
 
     @staticmethod
-    def _map_property_type(td: _TypeDescription) -> str:
-        if td.is_array:
+    def _map_property_type(td: _TypeDescription, enum_name: str | None = None) -> str:
+        if enum_name is not None:
+            inner_type = enum_name
+        elif td.string_format is not None:
+            inner_type = _CSharpWriter._FORMAT_TYPES[td.string_format]
+        else:
             inner_type = _CSharpWriter._map_python_type_name(td.name)
+
+        if td.is_array:
             return f"List<{inner_type}>"
         else:
-            return _CSharpWriter._map_python_type_name(td.name)
+            return inner_type
 
 
-def dump_model(
+_VALIDATORS_HEADER = '''"""Validators of JSON documents, generated from samples.
+
+Every 'validate_<Type>' function checks a decoded JSON value (for instance
+the result of 'json.loads') and returns it or raises 'ValidationError'.
+Properties may only be missing or null if they were missing or null in some
+of the samples.
+"""
+from typing import Any
+
+
+class ValidationError(ValueError):
+    def __init__(self, message: str):
+        super().__init__(message)
+        self.message = message
+        self.path: list[str] = []
+
+    def within(self, segment: str) -> "ValidationError":
+        self.path.insert(0, segment)
+        return self
+
+    def __str__(self):
+        return f"${''.join(self.path)}: {self.message}"
+
+
+def _unexpected(expected: str, value: Any) -> ValidationError:
+    return ValidationError(f"expected {expected}, got {type(value).__name__}")
+
+
+def _index(items: list, item: Any) -> int:
+    return next(i for (i, e) in enumerate(items) if e is item)
+'''
+
+
+class _PythonValidatorWriter(_TypeWriterProtocol):
+    """Straight-line validation functions, one per type.
+
+    Every check is emitted inline, so validation does not look anything up
+    in the type model at run time. Error paths are only built when
+    validation fails.
+    """
+
+    # Condition under which a value of 'v' is NOT of the simple type
+    _TYPE_MISMATCH = {
+        "str": "type({v}) is not str",
+        "int": "type({v}) is not int",
+        "bool": "type({v}) is not bool",
+        "float": "type({v}) is not float and type({v}) is not int",
+    }
+
+    def initialize(self, found_types: list[_TypeDescription], options: dict):
+        ...
+
+    def print_header(self, found_types: list[_TypeDescription], output: IO[str]):
+        output.write(_VALIDATORS_HEADER)
+
+    def print_footer(self, found_types: list[_TypeDescription], output: IO[str]):
+        ...
+
+    @staticmethod
+    def function_name(type_name: str) -> str:
+        return "validate_" + re.sub(r"\W", "_", type_name)
+
+    def _check_lines(
+        self, type_name: str, v: str, path: str, indent: str
+    ) -> list[str]:
+        """Lines raising ValidationError unless 'v' is a value of 'type_name'."""
+        if type_name == "?????":
+            return []
+
+        mismatch = _PythonValidatorWriter._TYPE_MISMATCH.get(type_name)
+        if mismatch is not None:
+            return [
+                f"{indent}if {mismatch.format(v=v)}:",
+                f"{indent}    raise _unexpected({type_name!r}, {v}){path}",
+            ]
+
+        return [
+            f"{indent}try:",
+            f"{indent}    {_PythonValidatorWriter.function_name(type_name)}({v})",
+            f"{indent}except ValidationError as error:",
+            f"{indent}    raise error{path}",
+        ]
+
+    @staticmethod
+    def _presence_lines(
+        property_name: str, td: _TypeDescription, path: str
+    ) -> list[str]:
+        """Lines raising ValidationError if 'v' is missing or null unexpectedly."""
+        missing = f'raise ValidationError("missing property"){path}'
+        null = f'raise _unexpected({td.name!r}, None){path}'
+        if td.is_optional and td.is_nullable:
+            return []
+        if td.is_optional:
+            return [
+                f"    if v is None and {property_name!r} in value:",
+                f"        {null}",
+            ]
+        if td.is_nullable:
+            return [
+                f"    if v is None and {property_name!r} not in value:",
+                f"        {missing}",
+            ]
+
+        return [
+            "    if v is None:",
+            f"        if {property_name!r} not in value:",
+            f"            {missing}",
+            f"        {null}",
+        ]
+
+    def _array_lines(self, td: _TypeDescription, path: str) -> list[str]:
+        """Lines checking 'v' is a list (of lists) of 'td' values, nested loops."""
+        lines = [
+            "        if type(v) is not list:",
+            f'            raise _unexpected("list", v){path}',
+        ]
+        (items, indent) = ("v", 8 * " ")
+        for depth in range(1, td.array_depth + 1):
+            e = "e" if depth == 1 else f"e{depth}"
+            path = f'.within(f"[{{_index({items}, {e})}}]"){path}'
+            if depth == td.array_depth:
+                element_lines = self._check_lines(td.name, e, path, indent + "    ")
+                if len(element_lines) > 0:
+                    lines.append(f"{indent}for {e} in {items}:")
+                    lines.extend(element_lines)
+            else:
+                lines.append(f"{indent}for {e} in {items}:")
+                lines.append(f"{indent}    if type({e}) is not list:")
+                lines.append(f'{indent}        raise _unexpected("list", {e}){path}')
+
+            (items, indent) = (e, indent + "    ")
+
+        return lines
+
+    def print_type(self, type_description: _TypeDescription, output: IO[str]):
+        lines = [
+            "",
+            "",
+            f"def {self.function_name(type_description.name)}(value: Any) -> dict:",
+            "    if type(value) is not dict:",
+            '        raise _unexpected("object", value)',
+        ]
+        for (
+            property_name,
+            property_type_description,
+        ) in type_description.properties.items():
+            path = f".within({'.' + property_name!r})"
+            lines.append(f"    v = value.get({property_name!r})")
+            lines.extend(
+                self._presence_lines(property_name, property_type_description, path)
+            )
+            if property_type_description.name == "None":
+                lines.append("    if v is not None:")
+                lines.append(f'        raise _unexpected("None", v){path}')
+                continue
+
+            mismatch = _PythonValidatorWriter._TYPE_MISMATCH.get(
+                property_type_description.name
+            )
+            if mismatch is not None and not property_type_description.is_array:
+                lines.append(f"    if v is not None and {mismatch.format(v='v')}:")
+                lines.append(
+                    f"        raise _unexpected({property_type_description.name!r}, v)"
+                    f"{path}"
+                )
+                continue
+
+            lines.append("    if v is not None:")
+            if property_type_description.is_array:
+                lines.extend(self._array_lines(property_type_description, path))
+            else:
+                lines.extend(
+                    self._check_lines(
+                        property_type_description.name, "v", path, 8 * " "
+                    )
+                )
+
+        lines.append("    return value")
+        output.write("\n".join(lines))
+        output.write("\n")
+
+
+def _python_identifier(name: str) -> str:
+    identifier = re.sub(r"\W", "_", ut.to_snake_case(name))
+    if identifier == "" or identifier[0].isdigit():
+        identifier = "field_" + identifier
+    elif keyword.iskeyword(identifier):
+        identifier += "_"
+
+    return identifier
+
+
+class _PythonSlottedClassWriter(_TypeWriterProtocol):
+    """Slotted dataclasses with a 'from_json' converter per class.
+
+    Attributes are snake case identifiers, conversion uses the original
+    property names. Every attribute defaults to None, because properties
+    may be missing or null.
+    """
+
+    header = '''"""Models generated from sample JSON documents.
+
+'from_json' of every class converts a decoded JSON object (for instance the
+result of 'json.loads') into an instance.
+"""
+from dataclasses import dataclass
+from typing import Any
+'''
+
+    def initialize(self, found_types: list[_TypeDescription], options: dict):
+        ...
+
+    def print_header(self, found_types: list[_TypeDescription], output: IO[str]):
+        output.write(self.header)
+
+    def print_footer(self, found_types: list[_TypeDescription], output: IO[str]):
+        ...
+
+    @staticmethod
+    def class_name(type_name: str) -> str:
+        return re.sub(r"\W", "_", type_name)
+
+    @staticmethod
+    def field_names(type_description: _TypeDescription) -> dict[str, str]:
+        """Maps property names to unique attribute names."""
+        names = {}
+        used = set()
+        for property_name in type_description.properties:
+            name = _python_identifier(property_name)
+            unique_name = name
+            i = 1
+            while unique_name in used:
+                i += 1
+                unique_name = f"{name}_{i}"
+
+            used.add(unique_name)
+            names[property_name] = unique_name
+
+        return names
+
+    @staticmethod
+    def _is_class(td: _TypeDescription) -> bool:
+        return td.name not in ("str", "int", "float", "bool", "None", "?????")
+
+    @staticmethod
+    def annotation(td: _TypeDescription) -> str:
+        """Annotation of an attribute, which can always be None."""
+        if td.name == "None":
+            return "None"
+
+        if td.name == "?????":
+            name = "Any"
+        elif _PythonSlottedClassWriter._is_class(td):
+            name = _PythonSlottedClassWriter.class_name(td.name)
+        else:
+            name = td.name
+
+        for _ in range(td.array_depth):
+            name = f"list[{name}]"
+
+        return f"{name} | None"
+
+    def print_field(
+        self, field_name: str, property_name: str, td: _TypeDescription
+    ) -> str:
+        return f"    {field_name}: {self.annotation(td)} = None\n"
+
+    def print_converter(
+        self, type_description: _TypeDescription, fields: dict[str, str]
+    ) -> str:
+        name = self.class_name(type_description.name)
+        lines = [
+            "",
+            "    @classmethod",
+            f'    def from_json(cls, value: dict) -> "{name}":',
+            "        get = value.get",
+            "        return cls(",
+        ]
+        for property_name, td in type_description.properties.items():
+            get = f"get({property_name!r})"
+            if not self._is_class(td):
+                lines.append(f"            {get},")
+                continue
+
+            convert = f"{self.class_name(td.name)}.from_json"
+            if td.is_array:
+                # one comprehension for every level of nested lists
+                names = ["e", *(f"e{depth}" for depth in range(2, td.array_depth + 1))]
+                converted = f"{convert}({names[-1]})"
+                for items, e in reversed(list(zip(["x", *names], names))):
+                    converted = f"[{converted} for {e} in {items}]"
+
+                lines.append(
+                    f"            {converted} if (x := {get}) is not None else None,"
+                )
+            else:
+                lines.append(
+                    f"            {convert}(x) if (x := {get}) is not None else None,"
+                )
+
+        lines.append("        )")
+        return "\n".join(lines) + "\n"
+
+    def print_type(self, type_description: _TypeDescription, output: IO[str]):
+        fields = self.field_names(type_description)
+        output.write("\n\n")
+        output.write(self.class_declaration(type_description))
+        for property_name, td in type_description.properties.items():
+            output.write(self.print_field(fields[property_name], property_name, td))
+
+        output.write(self.print_converter(type_description, fields))
+
+    def class_declaration(self, type_description: _TypeDescription) -> str:
+        return (
+            "@dataclass(slots=True)\n"
+            f"class {self.class_name(type_description.name)}:\n"
+        )
+
+
+class _PythonMsgspecStructWriter(_PythonSlottedClassWriter):
+    """'msgspec.Struct' classes, 'from_json' is done by 'msgspec.convert'."""
+
+    header = '''"""Models generated from sample JSON documents.
+
+'from_json' of every class converts a decoded JSON object (for instance the
+result of 'json.loads') into an instance; 'msgspec.json.decode(data,
+type=<class>)' decodes JSON text directly.
+"""
+from typing import Any
+
+import msgspec
+'''
+
+    def class_declaration(self, type_description: _TypeDescription) -> str:
+        name = self.class_name(type_description.name)
+        return f"class {name}(msgspec.Struct, omit_defaults=True):\n"
+
+    def print_field(
+        self, field_name: str, property_name: str, td: _TypeDescription
+    ) -> str:
+        if field_name == property_name:
+            return super().print_field(field_name, property_name, td)
+
+        return (
+            f"    {field_name}: {self.annotation(td)} = "
+            f"msgspec.field(name={property_name!r}, default=None)\n"
+        )
+
+    def print_converter(
+        self, type_description: _TypeDescription, fields: dict[str, str]
+    ) -> str:
+        name = self.class_name(type_description.name)
+        return (
+            "\n"
+            "    @classmethod\n"
+            f'    def from_json(cls, value: dict) -> "{name}":\n'
+            "        return msgspec.convert(value, type=cls)\n"
+        )
+
+
+_WRITERS: dict[str, type[_TypeWriterProtocol]] = {
+    "TypedDict": _PythonTypedDictWriter,
+    "Markdown": _MarkdownWriter,
+    "CSharp": _CSharpWriter,
+    "C#": _CSharpWriter,
+    "Validators": _PythonValidatorWriter,
+    "Dataclasses": _PythonSlottedClassWriter,
+    "Msgspec": _PythonMsgspecStructWriter,
+}
+
+
+def new_found_types(
     mapping: m.ModelMapping,
-    output: IO[str],
     *,
-    dump_format: DumpFormat = "TypedDict",
-    options: dict | None = None,
-):
-    state = _MapperState()
+    deduplicate: bool = True,
+    unify_threshold: float | None = None,
+    detect_formats: bool = True,
+) -> list[_TypeDescription]:
+    """Creates types to write from the mapping; reusable for every format."""
+    state = _MapperState(
+        deduplicate=deduplicate,
+        unify_threshold=unify_threshold,
+        detect_formats=detect_formats,
+    )
     type_model, _ = _new_type_model(mapping, state, [])
+    return type_model.found_types
 
-    writers = {
-        "TypedDict": _PythonTypedDictWriter(),
-        "Markdown": _MarkdownWriter(),
-        "C#": _CSharpWriter(),
-    }
 
-    selected_writer: _TypeWriterProtocol = writers[dump_format]
+def iter_model_chunks(
+    found_types: list[_TypeDescription],
+    *,
+    dump_format: DumpFormat = "TypedDict",
+    options: dict | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[str]:
+    """
+    Yields the generated text in chunks of about 'chunk_size' characters.
+
+    Types are rendered into a single reused in-memory buffer, so writers can
+    issue many small writes while the consumer sees a few large chunks and
+    only one chunk is held in memory at a time.
+    """
+    selected_writer: _TypeWriterProtocol = _WRITERS[dump_format]()
     if options is not None:
-        selected_writer.initialize(type_model.found_types, options=options)
+        selected_writer.initialize(found_types, options=options)
 
-    selected_writer.print_header(type_model.found_types, output)
+    buffer = io.StringIO()
 
-    for found_type in type_model.found_types:
-        selected_writer.print_type(found_type, output)
+    def take_chunk() -> str:
+        chunk = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return chunk
 
-    selected_writer.print_footer(type_model.found_types, output)
+    selected_writer.print_header(found_types, buffer)
+    for found_type in found_types:
+        selected_writer.print_type(found_type, buffer)
+        if buffer.tell() >= chunk_size:
+            yield take_chunk()
+
+    selected_writer.print_footer(found_types, buffer)
+    if buffer.tell() > 0:
+        yield take_chunk()
+
+
+def write_model(
+    found_types: list[_TypeDescription],
+    output: OutputSink,
+    *,
+    dump_format: DumpFormat = "TypedDict",
+    options: dict | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+):
+    for chunk in iter_model_chunks(
+        found_types, dump_format=dump_format, options=options, chunk_size=chunk_size
+    ):
+        output.write(chunk)
+
+
+def dump_model(
+    mapping: m.ModelMapping,
+    output: OutputSink,
+    *,
+    dump_format: DumpFormat = "TypedDict",
+    options: dict | None = None,
+):
+    write_model(
+        new_found_types(mapping), output, dump_format=dump_format, options=options
+    )
@@ -0,0 +1,128 @@
+import io
+import unittest
+
+import definitiongenerator.cache as c
+import definitiongenerator.model as fj
+import definitiongenerator.writers as w
+
+
+class MappingFingerprintTests(unittest.TestCase):
+    def test_equal_content_equal_fingerprint(self):
+        a = fj.new_mapping_model({"a": ["x", "y"], "b": {"c": 1.5}})
+        b = fj.new_mapping_model({"a": ["y", "x"], "b": {"c": 2.5}})
+
+        self.assertEqual(fj.mapping_fingerprint(a), fj.mapping_fingerprint(b))
+
+    def test_changes_affecting_output_change_fingerprint(self):
+        base = {"a": ["x"], "b": {"c": 1}}
+        fingerprint = fj.mapping_fingerprint(fj.new_mapping_model(base))
+
+        for changed in [
+            {"a": ["z"], "b": {"c": 1}},
+            {"a": ["x", "x"], "b": {"c": 1}},
+            {"a": ["x"], "b": {"c": "1"}},
+            {"a": ["x"], "b": {"c": 1, "d": 1}},
+            {"b": {"c": 1}, "a": ["x"]},
+            {"a": [{"x": 1}], "b": {"c": 1}},
+        ]:
+            with self.subTest(changed):
+                self.assertNotEqual(
+                    fingerprint, fj.mapping_fingerprint(fj.new_mapping_model(changed))
+                )
+
+    def test_in_place_update_changes_fingerprint(self):
+        mapping = fj.new_mapping_model({"a": "x"})
+        fingerprint = fj.mapping_fingerprint(mapping)
+
+        mapping = fj._update_mapping(mapping, {"a": "y"})
+
+        self.assertNotEqual(fingerprint, fj.mapping_fingerprint(mapping))
+
+
+class ModelCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.mapping = fj.new_mapping_model({"a": {"b": "x"}, "list": [1, 2]})
+
+    def test_repeated_rendering_is_a_cache_hit(self):
+        cache = c.ModelCache()
+        expected = io.StringIO()
+        w.dump_model(self.mapping, expected, dump_format="Markdown")
+
+        for _ in range(3):
+            output = io.StringIO()
+            cache.dump_model(self.mapping, output, dump_format="Markdown")
+            self.assertEqual(expected.getvalue(), output.getvalue())
+
+        # output and found types missed once, then the output hits
+        self.assertEqual(c.CacheStats(hits=2, misses=2, evictions=0), cache.stats)
+        self.assertEqual(2, cache.size)
+
+    def test_found_types_are_shared_by_formats(self):
+        cache = c.ModelCache()
+
+        cache.render(self.mapping, dump_format="TypedDict")
+        cache.render(
+            self.mapping,
+            dump_format="CSharp",
+            options={"Namespace": "A", "NewStyleNamespace": True},
+        )
+        cache.render(
+            self.mapping,
+            dump_format="CSharp",
+            options={"Namespace": "B", "NewStyleNamespace": True},
+        )
+
+        # three outputs, found types computed once
+        self.assertEqual(c.CacheStats(hits=2, misses=4, evictions=0), cache.stats)
+        self.assertEqual(4, cache.size)
+
+    def test_updated_mapping_is_rendered_again(self):
+        cache = c.ModelCache()
+        before = cache.render(self.mapping)
+
+        self.mapping = fj._update_mapping(self.mapping, {"a": {"b": "x", "c": 1}})
+
+        self.assertNotEqual(before, cache.render(self.mapping))
+
+    def test_repeated_values_are_rendered_again(self):
+        cache = c.ModelCache()
+        mapping = fj.new_mapping_model({"k": "alpha"})
+        mapping = fj._update_mapping(mapping, {"k": "beta"})
+        self.assertIn("k: str", cache.render(mapping))
+
+        # the same values again, now they are an enum
+        for document in ({"k": "alpha"}, {"k": "beta"}):
+            mapping = fj._update_mapping(mapping, document)
+
+        expected = io.StringIO()
+        w.dump_model(mapping, expected)
+        self.assertIn('k: Literal["alpha", "beta"]', expected.getvalue())
+        self.assertEqual(expected.getvalue(), cache.render(mapping))
+
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = c.ModelCache(max_entries=2)
+        mappings = [fj.new_mapping_model({f"p{i}": i}) for i in range(3)]
+
+        for mapping in mappings:
+            cache.found_types(mapping)
+        cache.found_types(mappings[2])
+        cache.found_types(mappings[0])
+
+        self.assertEqual(2, cache.size)
+        self.assertEqual(c.CacheStats(hits=1, misses=4, evictions=2), cache.stats)
+
+    def test_precomputed_fingerprint(self):
+        cache = c.ModelCache()
+        fingerprint = fj.mapping_fingerprint(self.mapping)
+
+        first = cache.render(self.mapping, fingerprint=fingerprint)
+
+        self.assertIs(first, cache.render(self.mapping, fingerprint=fingerprint))
+
+    def test_invalid_size(self):
+        with self.assertRaises(ValueError):
+            c.ModelCache(max_entries=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+import contextlib
+import io
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+import definitiongenerator.cli as cli
+import definitiongenerator.model as fj
+
+
+class MainTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.root = Path(self.directory.name)
+        self.samples = [
+            {"page": i, "items": [{"id": f"id-{i}-{j}", "value": j} for j in range(3)]}
+            for i in range(5)
+        ]
+        self.samples[2]["nextPage"] = "https://example.com/?page=3"
+        for i, sample in enumerate(self.samples):
+            p = self.root / "in" / f"page{i}.json"
+            p.parent.mkdir(exist_ok=True)
+            p.write_text(json.dumps(sample), encoding="utf-8")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _main(self, *args: str) -> int:
+        with contextlib.redirect_stdout(io.StringIO()):
+            return cli.main(list(args))
+
+    def test_all_formats_in_one_run(self):
+        out = self.root / "out"
+        result = self._main(
+            str(self.root / "in" / "*.json"),
+            "--output-dir",
+            str(out),
+            "--format",
+            "TypedDict",
+            "--format",
+            "Markdown",
+            "--format",
+            f"CSharp={out / 'cs' / 'Api.cs'}",
+            "--namespace",
+            "Test.Namespace",
+            "--threads",
+            "2",
+        )
+
+        self.assertEqual(0, result)
+        python = (out / "models.py").read_text(encoding="utf-8")
+        self.assertIn("nextPage: NotRequired[str]", python)
+        self.assertTrue((out / "models.md").exists())
+        self.assertIn("Test.Namespace", (out / "cs" / "Api.cs").read_text())
+
+    def test_same_mapping_as_sequential_inference(self):
+        expected = fj.new_mapping_model(self.samples[0])
+        for sample in self.samples[1:]:
+            expected = fj._update_mapping(expected, sample)
+
+        paths = cli.expand_inputs([str(self.root / "in" / "page*.json")])
+        self.assertEqual(5, len(paths))
+        self.assertEqual(expected, cli.infer_from_paths(paths, threads=2))
+
+    def test_ndjson_inputs(self):
+        lines = self.root / "pages.ndjson"
+        lines.write_text(
+            "\n".join(json.dumps(s) for s in self.samples), encoding="utf-8"
+        )
+        expected = fj.new_mapping_model(self.samples[0])
+        for sample in self.samples[1:]:
+            expected = fj._update_mapping(expected, sample)
+
+        result = cli.infer_from_paths([str(lines)], processes=2, ndjson=True)
+
+        self.assertEqual(expected, result)
+
+    def test_streamed_inputs(self):
+        paths = cli.expand_inputs([str(self.root / "in" / "page*.json")])
+        expected = cli.infer_from_paths(paths, threads=2)
+
+        self.assertEqual(expected, cli.infer_from_paths(paths, stream=True))
+
+        out = self.root / "out"
+        self.assertEqual(0, self._main(*paths, "--stream", "-o", str(out)))
+        python = (out / "models.py").read_text(encoding="utf-8")
+        self.assertIn("nextPage: NotRequired[str]", python)
+
+    def test_snapshot_is_continued(self):
+        snapshot = self.root / "state.json"
+        out = self.root / "out"
+        first = str(self.root / "in" / "page0.json")
+        self._main(first, "--snapshot", str(snapshot), "-o", str(out))
+        python = (out / "models.py").read_text(encoding="utf-8")
+        self.assertNotIn("nextPage", python)
+
+        second = str(self.root / "in" / "page2.json")
+        self._main(second, "--snapshot", str(snapshot), "-o", str(out))
+        python = (out / "models.py").read_text(encoding="utf-8")
+        self.assertIn("nextPage", python)
+
+    def test_unknown_format(self):
+        with contextlib.redirect_stderr(io.StringIO()):
+            with self.assertRaises(SystemExit):
+                self._main(str(self.root / "in" / "page0.json"), "--format", "Xml")
@@ -0,0 +1,115 @@
+import asyncio
+import json
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import definitiongenerator.crawler as cr
+import definitiongenerator.model as fj
+
+
+def _page(number: int, last: int, new_field_at: int | None = None) -> dict:
+    page = {"items": [{"id": f"{number}-{i}", "value": i} for i in range(3)]}
+    if number == new_field_at:
+        page["items"][0]["extra"] = True
+    if number < last:
+        page["nextPage"] = f"/pages?number={number + 1}"
+    return page
+
+
+class _StubApi(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def do_GET(self):
+        server = self.server
+        parts = urlsplit(self.path)
+        if parts.path != "/pages":
+            self.send_error(404)
+            return
+
+        number = int(parse_qs(parts.query)["number"][0])
+        body = json.dumps(_page(number, server.last, server.new_field_at)).encode()
+        server.requested.append(number)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        ...
+
+
+class CrawlTests(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _StubApi)
+        self.server.last = 10
+        self.server.new_field_at = None
+        self.server.requested = []
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _crawl(self, *urls: str, **options) -> cr.CrawlResult:
+        return asyncio.run(cr.crawl(list(urls), options=cr.CrawlOptions(**options)))
+
+    def test_all_pages_are_followed(self):
+        result = self._crawl(f"{self.base}/pages?number=0", stable_pages=None)
+
+        expected = fj.new_mapping_model(_page(0, 10))
+        for number in range(1, 11):
+            expected = fj._update_mapping(expected, _page(number, 10))
+
+        self.assertEqual("end", result.stop_reason)
+        self.assertEqual(11, result.pages)
+        self.assertEqual(expected, result.mapping)
+
+    def test_stops_when_types_are_stable(self):
+        self.server.last = 100
+        self.server.new_field_at = 3
+
+        result = self._crawl(f"{self.base}/pages?number=0", stable_pages=4)
+
+        self.assertEqual("stable", result.stop_reason)
+        # the types change on pages 0 and 3, pages 4 to 7 change nothing
+        self.assertEqual(8, result.pages)
+        items = result.mapping.properties["items"].element_mapping
+        self.assertIn("extra", items.properties)
+        self.assertLess(len(self.server.requested), 10)
+
+    def test_max_pages(self):
+        result = self._crawl(
+            f"{self.base}/pages?number=0", stable_pages=None, max_pages=4
+        )
+
+        self.assertEqual("max_pages", result.stop_reason)
+        self.assertEqual(4, result.pages)
+        self.assertListEqual([0, 1, 2, 3], self.server.requested)
+
+    def test_chains_are_crawled_concurrently_over_pooled_connections(self):
+        client = cr.HttpClient(max_connections=2)
+        urls = [f"{self.base}/pages?number={n}" for n in (0, 5)]
+
+        result = asyncio.run(
+            cr.crawl(urls, options=cr.CrawlOptions(stable_pages=None), client=client)
+        )
+        client.close()
+
+        # the first chain reaches the pages of the second one, pages are
+        # fetched once
+        self.assertEqual(11, result.pages)
+        self.assertEqual(11, len(self.server.requested))
+        self.assertLessEqual(client.connections_opened, 2)
+
+    def test_http_error(self):
+        with self.assertRaisesRegex(cr.CrawlError, "HTTP 404"):
+            self._crawl(f"{self.base}/missing")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+
+import definitiongenerator.formats as fmt
+import definitiongenerator.sketches as sk
+
+
+def _samples(*values: str, limit: int = 64) -> sk.StringReservoir:
+    samples = sk.StringReservoir(limit=limit)
+    for v in values:
+        samples.add(v)
+
+    return samples
+
+
+class DetectFormatTests(unittest.TestCase):
+    def test_formats(self):
+        for expected, values in [
+            ("datetime", ["2015-02-03T11:00:00Z", "2022-10-15T09:39:14.123+02:00"]),
+            ("date", ["2015-02-03", "1997-05-10"]),
+            ("uuid", ["8c6f7c4e-0d4b-4b0e-9a43-3f1c2b6a1e11"]),
+            ("url", ["https://example.com/api?page=2", "http://localhost:8080"]),
+            ("integer", ["0", "-15", "991000000019705066"]),
+            ("number", ["1.5", "-2", "1e10"]),
+        ]:
+            with self.subTest(expected):
+                self.assertEqual(expected, fmt.detect_format(_samples(*values)))
+
+    def test_every_value_must_match(self):
+        for values in [
+            ["2015-02-03T11:00:00Z", "yesterday"],
+            ["2022-10-15 09:39:14"],
+            ["2022-10-15T09:39:14+0200"],
+            ["2015-02-30"],
+            ["/pages?number=2"],
+            ["001", "002"],
+            ["9910000000197050661"],
+        ]:
+            with self.subTest(values):
+                self.assertIsNone(fmt.detect_format(_samples(*values)))
+
+    def test_enum(self):
+        samples = _samples(*["active", "in-progress", "deleted"] * 2)
+
+        self.assertEqual("enum", fmt.detect_format(samples))
+
+    def test_values_seen_once_are_not_enum(self):
+        samples = _samples("alice", "bob", "carol")
+
+        self.assertIsNone(fmt.detect_format(samples))
+
+    def test_enum_values_must_be_known_and_identifiers(self):
+        for samples in [
+            _samples(*[f"value{i % 20}" for i in range(100)], limit=10),
+            _samples(*[f"value{i % 20}" for i in range(100)]),
+            _samples(*["Book of the damned", "Klin"] * 5),
+        ]:
+            with self.subTest(samples.sample_values()):
+                self.assertIsNone(fmt.detect_format(samples))
+
+    def test_no_samples(self):
+        self.assertIsNone(fmt.detect_format(None))
+        self.assertIsNone(fmt.detect_format(sk.StringReservoir()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+import json
+import unittest
+from pathlib import Path
+
+import definitiongenerator.jsonbackend as jb
+import definitiongenerator.model as fj
+
+_SAMPLE_PATH = Path(__file__).parent.parent / "sample_response.json"
+
+
+class JsonBackendTests(unittest.TestCase):
+    def test_standard_library_is_always_available(self):
+        self.assertEqual("json", jb.available_backends()[-1])
+        self.assertIs(json.loads, jb.get_loads("json"))
+
+    def test_backends_create_identical_mappings(self):
+        expected = fj.new_mapping_model(jb.load_file(_SAMPLE_PATH, "json"))
+
+        for backend in jb.available_backends():
+            with self.subTest(backend):
+                result = fj.new_mapping_model(jb.load_file(_SAMPLE_PATH, backend))
+                self.assertEqual(expected, result)
+
+    def test_documents_accepted_only_by_standard_library(self):
+        data = b'{"big": 123456789012345678901234567890, "nan": NaN, "s": "\\u00e9"}'
+        expected = json.loads(data)
+
+        for backend in jb.available_backends():
+            with self.subTest(backend):
+                self.assertEqual(repr(expected), repr(jb.get_loads(backend)(data)))
+
+    def test_invalid_document(self):
+        for backend in jb.available_backends():
+            with self.subTest(backend):
+                with self.assertRaises(ValueError):
+                    jb.get_loads(backend)(b'{"a": ')
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            jb.get_loads("yaml")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import io
+import json
+import unittest
+import definitiongenerator.jsonstream as js
+
+
+class IterEventsTests(unittest.TestCase):
+    def test_object_events(self):
+        result = list(js.iter_events(io.StringIO('{"a": [1, "x"], "b": null}')))
+
+        self.assertListEqual(
+            [
+                ("start_map", None),
+                ("map_key", "a"),
+                ("start_array", None),
+                ("value", 1),
+                ("value", "x"),
+                ("end_array", None),
+                ("map_key", "b"),
+                ("value", None),
+                ("end_map", None),
+            ],
+            result,
+        )
+
+    def test_scalar_values(self):
+        doc = '[0, -12, 1.5, 2e3, -0.25E-2, true, false, null, "\\"q\\" \\u0105\\\\"]'
+        result = [v for (e, v) in js.iter_events(io.StringIO(doc)) if e == "value"]
+
+        self.assertListEqual(json.loads(doc), result)
+
+    def test_tokens_split_between_chunks(self):
+        doc = '{"key\\\\": [12345.678, "a \\" b", true, {"n": null}], "e": {}, "l": []}'
+
+        for chunk_size in range(1, 8):
+            events = list(js.iter_events(io.StringIO(doc), chunk_size=chunk_size))
+            self.assertListEqual(list(js.iter_events(io.StringIO(doc))), events)
+
+    def test_binary_input_with_multibyte_characters(self):
+        doc = '{"zażółć": "gęślą jaźń"}'
+        result = list(js.iter_events(io.BytesIO(doc.encode("utf-8")), chunk_size=1))
+
+        self.assertIn(("map_key", "zażółć"), result)
+        self.assertIn(("value", "gęślą jaźń"), result)
+
+    def test_invalid_documents(self):
+        for doc in ['{"a" 1}', "[1,]", "[1 2]", '{"a": 1', "[}", "1 2", "", "tru"]:
+            with self.assertRaises(ValueError, msg=doc):
+                list(js.iter_events(io.StringIO(doc)))
+
+
+if __name__ == "__main__":
+    unittest.main()
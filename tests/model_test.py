@@ -1,6 +1,15 @@
+import functools
+import io
+import json
+import sys
 import unittest
+from collections import Counter
+from pathlib import Path
+
 import definitiongenerator.model as fj
 
+SAMPLE_RESPONSE_PATH = Path(__file__).parent.parent / "sample_response.json"
+
 
 class NewMappingModelTests(unittest.TestCase):
     def test_int_mapping(self):
@@ -240,6 +249,64 @@ class NewMappingModelTests(unittest.TestCase):
         )
         self._assert_simple_mapping(list_el.properties["value"], int)
 
+    def test_alternatives_are_updated(self):
+        result = fj.new_mapping_model(
+            [1, "a", 2, {"x": 1}, "b", {"y": "z"}, [1.5], True, {"x": "s"}]
+        )
+
+        self.assertIsInstance(result, fj.ListMapping)
+
+        alternatives = result.element_mapping
+        self.assertIsInstance(alternatives, fj.AlternativesMapping)
+        self.assertListEqual(
+            [int, str, dict, list, bool], list(alternatives.alternatives)
+        )
+        self._assert_simple_mapping(alternatives.alternatives[str], str, ["a", "b"])
+
+        object_alternative: fj.ObjectMapping = alternatives.alternatives[dict]
+        self.assertIsInstance(
+            object_alternative.properties["x"], fj.AlternativesMapping
+        )
+        self._assert_simple_mapping(object_alternative.properties["y"], str, ["z"])
+
+        doc = '[1, "a", 2, {"x": 1}, "b", {"y": "z"}, [1.5], true, {"x": "s"}]'
+        stream_result = fj.new_mapping_model_from_stream(io.StringIO(doc))
+        self.assertEqual(result, stream_result)
+
+    def test_nodes_are_compact(self):
+        count_key = "".join(["co", "unt"])
+        result = fj.new_mapping_model({"name": "a", count_key: 1, "list": []})
+
+        for mapping in [result, *result.properties.values()]:
+            self.assertFalse(hasattr(mapping, "__dict__"))
+
+        self.assertIsNone(result.properties["count"].string_samples)
+        self.assertIs(
+            sys.intern("count"), next(k for k in result.properties if k == "count")
+        )
+
+    def test_deeply_nested_document(self):
+        doc = {"leaf": "value"}
+        for _ in range(2000):
+            doc = {"child": doc}
+
+        result = fj.new_mapping_model(doc)
+        for _ in range(2000):
+            self.assertEqual(["child"], list(result.properties))
+            result = result.properties["child"]
+
+        self._assert_simple_mapping(result.properties["leaf"], str, ["value"])
+
+    def test_string_samples_are_bounded(self):
+        options = fj.InferenceOptions(string_sample_limit=3)
+        result = fj.new_mapping_model([f"id-{i}" for i in range(100)], options)
+
+        element_mapping = result.element_mapping
+        self.assertEqual(3, len(element_mapping.string_value_set))
+        self.assertAlmostEqual(
+            100, element_mapping.string_samples.distinct_count, delta=10
+        )
+
     def _assert_simple_mapping(
             self,
             mapping: fj.ModelMapping,
@@ -255,5 +322,411 @@ class NewMappingModelTests(unittest.TestCase):
             self.assertEqual(0, len(mapping.string_value_set))
 
 
+class NewMappingModelFromStreamTests(unittest.TestCase):
+    def test_same_mapping_as_loaded_document(self):
+        docs = [
+            "10",
+            '"value"',
+            '{"propA": null, "intProp": 10, "floatProp": 20.0, "boolProp": true}',
+            '[{"a": []}, {"a": [10, 20]}, {"a": [], "b": {"c": ["x", "y"]}}]',
+            '[[1, 2], [], [[3.5]]]',
+            '{"a": 1, "b": {"c": "x"}, "d": [{"e": "y"}, {"f": false}]}',
+        ]
+
+        for doc in docs:
+            expected = fj.new_mapping_model(json.loads(doc))
+            result = fj.new_mapping_model_from_stream(io.StringIO(doc), chunk_size=3)
+            self.assertEqual(expected, result, msg=doc)
+
+    def test_same_mapping_for_sample_response(self):
+        with open(SAMPLE_RESPONSE_PATH, "r", encoding="utf-8") as f:
+            expected = fj.new_mapping_model(json.load(f))
+
+        with open(SAMPLE_RESPONSE_PATH, "rb") as f:
+            result = fj.new_mapping_model_from_stream(f, chunk_size=1000)
+
+        self.assertEqual(expected, result)
+
+    def test_type_change_creates_alternatives(self):
+        result = fj.new_mapping_model_from_stream(
+            io.StringIO('[{"a": 1}, {"a": {"b": 2}}]')
+        )
+
+        a_prop = result.element_mapping.properties["a"]
+        self.assertIsInstance(a_prop, fj.AlternativesMapping)
+        self.assertEqual(
+            {
+                int: fj.SimpleMapping(int),
+                dict: fj.ObjectMapping(
+                    {"b": fj.SimpleMapping(int)},
+                    object_count=1,
+                    presence_counts=Counter({"b": 1}),
+                ),
+            },
+            a_prop.alternatives,
+        )
+
+    def test_null_list_element_is_not_supported(self):
+        with self.assertRaises(Exception):
+            fj.new_mapping_model_from_stream(io.StringIO("[1, null]"))
+
+
+class ShapeCacheTests(unittest.TestCase):
+    @staticmethod
+    def _record(i: int) -> dict:
+        return {
+            "id": i,
+            "name": f"name-{i}",
+            "kind": "book" if i % 2 else "film",
+            "score": 1.5,
+            "deleted": False,
+            "deletedDate": None,
+            "tags": [f"tag-{i % 3}"],
+            "owner": {"id": i, "login": f"user-{i % 5}"},
+            "extra": i if i < 5 else f"{i}",
+        }
+
+    def test_same_mapping_with_and_without_cache(self):
+        records = [self._record(i) for i in range(50)]
+        records[20]["owner"] = "unknown"
+        records[30]["deletedDate"] = "2020-01-01"
+
+        # records are folded one by one only when they are not folded by columns
+        cached = fj.new_mapping_model(
+            records, fj.InferenceOptions(shape_cache=True, columnar=False)
+        )
+        not_cached = fj.new_mapping_model(
+            records, fj.InferenceOptions(shape_cache=False, columnar=False)
+        )
+
+        self.assertEqual(not_cached, cached)
+
+    def test_hits_and_misses_are_counted(self):
+        options = fj.InferenceOptions()
+        result = fj.new_mapping_model([self._record(i) for i in range(10)], options)
+
+        # shapes differ only for 'extra' which is an int for the first 5 records
+        self.assertEqual(2, options.stats.shape_cache_misses)
+        self.assertEqual(8, options.stats.shape_cache_hits)
+        self._assert_names(result, [f"name-{i}" for i in range(10)])
+
+    def test_known_shapes_are_hit_after_the_shape_limit(self):
+        def record(i: int) -> dict:
+            record = self._record(i)
+            record[f"rare{i}"] = i
+            return record
+
+        records = [record(i) for i in range(40)] + [record(0) for _ in range(1000)]
+        options = fj.InferenceOptions(columnar=False)
+        fj.new_mapping_model(records, options)
+
+        self.assertEqual(40, options.stats.shape_cache_misses)
+        self.assertEqual(1000, options.stats.shape_cache_hits)
+
+    def _assert_names(self, mapping: fj.ListMapping, names: list[str]):
+        name_mapping = mapping.element_mapping.properties["name"]
+        self.assertSetEqual(set(names), name_mapping.string_value_set)
+        self.assertEqual(len(names), name_mapping.string_samples.observed_count)
+
+
+class ColumnarTests(unittest.TestCase):
+    @staticmethod
+    def _record(i: int) -> dict:
+        record = {
+            "id": i,
+            "note": None if i % 4 else f"note-{i}",
+            "value": [1, "one", 1.5, {"n": i}][i % 4] if i > 10 else i,
+            "tags": [f"tag-{i % 7}"] * (i % 3),
+            "owner": {"id": i, "login": f"user-{i % 5}", "team": None},
+        }
+        if i % 5 == 0:
+            del record["id"]
+        if i == 30:
+            record["late"] = True
+        return record
+
+    def _assert_same_as_row_wise(self, document, **options):
+        row_wise = fj.new_mapping_model(
+            document, fj.InferenceOptions(columnar=False, **options)
+        )
+        columnar = fj.new_mapping_model(
+            document, fj.InferenceOptions(columnar=True, **options)
+        )
+
+        self.assertEqual(row_wise, columnar)
+        # property order and string samples included
+        self.assertEqual(
+            fj.mapping_fingerprint(row_wise), fj.mapping_fingerprint(columnar)
+        )
+        return columnar
+
+    def test_same_mapping_as_row_wise_folding(self):
+        records = [self._record(i) for i in range(100)]
+
+        for limit in (5, 1000):
+            with self.subTest(limit):
+                self._assert_same_as_row_wise(
+                    {"items": records, "nested": [records[:20], records[20:]]},
+                    string_sample_limit=limit,
+                )
+
+    def test_wide_records(self):
+        records = [
+            {f"field{j}": [j, str(j)][i % 2] for j in range(40)} for i in range(30)
+        ]
+        reordered = [dict(reversed(record.items())) for record in records[:3]]
+
+        self._assert_same_as_row_wise({"items": records})
+        self._assert_same_as_row_wise({"items": records + reordered})
+
+    def test_properties_are_ordered_by_first_not_null_value(self):
+        records = [{"a": None, "b": i} for i in range(20)] + [{"a": 1, "c": 2}]
+
+        result = self._assert_same_as_row_wise(records)
+
+        self.assertListEqual(["b", "a", "c"], list(result.element_mapping.properties))
+
+    def test_null_counts_are_ordered_by_first_null_value(self):
+        records = [{"k2": 2}, {"k5": None}] + [{"k2": 1}] * 12 + [{"k2": None}] * 2
+
+        result = self._assert_same_as_row_wise(records)
+
+        row_wise = fj.new_mapping_model(records, fj.InferenceOptions(columnar=False))
+        self.assertListEqual(["k5", "k2"], list(result.element_mapping.null_counts))
+        self.assertListEqual(
+            list(row_wise.element_mapping.null_counts),
+            list(result.element_mapping.null_counts),
+        )
+
+    def test_update_of_existing_mapping(self):
+        mapping = fj.new_mapping_model([{"id": "x", "extra": {"a": 1}}])
+        update = [self._record(i) for i in range(40)]
+
+        result = fj._update_mapping(mapping, update)
+
+        expected = fj.new_mapping_model(
+            [{"id": "x", "extra": {"a": 1}}], fj.InferenceOptions(columnar=False)
+        )
+        expected = fj._update_mapping(
+            expected, update, fj.InferenceOptions(columnar=False)
+        )
+        self.assertEqual(expected, result)
+        self.assertEqual(
+            fj.mapping_fingerprint(expected), fj.mapping_fingerprint(result)
+        )
+
+    def test_null_list_element_is_not_supported(self):
+        with self.assertRaises(Exception):
+            fj.new_mapping_model([1] * 20 + [None])
+
+    def test_deeply_nested_lists(self):
+        document = [1] * 20
+        for _ in range(200):
+            document = [{"child": document}] + [{"child": []}] * 19
+
+        row_wise = fj.new_mapping_model(document, fj.InferenceOptions(columnar=False))
+        columnar = fj.new_mapping_model(document)
+
+        # comparison of mappings is recursive, fingerprints are not
+        self.assertEqual(
+            fj.mapping_fingerprint(row_wise), fj.mapping_fingerprint(columnar)
+        )
+
+
+class ListSamplingTests(unittest.TestCase):
+    def _new_mapping(self, v, mode: fj.ListSamplingMode, size: int, seed=None):
+        policy = fj.ListSamplingPolicy(mode=mode, size=size, seed=seed)
+        return fj.new_mapping_model(v, fj.InferenceOptions(list_sampling=policy))
+
+    def test_all_elements_are_inspected_by_default(self):
+        result = fj.new_mapping_model([[1, 2], [3]])
+
+        self.assertEqual(2, result.inspected_count)
+        self.assertEqual(3, result.element_mapping.inspected_count)
+        self.assertEqual(0, result.element_mapping.skipped_count)
+
+    def test_first_elements(self):
+        result = self._new_mapping([f"v{i}" for i in range(100)], "first", 10)
+
+        self.assertEqual(10, result.inspected_count)
+        self.assertEqual(90, result.skipped_count)
+        self.assertSetEqual(
+            set(f"v{i}" for i in range(10)), result.element_mapping.string_value_set
+        )
+
+    def test_stride(self):
+        result = self._new_mapping([f"v{i}" for i in range(95)], "stride", 10)
+
+        self.assertEqual(10, result.inspected_count)
+        self.assertEqual(85, result.skipped_count)
+        self.assertIn("v90", result.element_mapping.string_value_set)
+
+    def test_reservoir(self):
+        values = [f"v{i}" for i in range(1000)]
+        result = self._new_mapping(values, "reservoir", 20, seed=1)
+
+        self.assertEqual(20, result.inspected_count)
+        self.assertEqual(980, result.skipped_count)
+        self.assertEqual(self._new_mapping(values, "reservoir", 20, seed=1), result)
+
+    def test_until_stable(self):
+        values = [{"a": i} for i in range(100)] + [{"b": "x"}]
+        result = self._new_mapping(values, "until_stable", 5)
+
+        self.assertEqual(6, result.inspected_count)
+        self.assertEqual(95, result.skipped_count)
+        self.assertListEqual(["a"], list(result.element_mapping.properties))
+
+    def test_until_stable_counts_nested_changes(self):
+        values = [{"a": [1]}, {"a": [1]}, {"a": [{"b": 1}]}, {"a": [2]}, {"a": [3]}]
+        result = self._new_mapping(values, "until_stable", 2)
+
+        self.assertEqual(5, result.inspected_count)
+        a_prop = result.element_mapping.properties["a"]
+        self.assertIsInstance(a_prop.element_mapping, fj.AlternativesMapping)
+
+    def test_short_lists_are_not_sampled(self):
+        result = self._new_mapping([1, 2, 3], "first", 10)
+
+        self.assertEqual(3, result.inspected_count)
+        self.assertEqual(0, result.skipped_count)
+
+
+class PresenceCountsTests(unittest.TestCase):
+    samples = [
+        {"id": 1, "name": "a", "parent": None},
+        {"id": 2, "parent": 1},
+        {"id": 3, "name": "c", "parent": None},
+    ]
+
+    def _assert_counts(self, mapping: fj.ObjectMapping):
+        self.assertEqual(3, mapping.object_count)
+        self.assertEqual(
+            Counter({"id": 3, "name": 2, "parent": 3}), mapping.presence_counts
+        )
+        self.assertDictEqual({"parent": 2}, mapping.null_counts)
+
+    def test_presence_and_nulls_are_counted(self):
+        self._assert_counts(fj.new_mapping_model(self.samples).element_mapping)
+
+    def test_counted_with_shape_cache(self):
+        wide = [{**s, **{f"f{i}": i for i in range(8)}} for s in self.samples * 2]
+        options = fj.InferenceOptions(shape_cache=True)
+
+        result = fj.new_mapping_model(wide, options).element_mapping
+
+        self.assertGreater(options.stats.shape_cache_hits, 0)
+        self.assertEqual(6, result.object_count)
+        self.assertEqual(4, result.presence_counts["name"])
+        self.assertEqual(4, result.null_counts["parent"])
+
+    def test_counted_by_stream(self):
+        result = fj.new_mapping_model_from_stream(
+            io.StringIO(json.dumps(self.samples)), chunk_size=5
+        )
+
+        self._assert_counts(result.element_mapping)
+
+    def test_counts_are_merged(self):
+        result = fj.merge_mappings(
+            fj.new_mapping_model(self.samples[:1]),
+            fj.new_mapping_model(self.samples[1:]),
+        )
+
+        self._assert_counts(result.element_mapping)
+
+
+class MergeMappingsTests(unittest.TestCase):
+    samples = [
+        {"a": 1, "b": "x", "c": [1, 2]},
+        {"a": "one", "b": "y", "d": {"e": True}},
+        {"a": 2.5, "c": [], "d": {"f": ["z"]}},
+        {"a": [1], "b": "x", "c": ["s"], "d": "text"},
+    ]
+
+    def test_merge_of_simple_mappings(self):
+        result = fj.merge_mappings(
+            fj.new_mapping_model("a"), fj.new_mapping_model("b")
+        )
+
+        self.assertIsInstance(result, fj.SimpleMapping)
+        self.assertSetEqual(set(["a", "b"]), result.string_value_set)
+
+    def test_merge_of_different_kinds_creates_alternatives(self):
+        result = fj.merge_mappings(
+            fj.new_mapping_model({"a": 1}), fj.new_mapping_model(10)
+        )
+
+        self.assertIsInstance(result, fj.AlternativesMapping)
+        self.assertEqual(
+            {
+                int: fj.SimpleMapping(int),
+                dict: fj.ObjectMapping(
+                    {"a": fj.SimpleMapping(int)},
+                    object_count=1,
+                    presence_counts=Counter({"a": 1}),
+                ),
+            },
+            result.alternatives,
+        )
+
+    def test_merge_is_commutative(self):
+        mappings = [fj.new_mapping_model(s) for s in self.samples]
+
+        for a in mappings:
+            for b in mappings:
+                ab = fj.merge_mappings(a, b)
+                ba = fj.merge_mappings(b, a)
+                self.assertEqual(ab, ba)
+                # except for the order of properties, which is the argument order
+                self.assertListEqual(
+                    list(dict.fromkeys([*a.properties, *b.properties])),
+                    list(ab.properties),
+                )
+                self.assertListEqual(
+                    list(dict.fromkeys([*b.properties, *a.properties])),
+                    list(ba.properties),
+                )
+
+    def test_merge_is_associative(self):
+        a, b, c, d = [fj.new_mapping_model(s) for s in self.samples]
+
+        left = fj.merge_mappings(fj.merge_mappings(fj.merge_mappings(a, b), c), d)
+        right = fj.merge_mappings(a, fj.merge_mappings(b, fj.merge_mappings(c, d)))
+        self.assertEqual(left, right)
+        self.assertListEqual(["a", "b", "c", "d"], list(left.properties))
+        self.assertListEqual(list(left.properties), list(right.properties))
+        self.assertEqual(fj.mapping_fingerprint(left), fj.mapping_fingerprint(right))
+
+    def test_merge_in_sample_order_keeps_property_order(self):
+        mappings = [fj.new_mapping_model(s) for s in self.samples]
+
+        result = functools.reduce(fj.merge_mappings, mappings)
+
+        expected = fj.new_mapping_model(self.samples).element_mapping
+        self.assertListEqual(list(expected.properties), list(result.properties))
+
+    def test_merge_matches_single_mapping_of_all_samples(self):
+        samples = [{"id": f"id-{i}", "n": i, "l": [i]} for i in range(200)]
+        options = fj.InferenceOptions(string_sample_limit=10)
+
+        expected = fj.new_mapping_model(samples, options)
+        result = fj.merge_mappings(
+            fj.new_mapping_model(samples[:50], options),
+            fj.new_mapping_model(samples[50:], options),
+        )
+        self.assertEqual(expected, result)
+
+    def test_arguments_are_not_modified(self):
+        a = fj.new_mapping_model({"a": ["x"]})
+        b = fj.new_mapping_model({"a": ["y"], "b": 1})
+
+        result = fj.merge_mappings(a, b)
+        fj._update_mapping(result, {"a": ["z"], "b": 2})
+
+        self.assertEqual(fj.new_mapping_model({"a": ["x"]}), a)
+        self.assertEqual(fj.new_mapping_model({"a": ["y"], "b": 1}), b)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,238 @@
+import contextlib
+import io
+import unittest
+import benchmarks.recursion_bench as rb
+import definitiongenerator.model as fj
+import definitiongenerator.outputtypemodel as otm
+
+
+class NewTypeModelTests(unittest.TestCase):
+    def test_types_are_found_after_their_properties(self):
+        mapping = fj.new_mapping_model(
+            {"a": {"b": {"c": 1}}, "list": [{"d": "x"}], "e": "y"}
+        )
+
+        (state, t) = otm._new_type_model(mapping, otm._MapperState())
+
+        self.assertListEqual(
+            ["ABDict", "ADict", "ListDict", "MainDict"],
+            [ft.name for ft in state.found_types],
+        )
+        self.assertEqual("MainDict", t.name)
+        self.assertEqual(
+            otm._TypeDescription(
+                "ListDict", is_array=True, array_depth=1, inspected_elements=1
+            ),
+            t.properties["list"],
+        )
+        self.assertListEqual(["y"], t.properties["e"].sample_values)
+
+    def test_list_of_simple_values(self):
+        mapping = fj.new_mapping_model([["a"], ["b"]])
+
+        (state, t) = otm._new_type_model(mapping, otm._MapperState())
+
+        self.assertEqual(
+            otm._TypeDescription(
+                "str", is_array=True, array_depth=2, inspected_elements=2
+            ),
+            t,
+        )
+        self.assertListEqual([], state.found_types)
+
+    def test_empty_list(self):
+        mapping = fj.new_mapping_model({"a": []})
+
+        (_, t) = otm._new_type_model(mapping, otm._MapperState())
+
+        self.assertEqual(
+            otm._TypeDescription("?????", is_array=True, array_depth=1),
+            t.properties["a"],
+        )
+
+    def test_deeply_nested_mapping(self):
+        doc = {"leaf": "value"}
+        for _ in range(2000):
+            doc = {"child": doc}
+
+        (state, _) = otm._new_type_model(fj.new_mapping_model(doc), otm._MapperState())
+
+        self.assertEqual(2001, len(state.found_types))
+
+
+class DeduplicationTests(unittest.TestCase):
+    def test_structurally_equal_types_are_found_once(self):
+        mapping = fj.new_mapping_model(
+            {
+                "billing": {"address": {"city": "a", "zip": "1"}},
+                "shipping": {"address": {"zip": "2", "city": "b"}},
+                "items": [{"city": "c", "zip": "3"}],
+            }
+        )
+
+        (state, t) = otm._new_type_model(mapping, otm._MapperState())
+
+        self.assertListEqual(
+            ["BillingAddressDict", "BillingDict", "MainDict"],
+            [ft.name for ft in state.found_types],
+        )
+        self.assertEqual("BillingDict", t.properties["shipping"].name)
+        self.assertEqual("BillingAddressDict", t.properties["items"].name)
+        self.assertTrue(t.properties["items"].is_array)
+
+    def test_deduplication_can_be_disabled(self):
+        mapping = fj.new_mapping_model({"a": {"x": 1}, "b": {"x": 2}})
+
+        (state, _) = otm._new_type_model(
+            mapping, otm._MapperState(deduplicate=False)
+        )
+
+        self.assertEqual(3, len(state.found_types))
+
+    def test_different_property_types_are_not_deduplicated(self):
+        mapping = fj.new_mapping_model({"a": {"x": 1}, "b": {"x": "1"}})
+
+        (state, _) = otm._new_type_model(mapping, otm._MapperState())
+
+        self.assertEqual(3, len(state.found_types))
+
+    def test_different_string_formats_are_not_deduplicated(self):
+        mapping = fj.new_mapping_model(
+            {"a": {"x": "2024-01-01"}, "b": {"x": "2024-01-01T10:00"}}
+        )
+
+        (state, t) = otm._new_type_model(mapping, otm._MapperState())
+
+        self.assertEqual(3, len(state.found_types))
+        self.assertEqual("date", t.properties["a"].properties["x"].string_format)
+        self.assertEqual("datetime", t.properties["b"].properties["x"].string_format)
+
+
+class UnificationTests(unittest.TestCase):
+    def test_subset_is_unified_with_superset(self):
+        mapping = fj.new_mapping_model(
+            {
+                "full": {"id": 1, "name": "a", "city": "x", "zip": "1"},
+                "partial": {"id": 2, "name": "b", "city": "y"},
+            }
+        )
+
+        (state, t) = otm._new_type_model(
+            mapping, otm._MapperState(unify_threshold=0.25)
+        )
+
+        self.assertEqual(2, len(state.found_types))
+        self.assertEqual("FullDict", t.properties["partial"].name)
+
+    def test_superset_extends_found_type(self):
+        mapping = fj.new_mapping_model(
+            {
+                "partial": {"id": 2, "name": "b", "city": "y"},
+                "full": {"id": 1, "name": "a", "city": "x", "extra": {"v": 1}},
+            }
+        )
+
+        (state, t) = otm._new_type_model(
+            mapping, otm._MapperState(unify_threshold=0.25)
+        )
+
+        self.assertListEqual(
+            ["FullExtraDict", "PartialDict", "MainDict"],
+            [ft.name for ft in state.found_types],
+        )
+        self.assertEqual("PartialDict", t.properties["full"].name)
+        self.assertListEqual(
+            ["id", "name", "city", "extra"],
+            list(state.found_types[1].properties),
+        )
+
+    def test_types_differing_above_threshold_are_kept(self):
+        mapping = fj.new_mapping_model(
+            {"a": {"id": 1, "name": "a"}, "b": {"id": 1, "name": "a", "city": "x"}}
+        )
+
+        (state, _) = otm._new_type_model(
+            mapping, otm._MapperState(unify_threshold=0.25)
+        )
+
+        self.assertEqual(3, len(state.found_types))
+
+    def test_unification_does_not_create_recursive_types(self):
+        mapping = fj.new_mapping_model({"name": "a", "child": {"name": "b"}})
+
+        (state, t) = otm._new_type_model(
+            mapping, otm._MapperState(unify_threshold=0.5)
+        )
+
+        self.assertListEqual(
+            ["ChildDict", "MainDict"], [ft.name for ft in state.found_types]
+        )
+
+
+
+class OptionalityTests(unittest.TestCase):
+    def test_missing_and_null_properties_are_flagged(self):
+        mapping = fj.new_mapping_model(
+            [
+                {"id": 1, "name": "a", "parent": None, "deleted": None},
+                {"id": 2, "parent": 1},
+            ]
+        )
+
+        (state, _) = otm._new_type_model(mapping, otm._MapperState())
+        properties = state.found_types[0].properties
+
+        self.assertFalse(properties["id"].is_optional)
+        self.assertFalse(properties["id"].is_nullable)
+        self.assertTrue(properties["name"].is_optional)
+        self.assertFalse(properties["name"].is_nullable)
+        self.assertFalse(properties["parent"].is_optional)
+        self.assertTrue(properties["parent"].is_nullable)
+        self.assertEqual("int", properties["parent"].name)
+        self.assertEqual("None", properties["deleted"].name)
+        self.assertTrue(properties["deleted"].is_optional)
+
+    def test_flags_distinguish_types(self):
+        mapping = fj.new_mapping_model(
+            {"a": [{"id": 1}], "b": [{"id": 1}, {"id": None}]}
+        )
+
+        (state, _) = otm._new_type_model(mapping, otm._MapperState())
+
+        self.assertEqual(3, len(state.found_types))
+
+    def test_unified_properties_are_optional(self):
+        mapping = fj.new_mapping_model(
+            {
+                "full": {"id": 1, "name": "a", "city": "x", "zip": "1"},
+                "partial": {"id": 2, "name": "b", "city": "y"},
+            }
+        )
+
+        (state, _) = otm._new_type_model(
+            mapping, otm._MapperState(unify_threshold=0.25)
+        )
+
+        unified = state.found_types[0].properties
+        self.assertTrue(unified["zip"].is_optional)
+        self.assertFalse(unified["id"].is_optional)
+
+
+class RecursiveReferenceTests(unittest.TestCase):
+    def test_same_results_as_recursive_reference(self):
+        document = {
+            "items": [{"id": 1, "tags": [["a"], ["b"]]}, {"id": 2, "tags": []}],
+            "state": ["open", "closed"] * 2,
+            "created": "2020-01-01T10:00:00Z",
+            "matrix": [[[1]]],
+            "empty": [],
+            "note": None,
+        }
+
+        # asserts that inference and type models are identical
+        with contextlib.redirect_stdout(io.StringIO()):
+            rb._compare("document", document, samples=1, repetitions=1)
+
+
+if __name__ == "__main__":
+    unittest.main()
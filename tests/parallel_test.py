@@ -0,0 +1,111 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+import definitiongenerator.model as fj
+import definitiongenerator.parallel as par
+
+
+class InferFromFilesTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.samples = [
+            {"page": i, "items": [{"id": f"id-{i}-{j}", "value": j} for j in range(5)]}
+            for i in range(12)
+        ]
+        self.samples[3]["nextPage"] = "https://example.com/?page=4"
+
+        self.paths = []
+        for i, sample in enumerate(self.samples):
+            p = Path(self.directory.name) / f"page{i}.json"
+            p.write_text(json.dumps(sample), encoding="utf-8")
+            self.paths.append(p)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_same_mapping_as_sequential_inference(self):
+        expected = fj.new_mapping_model(self.samples[0])
+        for sample in self.samples[1:]:
+            expected = fj._update_mapping(expected, sample)
+
+        for workers in (1, 2, 4):
+            result = par.infer_from_files(self.paths, workers=workers)
+            self.assertEqual(expected, result)
+            # property order included
+            self.assertEqual(
+                fj.mapping_fingerprint(expected), fj.mapping_fingerprint(result)
+            )
+
+    def test_no_input_files(self):
+        with self.assertRaises(ValueError):
+            par.infer_from_files([], workers=2)
+
+
+
+class InferFromNdjsonTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.samples = [
+            {"id": i, "name": f"name-{i}", "tags": [f"t{i % 3}"]} for i in range(40)
+        ]
+        self.samples[7]["parent"] = 6
+        self.path = Path(self.directory.name) / "samples.ndjson"
+        lines = [json.dumps(s) for s in self.samples]
+        lines.insert(10, "")
+        self.path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_same_mapping_as_sequential_inference(self):
+        expected = fj.new_mapping_model(self.samples[0])
+        for sample in self.samples[1:]:
+            expected = fj._update_mapping(expected, sample)
+
+        for workers in (1, 2, 4):
+            result = par.infer_from_ndjson(self.path, workers=workers)
+            self.assertEqual(expected, result)
+            # property order included
+            self.assertEqual(
+                fj.mapping_fingerprint(expected), fj.mapping_fingerprint(result)
+            )
+
+    def test_ranges_are_aligned_on_lines(self):
+        data = self.path.read_bytes()
+
+        ranges = par.line_ranges(self.path, 7)
+
+        self.assertEqual(7, len(ranges))
+        self.assertEqual(0, ranges[0][0])
+        self.assertEqual(len(data), ranges[-1][1])
+        for (start, end), (next_start, _) in zip(ranges, ranges[1:]):
+            self.assertEqual(end, next_start)
+            self.assertEqual(ord("\n"), data[end - 1])
+
+    def test_more_ranges_than_lines(self):
+        self.path.write_text('{"a": 1}\n{"a": 2}', encoding="utf-8")
+
+        ranges = par.line_ranges(self.path, 10)
+
+        self.assertListEqual([(0, 9), (9, 17)], ranges)
+        self.assertEqual(
+            fj.new_mapping_model([{"a": 1}, {"a": 2}]).element_mapping,
+            par.infer_from_ndjson(self.path, workers=3),
+        )
+
+    def test_invalid_line(self):
+        self.path.write_text('{"a": 1}\n{"a": \n', encoding="utf-8")
+
+        with self.assertRaisesRegex(ValueError, "at byte 9"):
+            par.infer_from_ndjson(self.path, workers=1)
+
+    def test_empty_file(self):
+        self.path.write_text("", encoding="utf-8")
+
+        with self.assertRaises(ValueError):
+            par.infer_from_ndjson(self.path, workers=2)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import json
+import unittest
+from pathlib import Path
+
+import definitiongenerator.model as fj
+import definitiongenerator.profiling as pr
+import definitiongenerator.snapshot as snap
+
+_SAMPLE_PATH = Path(__file__).parent.parent / "sample_response.json"
+
+
+class InferenceProfilerTests(unittest.TestCase):
+    def test_same_mapping_as_unprofiled_inference(self):
+        with open(_SAMPLE_PATH, "r", encoding="utf-8") as f:
+            document = json.load(f)
+        profiler = pr.InferenceProfiler()
+
+        mapping = fj.new_mapping_model(
+            document, fj.InferenceOptions(profiler=profiler)
+        )
+
+        self.assertEqual(
+            snap.mapping_to_dict(fj.new_mapping_model(document)),
+            snap.mapping_to_dict(mapping),
+        )
+        self.assertIn("$.bibs[].marc.fields[]", profiler.paths)
+
+    def test_per_path_counts(self):
+        profiler = pr.InferenceProfiler()
+        options = fj.InferenceOptions(profiler=profiler)
+
+        mapping = fj.new_mapping_model(
+            {"items": [{"id": "a", "note": None}, {"id": "b", "note": "x"}]},
+            options,
+        )
+        fj._update_mapping(mapping, {"items": [{"id": "a", "note": None}]}, options)
+
+        items = profiler.paths["$.items[]"]
+        self.assertEqual(3, items.samples)
+        self.assertEqual(3, profiler.paths["$.items[].id"].samples)
+        self.assertEqual(2, profiler.paths["$.items[].id"].distinct_strings)
+        note = profiler.paths["$.items[].note"]
+        self.assertEqual((3, 2), (note.samples, note.nulls))
+        self.assertAlmostEqual(2 / 3, note.null_frequency)
+        self.assertGreaterEqual(
+            profiler.paths["$"].seconds, profiler.paths["$.items"].seconds
+        )
+        self.assertEqual("$", profiler.report()[0].path)
+
+    def test_type_transitions_and_hooks(self):
+        transitions = []
+        values = []
+        profiler = pr.InferenceProfiler(
+            on_transition=transitions.append,
+            on_value=lambda path, t, _: values.append((path, t)),
+        )
+
+        fj.new_mapping_model(
+            {"v": [1, 2, "x", {"a": 1}, "y"]}, fj.InferenceOptions(profiler=profiler)
+        )
+
+        self.assertListEqual(
+            [
+                pr.TypeTransition("$.v[]", ("int",), "str"),
+                pr.TypeTransition("$.v[]", ("int", "str"), "dict"),
+            ],
+            transitions,
+        )
+        self.assertListEqual(transitions, profiler.paths["$.v[]"].transitions)
+        self.assertIn(("$.v[].a", int), values)
+        self.assertEqual(("$", dict), values[-1])
+
+    def test_deep_nesting(self):
+        doc = {"leaf": "value"}
+        for _ in range(2000):
+            doc = {"child": doc}
+        profiler = pr.InferenceProfiler()
+
+        fj.new_mapping_model(doc, fj.InferenceOptions(profiler=profiler))
+
+        self.assertEqual(2002, len(profiler.paths))
+
+    def test_report_dicts(self):
+        profiler = pr.InferenceProfiler()
+        fj.new_mapping_model({"a": "x"}, fj.InferenceOptions(profiler=profiler))
+
+        report = profiler.report_dicts()
+
+        self.assertListEqual(["$", "$.a"], [r["path"] for r in report])
+        self.assertEqual(1, report[1]["distinct_strings"])
+        self.assertIn("$.a", profiler.format_report())
+
+
+if __name__ == "__main__":
+    unittest.main()
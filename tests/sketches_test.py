@@ -0,0 +1,68 @@
+import unittest
+import definitiongenerator.sketches as sk
+
+
+class StringReservoirTests(unittest.TestCase):
+    def test_all_values_kept_below_limit(self):
+        reservoir = sk.StringReservoir(limit=5)
+        for v in ["a", "b", "a", "c"]:
+            reservoir.add(v)
+
+        self.assertTrue(reservoir.is_exact)
+        self.assertSetEqual(set(["a", "b", "c"]), reservoir.values)
+        self.assertEqual(3, reservoir.distinct_count)
+        self.assertEqual(4, reservoir.observed_count)
+
+    def test_sample_is_bounded_above_limit(self):
+        reservoir = sk.StringReservoir(limit=10)
+        for i in range(1000):
+            reservoir.add(f"value-{i}")
+
+        self.assertFalse(reservoir.is_exact)
+        self.assertEqual(10, len(reservoir.values))
+        self.assertEqual(10, len(reservoir.sample_values()))
+        self.assertEqual(1000, reservoir.observed_count)
+
+    def test_sample_does_not_depend_on_order(self):
+        values = [f"value-{i}" for i in range(200)]
+        first = sk.StringReservoir(limit=10)
+        second = sk.StringReservoir(limit=10)
+        for v in values:
+            first.add(v)
+        for v in reversed(values):
+            second.add(v)
+
+        self.assertSetEqual(first.values, second.values)
+
+    def test_update_is_the_same_as_add(self):
+        values = [f"value-{i % 150}" for i in range(400)]
+        for limit in (10, 1000):
+            with self.subTest(limit):
+                added = sk.StringReservoir(limit=limit)
+                for v in values:
+                    added.add(v)
+                updated = sk.StringReservoir(limit=limit)
+                updated.update(values[:5])
+                updated.update(values[5:])
+
+                self.assertEqual(added, updated)
+
+    def test_distinct_count_estimate(self):
+        reservoir = sk.StringReservoir(limit=10)
+        for i in range(20000):
+            reservoir.add(f"value-{i % 5000}")
+
+        self.assertAlmostEqual(5000, reservoir.distinct_count, delta=5000 * 0.1)
+
+
+class HyperLogLogTests(unittest.TestCase):
+    def test_small_cardinality_estimate(self):
+        hll = sk.HyperLogLog()
+        for i in range(100):
+            hll.add_hash(sk.stable_hash(str(i)))
+
+        self.assertAlmostEqual(100, hll.estimate(), delta=5)
+
+
+if __name__ == "__main__":
+    unittest.main()
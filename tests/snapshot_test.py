@@ -0,0 +1,79 @@
+import io
+import json
+import unittest
+from pathlib import Path
+
+import definitiongenerator.model as fj
+import definitiongenerator.snapshot as snap
+
+SAMPLE_RESPONSE_PATH = Path(__file__).parent.parent / "sample_response.json"
+
+
+class SnapshotTests(unittest.TestCase):
+    def _round_trip(self, mapping: fj.ModelMapping) -> fj.ModelMapping:
+        output = io.StringIO()
+        snap.dump_mapping(mapping, output)
+        return snap.load_mapping(io.StringIO(output.getvalue()))
+
+    def test_round_trip_of_sample_response(self):
+        with open(SAMPLE_RESPONSE_PATH, "r", encoding="utf-8") as f:
+            document = json.load(f)
+        mapping = fj.new_mapping_model(
+            document, fj.InferenceOptions(string_sample_limit=5)
+        )
+
+        self.assertEqual(mapping, self._round_trip(mapping))
+
+    def test_round_trip_of_all_mapping_kinds(self):
+        mapping = fj.new_mapping_model(
+            [{"a": [], "b": [1, "x", {"c": True}, [2.5]]}, {"d": "text"}]
+        )
+
+        self.assertEqual(mapping, self._round_trip(mapping))
+
+    def test_loaded_mapping_can_be_updated(self):
+        options = fj.InferenceOptions(string_sample_limit=10)
+        old_samples = [{"id": f"id-{i}", "n": [i]} for i in range(100)]
+        new_samples = [{"id": f"id-{i}", "flag": True} for i in range(100, 150)]
+
+        expected = fj.new_mapping_model(old_samples, options)
+        loaded = self._round_trip(expected)
+        for sample in new_samples:
+            expected = fj._update_mapping(expected, sample, options)
+            loaded = fj._update_mapping(loaded, sample, options)
+
+        self.assertEqual(expected, loaded)
+
+    def test_deeply_nested_mapping(self):
+        doc = {"leaf": "value"}
+        for _ in range(2000):
+            doc = {"child": doc}
+        mapping = fj.new_mapping_model(doc)
+
+        # mappings are compared through snapshots, '==' is recursive
+        self.assertEqual(
+            snap.mapping_to_dict(mapping),
+            snap.mapping_to_dict(self._round_trip(mapping)),
+        )
+
+    def test_version_1_objects_count_as_one_complete_object(self):
+        d = snap.mapping_to_dict(fj.new_mapping_model({"a": {"b": 1}, "c": None}))
+        d["version"] = 1
+        for node in d["nodes"]:
+            if node[0] == "o":
+                del node[2:]
+
+        mapping = snap.mapping_from_dict(d)
+
+        self.assertEqual(1, mapping.object_count)
+        self.assertEqual({"a": 1}, mapping.presence_counts)
+        self.assertEqual({}, mapping.null_counts)
+        self.assertEqual({"b": 1}, mapping.properties["a"].presence_counts)
+
+    def test_unsupported_version(self):
+        with self.assertRaises(ValueError):
+            snap.mapping_from_dict({"format": snap.SNAPSHOT_FORMAT, "version": 999})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -63,6 +63,29 @@ class Test_SnakeCaseAndCamelCaseConversions(unittest.TestCase):
 
         self.assertEqual("number1234", result)
 
+    def test_HTTPStatus2xx_to_snake_case(self):
+        result = ut.to_snake_case("HTTPStatus2xx")
+
+        self.assertEqual("h_t_t_p_status2xx", result)
+
+    def test_non_ascii_to_snake_case(self):
+        result = ut.to_snake_case("ÉtatCréé")
+
+        self.assertEqual("état_créé", result)
+
+    def test_repeated_underscores_to_camel_case(self):
+        result = ut.to_camel_case("__next__page_2_url_", capitalize_first_letter=True)
+
+        self.assertEqual("NextPage2Url", result)
+
+    def test_conversions_are_cached(self):
+        ut.to_snake_case.cache_clear()
+
+        for _ in range(3):
+            self.assertEqual("created_date", ut.to_snake_case("createdDate"))
+
+        self.assertEqual(2, ut.to_snake_case.cache_info().hits)
+
 
 if __name__ == "__main__":
     unittest.main()
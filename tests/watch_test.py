@@ -0,0 +1,151 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+import definitiongenerator.model as fj
+import definitiongenerator.watch as wt
+import definitiongenerator.writers as w
+
+
+class WatcherTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.root = Path(self.directory.name)
+        (self.root / "in").mkdir()
+        for i in range(3):
+            self._capture(f"page{i}.json", {"page": i, "items": [{"id": f"{i}"}]})
+
+        self.watcher = wt.Watcher(
+            lambda: sorted(str(p) for p in (self.root / "in").glob("*.json")),
+            [
+                wt.WatchTarget("TypedDict", self.root / "out" / "models.py"),
+                wt.WatchTarget(
+                    "CSharp",
+                    self.root / "out" / "Models.cs",
+                    {"Namespace": "Test", "NewStyleNamespace": False},
+                ),
+            ],
+        )
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _capture(self, name: str, sample, mtime_ns: int | None = None):
+        p = self.root / "in" / name
+        p.write_text(json.dumps(sample), encoding="utf-8")
+        if mtime_ns is not None:
+            # modifications within the resolution of mtime are not missed
+            os.utime(p, ns=(mtime_ns, mtime_ns))
+
+    def _expected_typed_dict(self, *samples) -> str:
+        mapping = fj.new_mapping_model(samples[0])
+        for sample in samples[1:]:
+            mapping = fj.merge_mappings(mapping, fj.new_mapping_model(sample))
+
+        return "".join(w.iter_model_chunks(w.new_found_types(mapping)))
+
+    def test_first_refresh_infers_all_files(self):
+        result = self.watcher.refresh()
+
+        self.assertEqual(3, len(result.inferred))
+        self.assertListEqual(
+            [self.root / "out" / "models.py", self.root / "out" / "Models.cs"],
+            result.written,
+        )
+        self.assertEqual(
+            self._expected_typed_dict(
+                *({"page": i, "items": [{"id": f"{i}"}]} for i in range(3))
+            ),
+            (self.root / "out" / "models.py").read_text(encoding="utf-8"),
+        )
+
+    def test_only_changed_files_are_inferred(self):
+        self.watcher.refresh()
+
+        self.assertFalse(self.watcher.refresh().changed)
+
+        self._capture("page1.json", {"page": 1, "items": [{"id": "x"}]}, 10**9)
+        self._capture("page3.json", {"page": 3, "items": [], "nextPage": "/p/4"})
+        result = self.watcher.refresh()
+
+        self.assertListEqual(
+            [str(self.root / "in" / n) for n in ("page1.json", "page3.json")],
+            result.inferred,
+        )
+        self.assertIn(
+            "nextPage: NotRequired[str]",
+            (self.root / "out" / "models.py").read_text(encoding="utf-8"),
+        )
+
+    def test_unchanged_outputs_are_not_written(self):
+        self.watcher.refresh()
+        outputs = [self.root / "out" / "models.py", self.root / "out" / "Models.cs"]
+        for p in outputs:
+            os.utime(p, ns=(0, 0))
+
+        # new values, same types
+        self._capture("page3.json", {"page": 3, "items": [{"id": "3"}]})
+        result = self.watcher.refresh()
+
+        self.assertEqual(1, len(result.inferred))
+        self.assertListEqual([], result.written)
+        self.assertListEqual([0, 0], [p.stat().st_mtime_ns for p in outputs])
+
+        # types of a single output change
+        self.watcher.targets[1].options["Namespace"] = "Other"
+        (self.root / "in" / "page3.json").unlink()
+        result = self.watcher.refresh()
+
+        self.assertListEqual([str(self.root / "in" / "page3.json")], result.removed)
+        self.assertListEqual([outputs[1]], result.written)
+
+    def test_repeated_values_are_written(self):
+        models = self.root / "out" / "models.py"
+        for name in ("a.json", "b.json"):
+            self._capture(name, {"page": 0, "items": [], "k": name[0]})
+        self.watcher.refresh()
+        self.assertNotIn("Literal", models.read_text(encoding="utf-8"))
+
+        # 'k' values repeat, they are detected as an enum
+        for name, k in (("c.json", "a"), ("d.json", "b")):
+            self._capture(name, {"page": 0, "items": [], "k": k})
+        result = self.watcher.refresh()
+
+        self.assertIn(models, result.written)
+        self.assertIn('k: NotRequired[Literal["a", "b"]]', models.read_text("utf-8"))
+
+    def test_invalid_file_is_retried(self):
+        self.watcher.refresh()
+        p = self.root / "in" / "page3.json"
+        p.write_text('{"page": 3, "ite', encoding="utf-8")
+
+        result = self.watcher.refresh()
+
+        self.assertIn(str(p), result.failed)
+        self.assertFalse(result.changed)
+
+        self._capture("page3.json", {"page": 3, "items": [], "extra": True})
+        result = self.watcher.refresh()
+
+        self.assertListEqual([str(p)], result.inferred)
+        self.assertDictEqual({}, result.failed)
+
+    def test_run_until_stopped(self):
+        stop = threading.Event()
+        results = []
+
+        def on_refresh(result):
+            results.append(result)
+            stop.set()
+
+        self.watcher.run(interval=60, stop=stop, on_refresh=on_refresh)
+
+        self.assertEqual(1, len(results))
+        self.assertEqual(2, len(results[0].written))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,314 @@
+import io
+import json
+import unittest
+from pathlib import Path
+
+import definitiongenerator.model as fj
+import definitiongenerator.writers as w
+
+_SAMPLE_PATH = Path(__file__).parent.parent / "sample_response.json"
+_CSHARP_OPTIONS = {"Namespace": "Test.Namespace", "NewStyleNamespace": False}
+
+
+class _CountingSink:
+    def __init__(self):
+        self.chunks: list[str] = []
+
+    def write(self, s: str):
+        self.chunks.append(s)
+
+
+def _write_directly(found_types, dump_format, options) -> str:
+    output = io.StringIO()
+    writer = w._WRITERS[dump_format]()
+    if options is not None:
+        writer.initialize(found_types, options)
+
+    writer.print_header(found_types, output)
+    for t in found_types:
+        writer.print_type(t, output)
+
+    writer.print_footer(found_types, output)
+    return output.getvalue()
+
+
+class IterModelChunksTests(unittest.TestCase):
+    def setUp(self):
+        with open(_SAMPLE_PATH, "r", encoding="utf-8") as f:
+            self.found_types = w.new_found_types(fj.new_mapping_model(json.load(f)))
+
+    def test_chunks_form_the_same_output(self):
+        for dump_format, options in [
+            ("TypedDict", None),
+            ("Markdown", None),
+            ("CSharp", _CSHARP_OPTIONS),
+        ]:
+            with self.subTest(dump_format):
+                expected = _write_directly(self.found_types, dump_format, options)
+                chunks = list(
+                    w.iter_model_chunks(
+                        self.found_types,
+                        dump_format=dump_format,
+                        options=options,
+                        chunk_size=512,
+                    )
+                )
+
+                self.assertEqual(expected, "".join(chunks))
+                self.assertGreater(len(chunks), 1)
+                self.assertTrue(all(len(c) >= 512 for c in chunks[:-1]))
+
+    def test_sink_receives_large_chunks(self):
+        sink = _CountingSink()
+
+        w.write_model(self.found_types, sink, dump_format="Markdown")
+
+        self.assertEqual(1, len(sink.chunks))
+
+    def test_empty_model(self):
+        self.assertListEqual([], list(w.iter_model_chunks([], dump_format="Markdown")))
+
+
+class OptionalPropertiesTests(unittest.TestCase):
+    samples = [
+        {"id": 1, "name": "a", "parent": None, "deleted": None},
+        {"id": 2, "parent": 1},
+    ]
+
+    def _generate(self, dump_format, options=None) -> str:
+        found_types = w.new_found_types(fj.new_mapping_model(self.samples))
+        output = io.StringIO()
+        w.write_model(found_types, output, dump_format=dump_format, options=options)
+        return output.getvalue()
+
+    def test_typed_dict(self):
+        source = self._generate("TypedDict")
+
+        self.assertIn("from typing import NotRequired, TypedDict", source)
+        self.assertIn("    id: int\n", source)
+        self.assertIn("    name: NotRequired[str]\n", source)
+        self.assertIn("    parent: int | None\n", source)
+        self.assertIn("    deleted: NotRequired[None]\n", source)
+
+    def test_csharp(self):
+        source = self._generate("CSharp", _CSHARP_OPTIONS)
+
+        self.assertIn("public required int Id { get; set; }", source)
+        self.assertIn("public string? Name { get; set; }", source)
+        self.assertIn("public int? Parent { get; set; }", source)
+        self.assertIn("public object? Deleted { get; set; }", source)
+
+    def test_markdown(self):
+        source = self._generate("Markdown")
+
+        self.assertIn("- name: str (optional)", source)
+        self.assertIn("- parent: int (nullable)", source)
+
+    def test_dataclasses(self):
+        source = self._generate("Dataclasses")
+
+        self.assertIn("    deleted: None = None\n", source)
+        compile(source, "<models>", "exec")
+
+
+class StringFormatTests(unittest.TestCase):
+    samples = [
+        {
+            "status": ["active", "in-progress"][i % 2],
+            "created": f"2024-01-{i + 10}T08:00:00Z",
+            "id": f"8c6f7c4e-0d4b-4b0e-9a43-3f1c2b6a1e{i + 10}",
+            "next": f"https://example.com/items?page={i}",
+            "count": str(i * 1000),
+            "tags": ["new", "sale"],
+            "name": f"item {i}",
+        }
+        for i in range(4)
+    ]
+
+    def _generate(self, dump_format, options=None, **found_types_options) -> str:
+        found_types = w.new_found_types(
+            fj.new_mapping_model(self.samples), **found_types_options
+        )
+        output = io.StringIO()
+        w.write_model(found_types, output, dump_format=dump_format, options=options)
+        return output.getvalue()
+
+    def test_typed_dict(self):
+        source = self._generate("TypedDict")
+
+        self.assertIn("from typing import Literal, TypedDict", source)
+        self.assertIn('    status: Literal["active", "in-progress"]\n', source)
+        self.assertIn('    tags: list[Literal["new", "sale"]]\n', source)
+        self.assertIn("    created: str\n", source)
+        self.assertIn("    name: str\n", source)
+
+    def test_csharp(self):
+        source = self._generate("CSharp", _CSHARP_OPTIONS)
+
+        self.assertTrue(source.startswith("using System;\n"))
+        self.assertIn("    enum MainDictStatus\n", source)
+        self.assertIn('[JsonStringEnumMemberName("in-progress")]', source)
+        self.assertIn("        InProgress,\n", source)
+        self.assertIn("public required MainDictStatus Status", source)
+        self.assertIn("public required DateTimeOffset Created", source)
+        self.assertIn("public required Guid Id", source)
+        self.assertIn("public required Uri Next", source)
+        self.assertIn("public required long Count", source)
+        self.assertIn("JsonNumberHandling.AllowReadingFromString", source)
+        self.assertIn("public required List<MainDictTags> Tags", source)
+        self.assertIn("public required string Name", source)
+
+    def test_markdown(self):
+        source = self._generate("Markdown")
+
+        self.assertIn("- created: str (datetime)\n", source)
+        self.assertIn("- status: str (enum)\n", source)
+
+    def test_detection_can_be_disabled(self):
+        source = self._generate("TypedDict", detect_formats=False)
+
+        self.assertIn("from typing import TypedDict", source)
+        self.assertIn("    status: str\n", source)
+
+
+class ValidatorWriterTests(unittest.TestCase):
+    def _validators(self, document, *more_documents) -> dict:
+        mapping = fj.new_mapping_model(document)
+        for d in more_documents:
+            mapping = fj._update_mapping(mapping, d)
+        found_types = w.new_found_types(mapping)
+        output = io.StringIO()
+        w.write_model(found_types, output, dump_format="Validators")
+        generated = {}
+        exec(compile(output.getvalue(), "<validators>", "exec"), generated)
+        return generated
+
+    def test_sample_document_is_valid(self):
+        with open(_SAMPLE_PATH, "r", encoding="utf-8") as f:
+            document = json.load(f)
+
+        validators = self._validators(document)
+
+        self.assertIs(document, validators["validate_MainDict"](document))
+
+    def test_invalid_values_are_reported_with_path(self):
+        validators = self._validators(
+            {"id": 1, "price": 1.5, "items": [{"tags": ["a"], "ok": True}]},
+            {"items": [{"ok": None}]},
+        )
+        validate = validators["validate_MainDict"]
+
+        validate({"id": 2, "price": 3, "items": [{"ok": None}]})
+        validate({"items": []})
+        for invalid, message in [
+            ({}, "$.items: missing property"),
+            ({"items": [{}]}, "$.items[0].ok: missing property"),
+            ({"id": None, "items": []}, "$.id: expected int, got NoneType"),
+            ({"id": "1"}, "$.id: expected int, got str"),
+            ({"id": True}, "$.id: expected int, got bool"),
+            ({"items": {}}, "$.items: expected list, got dict"),
+            (
+                {"items": [{"ok": True}, {"tags": ["a", 1], "ok": False}]},
+                "$.items[1].tags[1]: expected str",
+            ),
+            ({"items": [{"ok": 1}]}, "$.items[0].ok: expected bool, got int"),
+            ([], "$: expected object, got list"),
+        ]:
+            with self.subTest(message):
+                with self.assertRaises(validators["ValidationError"]) as context:
+                    validate(invalid)
+
+                self.assertTrue(str(context.exception).startswith(message))
+
+    def test_nested_arrays(self):
+        document = {"m": [[{"a": 1}], []], "n": [[["x"]]], "e": [[]]}
+        validators = self._validators(document)
+        validate = validators["validate_MainDict"]
+
+        self.assertIs(document, validate(document))
+        for invalid, message in [
+            ({**document, "m": [{"a": 1}]}, "$.m[0]: expected list, got dict"),
+            ({**document, "m": [[], [{"a": "1"}]]}, "$.m[1][0].a: expected int"),
+            ({**document, "n": [[["x", 1]]]}, "$.n[0][0][1]: expected str"),
+            ({**document, "e": [1]}, "$.e[0]: expected list, got int"),
+        ]:
+            with self.subTest(message):
+                with self.assertRaises(validators["ValidationError"]) as context:
+                    validate(invalid)
+
+                self.assertTrue(str(context.exception).startswith(message))
+
+    def test_property_names_are_escaped(self):
+        validators = self._validators({"it's": {"a-b": "x"}})
+
+        with self.assertRaises(ValueError) as context:
+            validators["validate_MainDict"]({"it's": {"a-b": 1}})
+
+        self.assertEqual(
+            "$.it's.a-b: expected str, got int", str(context.exception)
+        )
+        self.assertIn("validate_It_sDict", validators)
+
+
+class SlottedClassWriterTests(unittest.TestCase):
+    def _generate(self, document, dump_format="Dataclasses") -> str:
+        found_types = w.new_found_types(fj.new_mapping_model(document))
+        output = io.StringIO()
+        w.write_model(found_types, output, dump_format=dump_format)
+        return output.getvalue()
+
+    def test_from_json_converts_nested_values(self):
+        document = {
+            "id": 1,
+            "class": "x",
+            "001": "y",
+            "items": [{"tagName": "a", "tag_name": "b"}],
+            "empty": [],
+            "child": {"ok": True},
+        }
+        generated = {}
+        exec(compile(self._generate(document), "<models>", "exec"), generated)
+
+        main = generated["MainDict"].from_json(document)
+
+        self.assertEqual(1, main.id)
+        self.assertEqual("x", main.class_)
+        self.assertEqual("y", main.field_001)
+        self.assertEqual("a", main.items[0].tag_name)
+        self.assertEqual("b", main.items[0].tag_name_2)
+        self.assertEqual([], main.empty)
+        self.assertIs(True, main.child.ok)
+        self.assertFalse(hasattr(main, "__dict__"))
+
+        missing = generated["MainDict"].from_json({"child": None})
+        self.assertIsNone(missing.child)
+        self.assertIsNone(missing.items)
+
+    def test_from_json_converts_nested_lists(self):
+        document = {"m": [[{"a": 1}], []], "n": [[["x"]]]}
+        source = self._generate(document)
+        generated = {}
+        exec(compile(source, "<models>", "exec"), generated)
+
+        main = generated["MainDict"].from_json(document)
+
+        self.assertEqual(1, main.m[0][0].a)
+        self.assertEqual([], main.m[1])
+        self.assertEqual([[["x"]]], main.n)
+        self.assertIn("m: list[list[MDict]] | None = None", source)
+        self.assertIn("n: list[list[list[str]]] | None = None", source)
+
+    def test_msgspec_structs_keep_original_names(self):
+        source = self._generate({"tagName": "a", "001": 1}, dump_format="Msgspec")
+
+        compile(source, "<models>", "exec")
+        self.assertIn("class MainDict(msgspec.Struct, omit_defaults=True):", source)
+        self.assertIn(
+            "tag_name: str | None = msgspec.field(name='tagName', default=None)",
+            source,
+        )
+        self.assertIn("return msgspec.convert(value, type=cls)", source)
+
+
+if __name__ == "__main__":
+    unittest.main()